@@ -0,0 +1,25 @@
+from env.snake_env import GRID_COUNT
+
+# Moduły agentów (i numpy) są importowane dopiero przy tworzeniu agenta,
+# więc lista nazw jest dostępna bez kosztu startu
+
+def _random_agent(grid_count):
+    from agents.random_agent import RandomAgent
+    return RandomAgent()
+
+def _safe_agent(grid_count):
+    from agents.safe_agent import SafeRandomAgent
+    return SafeRandomAgent(grid_count)
+
+def _q_agent(grid_count):
+    from agents.q_agent import QAgent
+    return QAgent(grid_count)
+
+# Agenci do wyboru z linii poleceń: nazwa -> funkcja tworząca (rozmiar planszy)
+AGENTS = {'random': _random_agent, 'safe': _safe_agent, 'q': _q_agent}
+
+def create_agent(name, grid_count=GRID_COUNT):
+    """Zwraca nowego agenta o podanej nazwie (ValueError dla nieznanej nazwy)"""
+    if name not in AGENTS:
+        raise ValueError(f"Nieznany agent: {name} (dostępne: {', '.join(AGENTS)})")
+    return AGENTS[name](grid_count)
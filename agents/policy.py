@@ -0,0 +1,145 @@
+import threading
+
+import numpy as np
+
+from env.snake_env import ACTION_DIRECTIONS, DIRECTION_ACTIONS
+
+# Tablice przejść akcja <-> kierunek (0=góra, 1=dół, 2=lewo, 3=prawo)
+NUM_ACTIONS = 4
+ACTION_DELTAS = np.array(ACTION_DIRECTIONS, dtype=np.int64)  # (4, 2): [dx, dy]
+REVERSE_ACTIONS = np.array([1, 0, 3, 2], dtype=np.int64)
+ALLOWED_ACTIONS = tuple(tuple(a for a in range(NUM_ACTIONS) if a != reverse) for reverse in REVERSE_ACTIONS.tolist())
+
+# Skręt w prawo / w lewo względem akcji (na ekranie oś y rośnie w dół)
+TURN_RIGHT = np.array([DIRECTION_ACTIONS[(-dy, dx)] for dx, dy in ACTION_DIRECTIONS], dtype=np.int64)
+TURN_LEFT = np.array([DIRECTION_ACTIONS[(dy, -dx)] for dx, dy in ACTION_DIRECTIONS], dtype=np.int64)
+
+# Domyślne ustawienia mikro-partii
+MAX_BATCH = 64
+MAX_WAIT = 0.001  # Sekundy oczekiwania na kolejne zapytania
+
+def observation_directions(observations):
+    """Zwraca tablicę akcji odpowiadających kierunkom ruchu w partii obserwacji
+
+    observations - słownik z BatchSnakeEnv (klucz 'directions' z akcjami)
+    albo lista krotek (snake, food, direction) jak z SnakeEnv.get_observation().
+    """
+    if isinstance(observations, dict):
+        return np.asarray(observations['directions'], dtype=np.int64)
+    return np.fromiter((DIRECTION_ACTIONS[tuple(direction)] for _, _, direction in observations),
+                       dtype=np.int64, count=len(observations))
+
+def batch_features(observations):
+    """Liczy cechy ObservationEncoder (N, 11) dla całej partii z BatchSnakeEnv naraz"""
+    heads = np.asarray(observations['heads'], dtype=np.int64)
+    food = np.asarray(observations['food'], dtype=np.int64)
+    board = observations['board']
+    directions = np.asarray(observations['directions'], dtype=np.int64)
+    n, grid_count = len(directions), board.shape[-1]
+    rows = np.arange(n)
+
+    features = np.zeros((n, 11), dtype=np.uint8)
+    for column, actions in enumerate((directions, TURN_RIGHT[directions], TURN_LEFT[directions])):
+        target = heads + ACTION_DELTAS[actions]
+        x, y = target[:, 0], target[:, 1]
+        outside = (x < 0) | (x >= grid_count) | (y < 0) | (y >= grid_count)
+        features[:, column] = outside
+        inside = ~outside
+        features[inside, column] = board[rows[inside], y[inside], x[inside]]
+    features[rows, 3 + directions] = 1
+    features[:, 7] = food[:, 1] < heads[:, 1]
+    features[:, 8] = food[:, 1] > heads[:, 1]
+    features[:, 9] = food[:, 0] < heads[:, 0]
+    features[:, 10] = food[:, 0] > heads[:, 0]
+    return features
+
+def safe_action_mask(observations):
+    """Zwraca maskę (N, 4) akcji, które nie wchodzą w ścianę ani w ciało (partia z BatchSnakeEnv)"""
+    heads = np.asarray(observations['heads'], dtype=np.int64)
+    board = observations['board']
+    n, grid_count = len(heads), board.shape[-1]
+    target = heads[:, None, :] + ACTION_DELTAS  # (N, 4, 2)
+    x, y = target[..., 0], target[..., 1]
+    safe = (x >= 0) & (x < grid_count) & (y >= 0) & (y < grid_count)
+    games = np.broadcast_to(np.arange(n)[:, None], safe.shape)
+    safe[safe] = ~board[games[safe], y[safe], x[safe]]
+    return safe
+
+def random_allowed_actions(directions, rng):
+    """Losuje dla każdej gry jedną z trzech akcji innych niż zawrócenie"""
+    offsets = rng.integers(1, NUM_ACTIONS, len(directions))
+    return (REVERSE_ACTIONS[directions] + offsets) % NUM_ACTIONS
+
+class PolicyBatcher:
+    """Łączy pojedyncze zapytania wielu wątków w partie dla agent.get_actions
+
+    Każdy wywołujący get_action(observation) czeka na wynik, a wątek partii
+    zbiera do max_batch zapytań (albo czeka max_wait sekund od pierwszego)
+    i odpowiada na wszystkie jednym wywołaniem get_actions.
+    Obserwacja to krotka (snake, food, direction).
+    """
+
+    def __init__(self, agent, max_batch=MAX_BATCH, max_wait=MAX_WAIT):
+        self.agent = agent
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._requests = []  # [obserwacja, wynik, gotowe]
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Metryki
+        self.batches = 0
+        self.requests = 0
+
+        self._thread = threading.Thread(target=self._run, name="policy-batcher", daemon=True)
+        self._thread.start()
+
+    def get_action(self, observation):
+        """Zwraca akcję dla jednej obserwacji (blokuje do obsłużenia partii)"""
+        request = [observation, None, False]
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("PolicyBatcher jest zamknięty")
+            self._requests.append(request)
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: request[2])
+        if isinstance(request[1], Exception):
+            raise request[1]
+        return request[1]
+
+    def average_batch(self):
+        """Zwraca średnią liczbę zapytań w partii"""
+        return self.requests / self.batches if self.batches else 0.0
+
+    def close(self, timeout=None):
+        """Obsługuje zaległe zapytania i zatrzymuje wątek partii"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requests or self._closed)
+                if not self._requests:
+                    return
+                # Krótkie czekanie na kolejne zapytania, o ile partia nie jest pełna
+                self._condition.wait_for(lambda: len(self._requests) >= self.max_batch or self._closed,
+                                         self.max_wait)
+                batch = self._requests[:self.max_batch]
+                del self._requests[:self.max_batch]
+
+            try:
+                actions = self.agent.get_actions([request[0] for request in batch]).tolist()
+            except Exception as e:
+                # Błąd trafia do każdego czekającego wywołującego
+                actions = [e] * len(batch)
+
+            with self._condition:
+                for request, action in zip(batch, actions):
+                    request[1] = action
+                    request[2] = True
+                self.batches += 1
+                self.requests += len(batch)
+                self._condition.notify_all()
@@ -0,0 +1,248 @@
+import random
+import time
+
+import numpy as np
+
+from agents.policy import ALLOWED_ACTIONS, REVERSE_ACTIONS, batch_features
+from agents.random_agent import RandomAgent
+from env.observation import NUM_FEATURES
+from env.snake_env import ACTION_DIRECTIONS, DIRECTION_ACTIONS, GRID_COUNT
+from utils.replay_buffer import DEFAULT_CAPACITY
+
+# Kod stanu = cechy ObservationEncoder pomnożone przez wagi:
+# niebezpieczeństwo (3 bity), kierunek (one-hot -> 0..3, razy 8), jedzenie (4 bity, razy 32)
+FEATURE_WEIGHTS = np.array([1, 2, 4, 0, 8, 16, 24, 32, 64, 128, 256], dtype=np.int64)
+NUM_STATES = 512
+NUM_ACTIONS = 4
+
+# Domyślne hiperparametry
+LEARNING_RATE = 0.1
+DISCOUNT = 0.9
+EPSILON_START = 1.0
+EPSILON_MIN = 0.01
+EPSILON_DECAY = 0.99  # Mnożnik epsilon po każdej grze
+UPDATE_BATCH = 64     # Liczba przejść zbieranych przed jedną aktualizacją
+REPLAY_WINDOW = 10_000  # Liczba ostatnich przejść, z których losowana jest powtórka
+REPLAY_SAMPLES = 64   # Dodatkowe przejścia z okna powtórki na aktualizację
+
+def encode_states(features):
+    """Zwraca kody stanów (0..NUM_STATES-1) dla wektora lub macierzy (N, NUM_FEATURES) cech"""
+    return np.asarray(features, dtype=np.int64) @ FEATURE_WEIGHTS
+
+def state_direction(states):
+    """Zwraca indeks kierunku (akcję) zakodowany w stanie"""
+    return (states >> 3) & 3
+
+class QAgent(RandomAgent):
+    """Agent uczący się metodą Q-learning z tablicą Q w tablicy NumPy
+
+    Stan to 9-bitowy kod z cech ObservationEncoder (niebezpieczeństwo,
+    kierunek, położenie jedzenia), więc tablica Q ma stały rozmiar
+    NUM_STATES x NUM_ACTIONS. Przejścia są zbierane w tablicach i co
+    UPDATE_BATCH ruchów aktualizowane jednym wektorowym krokiem TD razem
+    z próbką z okna ostatnich REPLAY_WINDOW przejść. Historia ruchów,
+    statystyki i raporty działają jak w RandomAgent.
+    """
+
+    def __init__(self, grid_count=GRID_COUNT, learning_rate=LEARNING_RATE, discount=DISCOUNT,
+                 epsilon=EPSILON_START, epsilon_min=EPSILON_MIN, epsilon_decay=EPSILON_DECAY,
+                 update_batch=UPDATE_BATCH, replay_window=REPLAY_WINDOW, replay_samples=REPLAY_SAMPLES,
+                 seed=None, history_capacity=DEFAULT_CAPACITY):
+        super().__init__(history_capacity)
+        self.name = "Q-Learning Agent"
+        self.agent_type = "Q-learning (tablica NumPy)"
+        self.grid_count = grid_count
+        self.learning_rate = learning_rate
+        self.discount = discount
+        self.epsilon = epsilon
+        self.epsilon_min = epsilon_min
+        self.epsilon_decay = epsilon_decay
+        self.update_batch = update_batch
+        self.replay_samples = replay_samples
+        self.rng = np.random.default_rng(seed)  # Dla wyboru wielu akcji naraz i powtórki
+        self.random = random.Random(seed)        # Dla pojedynczych akcji (tańsze niż NumPy)
+        self.q_table = np.zeros((NUM_STATES, NUM_ACTIONS), dtype=np.float64)
+
+        # Okno powtórki: kolumny przejść (stan, akcja, nagroda, następny stan, koniec)
+        self.replay_window = replay_window
+        self.replay_states = np.zeros(replay_window, dtype=np.int64)
+        self.replay_actions = np.zeros(replay_window, dtype=np.int64)
+        self.replay_rewards = np.zeros(replay_window, dtype=np.float64)
+        self.replay_next_states = np.zeros(replay_window, dtype=np.int64)
+        self.replay_dones = np.zeros(replay_window, dtype=bool)
+        self.transitions = 0      # Wszystkie zebrane przejścia
+        self.updated_until = 0    # Przejścia już użyte w aktualizacji
+
+        # Metryki uczenia
+        self.updates = 0          # Liczba zaktualizowanych przejść (wraz z powtórką)
+        self.update_seconds = 0.0
+
+        self._last_state = None   # Stan, w którym wybrano ostatnią akcję
+        self._pending = None      # (stan, akcja, nagroda) czekające na następny stan
+
+    # --- Wybór akcji ---
+
+    def get_action(self, snake, food, direction):
+        """Zwraca akcję (0=góra, 1=dół, 2=lewo, 3=prawo) dla stanu w formacie surowym"""
+        return self._act(int(encode_states(self.features_from_state(snake, food, direction))))
+
+    def get_action_from_observation(self, grid, features):
+        """Zwraca akcję dla obserwacji z ObservationEncoder (bez przeliczania cech)"""
+        return self._act(int(features @ FEATURE_WEIGHTS))
+
+    def _act(self, state):
+        """Kończy oczekujące przejście i wybiera akcję epsilon-zachłannie"""
+        if self._pending is not None:
+            self._store(*self._pending, state, False)
+            self._pending = None
+        self._last_state = state
+        self.stats['total_moves'] += 1
+
+        # Jeden stan - bez tworzenia tablic, tylko wiersz tablicy Q jako lista
+        allowed = ALLOWED_ACTIONS[(state >> 3) & 3]
+        if self.random.random() < self.epsilon:
+            return self.random.choice(allowed)
+        values = self.q_table[state].tolist()
+        best = max(values[action] for action in allowed)
+        return self.random.choice([action for action in allowed if values[action] == best])
+
+    def select_actions(self, states, epsilon=0.0):
+        """Wybiera akcje dla wielu stanów naraz (epsilon=0 - zachłannie)
+
+        Akcja odwrotna do kierunku ruchu jest zawsze wykluczona.
+        """
+        states = np.asarray(states, dtype=np.int64)
+        values = self.q_table[states].copy()
+        reverse = REVERSE_ACTIONS[state_direction(states)]
+        rows = np.arange(len(states))
+        values[rows, reverse] = -np.inf
+        # Losowe rozstrzyganie remisów, żeby nowe stany nie wybierały zawsze akcji 0
+        values += self.rng.random(values.shape) * 1e-9
+        actions = values.argmax(axis=1)
+        if epsilon > 0:
+            explore = self.rng.random(len(states)) < epsilon
+            if explore.any():
+                # Losowa akcja spośród trzech dozwolonych
+                offsets = self.rng.integers(1, NUM_ACTIONS, explore.sum())
+                actions[explore] = (reverse[explore] + offsets) % NUM_ACTIONS
+        return actions
+
+    def get_actions(self, observations, epsilon=0.0):
+        """Zwraca tablicę akcji dla partii obserwacji (domyślnie zachłannie, bez uczenia)
+
+        observations - słownik z BatchSnakeEnv albo lista krotek (snake, food, direction).
+        """
+        if isinstance(observations, dict):
+            features = batch_features(observations)
+        else:
+            features = np.array([self.features_from_state(*observation) for observation in observations],
+                                dtype=np.uint8).reshape(-1, NUM_FEATURES)
+        self.stats['total_moves'] += len(features)
+        return self.select_actions(encode_states(features), epsilon)
+
+    def features_from_state(self, snake, food, direction):
+        """Liczy cechy jak ObservationEncoder z surowego stanu (węża, jedzenia, kierunku)"""
+        grid_count = self.grid_count
+        body = set(snake)
+        head_x, head_y = snake[0]
+        dx, dy = direction
+
+        def danger(x, y):
+            return x < 0 or x >= grid_count or y < 0 or y >= grid_count or (x, y) in body
+
+        features = np.zeros(NUM_FEATURES, dtype=np.uint8)
+        features[0] = danger(head_x + dx, head_y + dy)
+        features[1] = danger(head_x - dy, head_y + dx)
+        features[2] = danger(head_x + dy, head_y - dx)
+        features[3 + DIRECTION_ACTIONS[(dx, dy)]] = 1
+        if food is not None:
+            features[7] = food[1] < head_y
+            features[8] = food[1] > head_y
+            features[9] = food[0] < head_x
+            features[10] = food[0] > head_x
+        return features
+
+    def action_to_direction(self, action):
+        """Konwertuje akcję (0-3) na kierunek [x, y]"""
+        return list(ACTION_DIRECTIONS[action])
+
+    # --- Uczenie ---
+
+    def record_move(self, head, length, food, direction, action, reward, new_snake, new_food, game_over,
+                    death_cause=None):
+        """Zapisuje ruch w historii i przejście do uczenia"""
+        super().record_move(head, length, food, direction, action, reward, new_snake, new_food, game_over,
+                            death_cause)
+        if self._last_state is None:
+            return
+        if game_over:
+            self._store(self._last_state, action, reward, 0, True)
+            self._last_state = None
+            self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+        else:
+            # Następny stan będzie znany przy kolejnym wyborze akcji
+            self._pending = (self._last_state, action, reward)
+
+    def seed_episode(self, seed):
+        """Zaczyna nową grę: ustawia strumień losowy i porzuca niedokończone przejście
+
+        Gra przerwana resetem (bez ruchu kończącego) nie ma następnego
+        stanu - bez tego pierwszy ruch nowej gry dokończyłby przejście
+        z poprzedniej.
+        """
+        super().seed_episode(seed)
+        self._pending = None
+        self._last_state = None
+
+    def _store(self, state, action, reward, next_state, done):
+        """Dopisuje przejście do okna powtórki i co update_batch uruchamia aktualizację"""
+        i = self.transitions % self.replay_window
+        self.replay_states[i] = state
+        self.replay_actions[i] = action
+        self.replay_rewards[i] = reward
+        self.replay_next_states[i] = next_state
+        self.replay_dones[i] = done
+        self.transitions += 1
+        if self.transitions - self.updated_until >= self.update_batch:
+            self.learn()
+
+    def learn(self):
+        """Wektorowy krok TD dla nowych przejść i próbki z okna powtórki"""
+        start = time.perf_counter()
+        new = np.arange(self.updated_until, self.transitions) % self.replay_window
+        available = min(self.transitions, self.replay_window)
+        if self.replay_samples and available > len(new):
+            new = np.concatenate([new, self.rng.integers(0, available, self.replay_samples)])
+        self.updated_until = self.transitions
+        self.td_update(self.replay_states[new], self.replay_actions[new], self.replay_rewards[new],
+                       self.replay_next_states[new], self.replay_dones[new])
+        self.update_seconds += time.perf_counter() - start
+
+    def td_update(self, states, actions, rewards, next_states, dones):
+        """Aktualizuje Q[s, a] += lr * (r + gamma * max Q[s'] - Q[s, a]) dla całej partii
+
+        Błędy TD są liczone z tablicy sprzed aktualizacji, a powtórzenia
+        tej samej pary (s, a) w partii sumują się (np.add.at).
+        """
+        q_table = self.q_table
+        next_values = q_table[next_states].max(axis=1)
+        targets = rewards + self.discount * next_values * ~dones
+        errors = targets - q_table[states, actions]
+        np.add.at(q_table, (states, actions), self.learning_rate * errors)
+        self.updates += len(states)
+
+    def get_stats(self):
+        """Zwraca statystyki agenta (także uczenia)"""
+        stats = super().get_stats()
+        stats.update({
+            'epsilon': round(self.epsilon, 4),
+            'przejscia': self.transitions,
+            'aktualizacje': self.updates,
+            'aktualizacje_na_s': round(self.updates_per_sec()),
+            'odwiedzone_stany': int(np.count_nonzero(self.q_table.any(axis=1))),
+        })
+        return stats
+
+    def updates_per_sec(self):
+        """Zwraca średnią liczbę aktualizowanych przejść na sekundę czasu uczenia"""
+        return self.updates / self.update_seconds if self.update_seconds else 0.0
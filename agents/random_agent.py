@@ -1,109 +1,96 @@
 import random
 from datetime import datetime
 
+import numpy as np
+
+from agents.policy import ALLOWED_ACTIONS, observation_directions, random_allowed_actions
+from env.snake_env import ACTION_DIRECTIONS, DIRECTION_ACTIONS
+from utils.replay_buffer import ReplayBuffer, DEFAULT_CAPACITY
+from utils.stats import StreamingStats
+
 class RandomAgent:
     """Prosty losowy agent"""
-    def __init__(self):
+    def __init__(self, history_capacity=DEFAULT_CAPACITY):
         self.name = "Random Agent"
         self.agent_type = "Losowy (nie uczy się)"
         
-        # Inicjalizacja list do zbierania danych
-        if not hasattr(self, 'movement_history'):
-            self.movement_history = []
-        if not hasattr(self, 'successful_patterns'):
-            self.successful_patterns = []
-        if not hasattr(self, 'failed_patterns'):
-            self.failed_patterns = []
+        # Historia ruchów w buforze o stałej pojemności
+        self.movement_history = ReplayBuffer(history_capacity)
+        self.successful_patterns_count = 0
+        self.failed_patterns_count = 0
+        self.game_stats = StreamingStats()  # Agregaty gier i ruchów w O(1)
+        self.batch_rng = np.random.default_rng()  # Losowanie akcji dla partii (get_actions)
+        self.random = random.Random(random.getrandbits(64))  # Losowanie akcji (seed_episode)
         self.stats = {
             'total_moves': 0,
             'successful_moves': 0,
             'collision_moves': 0
         }
     
-    def record_move(self, snake, food, direction, action, reward, new_snake, new_food, game_over):
-        """Zapisuje szczegółowe dane o ruchu"""
-        move_data = {
-            'timestamp': datetime.now().isoformat(),
-            'snake_head': snake[0],
-            'snake_body': snake[1:],
-            'food_position': food,
-            'direction': direction,
-            'action': action,
-            'reward': reward,
-            'new_snake_head': new_snake[0] if new_snake else None,
-            'food_eaten': len(new_snake) > len(snake) if new_snake else False,
-            'game_over': game_over,
-            'game_score': len(snake) - 1
-        }
+    def record_move(self, head, length, food, direction, action, reward, new_snake, new_food, game_over,
+                    death_cause=None):
+        """Zapisuje szczegółowe dane o ruchu
         
-        self.movement_history.append(move_data)
+        Ze stanu przed ruchem potrzebne są tylko głowa i długość węża - ciało
+        odtwarza historia (ReplayBuffer.get_body), więc nie trzeba go kopiować.
+        """
+        food_eaten = len(new_snake) > length if new_snake else False
+        self.movement_history.append(
+            head, length, food, DIRECTION_ACTIONS[tuple(direction)], action, reward,
+            new_snake[0] if new_snake else None, food_eaten, game_over)
+        new_length = len(new_snake) if new_snake else length + (reward > 0)  # Wygrana też wydłuża
+        self.game_stats.record_move(action, reward, new_length, game_over, death_cause)
         
-        # Analiza wzorców
+        # Analiza wzorców (same wiersze są w historii - tu tylko liczniki)
         if reward > 0:  # Sukces
-            self.successful_patterns.append({
-                'snake_head': snake[0],
-                'food_position': food,
-                'action': action,
-                'direction': direction
-            })
+            self.successful_patterns_count += 1
         elif reward < 0:  # Porażka
-            self.failed_patterns.append({
-                'snake_head': snake[0],
-                'food_position': food,
-                'action': action,
-                'direction': direction
-            })
+            self.failed_patterns_count += 1
     
     def get_detailed_stats(self):
-        """Zwraca szczegółowe statystyki"""
-        if not self.movement_history:
+        """Zwraca szczegółowe statystyki (z gotowych agregatów, bez przeglądania historii)"""
+        stats = self.game_stats
+        if not stats.moves:
             return {}
         
-        # Analiza ostatnich 100 ruchów
-        recent_moves = self.movement_history[-100:]
-        
-        # Najczęstsze akcje
-        actions = [move['action'] for move in recent_moves]
-        action_counts = {}
-        for action in actions:
-            action_counts[action] = action_counts.get(action, 0) + 1
-        
-        # Najlepsze wzorce (gdy zjadł jedzenie)
-        successful_moves = [move for move in recent_moves if move['reward'] > 0]
-        
-        return {
-            'total_moves_recorded': len(self.movement_history),
-            'recent_moves': len(recent_moves),
-            'action_distribution': action_counts,
-            'successful_moves_count': len(successful_moves),
-            'successful_patterns_count': len(self.successful_patterns),
-            'failed_patterns_count': len(self.failed_patterns),
-            'average_score': sum(move['game_score'] for move in recent_moves) / len(recent_moves) if recent_moves else 0
-        }
+        details = stats.summary()
+        details.update({
+            'total_moves_recorded': self.movement_history.total,
+            'recent_moves': len(stats.recent_moves),
+            'action_distribution': {action: count for action, count in enumerate(stats.window_action_counts) if count},
+            'successful_moves_count': stats.window_successful_moves,
+            'successful_patterns_count': self.successful_patterns_count,
+            'failed_patterns_count': self.failed_patterns_count,
+            # Średni wynik na grę z ostatnich gier (wcześniej: średnia po ruchach)
+            'average_score': stats.window_average('score'),
+            'lifetime_average_score': details['average_score'],
+        })
+        return details
     
     def get_action(self, snake, food, direction):
         """Zwraca losowy kierunek (0=góra, 1=dół, 2=lewo, 3=prawo)"""
-        possible_actions = [0, 1, 2, 3]  # góra, dół, lewo, prawo
-        
-        # Usuń przeciwny kierunek (nie można iść w przeciwnym kierunku)
-        if direction == [0, -1]:  # idzie w górę
-            possible_actions.remove(1)  # nie może iść w dół
-        elif direction == [0, 1]:  # idzie w dół
-            possible_actions.remove(0)  # nie może iść w górę
-        elif direction == [-1, 0]:  # idzie w lewo
-            possible_actions.remove(3)  # nie może iść w prawo
-        elif direction == [1, 0]:  # idzie w prawo
-            possible_actions.remove(2)  # nie może iść w lewo
-        
+        # Bez zawracania - dozwolone akcje z gotowej tablicy
+        possible_actions = ALLOWED_ACTIONS[DIRECTION_ACTIONS[tuple(direction)]]
         self.stats['total_moves'] += 1
-        return random.choice(possible_actions)
+        return self.random.choice(possible_actions)
+    
+    def seed_episode(self, seed):
+        """Ustawia strumień losowy agenta na nową grę (wyprowadzony z ziarna gry)"""
+        self.random.seed(f"{seed}:agent")
+    
+    def get_actions(self, observations):
+        """Zwraca tablicę losowych akcji dla partii obserwacji (bez zawracania)
+        
+        observations - słownik z BatchSnakeEnv albo lista krotek (snake, food, direction).
+        """
+        directions = observation_directions(observations)
+        self.stats['total_moves'] += len(directions)
+        return random_allowed_actions(directions, self.batch_rng)
     
     def action_to_direction(self, action):
         """Konwertuje akcję (0-3) na kierunek [x, y]"""
-        if action == 0: return [0, -1]  # góra
-        elif action == 1: return [0, 1]   # dół
-        elif action == 2: return [-1, 0]  # lewo
-        elif action == 3: return [1, 0]   # prawo
+        if 0 <= action < len(ACTION_DIRECTIONS):
+            return list(ACTION_DIRECTIONS[action])
         return [1, 0]  # domyślnie prawo
     
     def get_stats(self):
@@ -122,4 +109,37 @@ class RandomAgent:
     
     def record_collision(self):
         """Zapisuje kolizję"""
-        self.stats['collision_moves'] += 1 
\ No newline at end of file
+        self.stats['collision_moves'] += 1 
+    
+    def __setstate__(self, state):
+        """Wczytuje agenta, także zapisanego w starym formacie (listy słowników)"""
+        self.__dict__.update(state)
+        self.__dict__.setdefault('agent_type', "Losowy (nie uczy się)")
+        self.__dict__.setdefault('batch_rng', np.random.default_rng())
+        self.__dict__.setdefault('random', random.Random())
+        history = state.get('movement_history')
+        if not isinstance(history, ReplayBuffer):
+            self.movement_history = ReplayBuffer()
+            for move in history or []:
+                self.movement_history.append(
+                    move['snake_head'], len(move['snake_body']) + 1, move['food_position'],
+                    DIRECTION_ACTIONS[tuple(move['direction'])], move['action'], move['reward'],
+                    move['new_snake_head'], move['food_eaten'], move['game_over'],
+                    datetime.fromisoformat(move['timestamp']).timestamp())
+        for kind in ('successful', 'failed'):
+            patterns = self.__dict__.pop(f'{kind}_patterns', None)
+            if f'{kind}_patterns_count' not in self.__dict__:
+                setattr(self, f'{kind}_patterns_count', len(patterns or []))
+        if 'game_stats' not in self.__dict__:
+            self.game_stats = self._stats_from_history()
+    
+    def _stats_from_history(self):
+        """Odtwarza agregaty z historii ruchów (tylko przy wczytaniu starego modelu)"""
+        stats = StreamingStats()
+        history = self.movement_history
+        moves = history.get_range(history.first_row, history.total)
+        for action, reward, length, food_eaten, game_over in zip(
+                moves['action'].tolist(), moves['reward'].tolist(), moves['length'].tolist(),
+                moves['food_eaten'].tolist(), moves['game_over'].tolist()):
+            stats.record_move(action, reward, length + food_eaten, game_over)
+        return stats
\ No newline at end of file
@@ -0,0 +1,71 @@
+import numpy as np
+
+from agents.policy import (ALLOWED_ACTIONS, REVERSE_ACTIONS, observation_directions, random_allowed_actions,
+                           safe_action_mask)
+from agents.random_agent import RandomAgent
+from env.snake_env import DIRECTION_ACTIONS, GRID_COUNT
+from env.spatial import SpatialIndex
+from utils.replay_buffer import DEFAULT_CAPACITY
+
+FOOD_BIAS = 0.5  # Szansa ruchu najkrótszą drogą do jedzenia zamiast losowego bezpiecznego
+
+class SafeRandomAgent(RandomAgent):
+    """Losowy agent, który nie wchodzi w ściany ani w siebie (env.spatial.SpatialIndex)
+
+    Losuje spośród ruchów, po których zostaje co najmniej tyle wolnych pól,
+    ile ma wąż; gdy takich nie ma - spośród ruchów bezpiecznych, a gdy i tych
+    brak - dowolny bez zawracania. Z prawdopodobieństwem food_bias wybiera
+    z nich ruch najbliższy jedzeniu (odległość BFS omijająca ciało).
+    """
+    def __init__(self, grid_count=GRID_COUNT, food_bias=FOOD_BIAS, history_capacity=DEFAULT_CAPACITY):
+        super().__init__(history_capacity)
+        self.name = "Safe Random Agent"
+        self.agent_type = "Losowy z bezpiecznymi ruchami (nie uczy się)"
+        self.grid_count = grid_count
+        self.food_bias = food_bias
+        self.spatial = SpatialIndex(grid_count)
+    
+    def get_action(self, snake, food, direction):
+        """Zwraca losowy bezpieczny kierunek (0=góra, 1=dół, 2=lewo, 3=prawo)"""
+        spatial = self.spatial
+        spatial.update(snake, food)
+        self.stats['total_moves'] += 1
+        actions = spatial.safe_actions()
+        if not actions:
+            return self.random.choice(ALLOWED_ACTIONS[DIRECTION_ACTIONS[tuple(direction)]])
+        length = len(snake)
+        roomy = [action for action in actions if spatial.reachable_area(action, length) >= length]
+        actions = roomy or actions
+        if self.random.random() < self.food_bias:
+            distances = {action: spatial.food_distance(action) for action in actions}
+            reachable = [action for action in actions if distances[action] is not None]
+            if reachable:
+                return min(reachable, key=distances.get)
+        return self.random.choice(actions)
+    
+    def get_actions(self, observations):
+        """Zwraca tablicę losowych bezpiecznych akcji dla partii obserwacji
+        
+        Słownik z BatchSnakeEnv daje tylko zajętość pól - wtedy sprawdzane są
+        jedynie ściany i ciało (bez wolnego miejsca i drogi do jedzenia).
+        """
+        if not isinstance(observations, dict):
+            return np.array([self.get_action(*observation) for observation in observations], dtype=np.int64)
+        directions = observation_directions(observations)
+        self.stats['total_moves'] += len(directions)
+        safe = safe_action_mask(observations)
+        safe[np.arange(len(directions)), REVERSE_ACTIONS[directions]] = False
+        # Losowa akcja spośród bezpiecznych: największy losowy klucz wśród dozwolonych
+        keys = np.where(safe, self.batch_rng.random(safe.shape), -1.0)
+        return np.where(safe.any(axis=1), keys.argmax(axis=1),
+                        random_allowed_actions(directions, self.batch_rng))
+    
+    def __getstate__(self):
+        """Zapisuje agenta bez indeksu przestrzennego (jest odtwarzany przy wczytaniu)"""
+        state = self.__dict__.copy()
+        state.pop('spatial', None)
+        return state
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.spatial = SpatialIndex(self.grid_count)
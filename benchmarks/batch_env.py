@@ -0,0 +1,48 @@
+"""Porównanie kroków/s: pojedyncza gra (SnakeEnv) vs BatchSnakeEnv
+
+Uruchomienie: python -m benchmarks.batch_env [--steps N] [--envs 1000 10000]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from env.snake_env import SnakeEnv
+from env.batch_env import BatchSnakeEnv
+
+def bench_single(total_steps):
+    """Kroki/s pętli po jednej grze z losowymi akcjami"""
+    env = SnakeEnv()
+    start = time.perf_counter()
+    for _ in range(total_steps):
+        _, _, done = env.step(random.randrange(4))
+        if done:
+            env.reset()
+    return total_steps / (time.perf_counter() - start)
+
+def bench_batch(num_envs, batch_steps, seed=0):
+    """Kroki/s (suma po wszystkich grach) dla BatchSnakeEnv"""
+    env = BatchSnakeEnv(num_envs, seed=seed)
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(0, 4, size=(batch_steps, num_envs), dtype=np.int8)
+    start = time.perf_counter()
+    for t in range(batch_steps):
+        env.step(actions[t])
+    return num_envs * batch_steps / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BatchSnakeEnv vs SnakeEnv")
+    parser.add_argument('--steps', type=int, default=200000, help="kroki pojedynczej gry")
+    parser.add_argument('--batch-steps', type=int, default=200, help="kroki środowiska wsadowego")
+    parser.add_argument('--envs', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    single = bench_single(args.steps)
+    print(f"SnakeEnv (1 gra):          {single:12,.0f} kroków/s")
+    for num_envs in args.envs:
+        batch = bench_batch(num_envs, args.batch_steps)
+        print(f"BatchSnakeEnv (N={num_envs:>6}): {batch:12,.0f} kroków/s  (x{batch / single:.1f})")
+
+if __name__ == "__main__":
+    main()
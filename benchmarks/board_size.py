@@ -0,0 +1,78 @@
+"""Pamięć i szybkość silnika przy różnych rozmiarach planszy
+
+Dla każdego rozmiaru (i trybu: gęsty SnakeEnv / rzadki SparseSnakeEnv)
+mierzy pamięć silnika z wężem o długości --length (tracemalloc), czas
+resetu, kroki/s takiego węża i czas losowania jedzenia. Wąż krąży po
+cyklu Hamiltona w rogu planszy, więc jego długość się nie zmienia.
+
+Uruchomienie: python -m benchmarks.board_size [--length 1000] [--steps 100000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.suite import best_of, hamiltonian_cycle
+from env.snake_env import DIRECTION_ACTIONS, SnakeEnv
+
+SIZES = (30, 100, 300, 1000, 3000, 10000)
+DENSE_MAX_SIZE = 1000  # Większych plansz gęstych nie ma sensu tworzyć
+
+def corner_snake(env, length):
+    """Układa węża na cyklu Hamiltona kwadratu w rogu planszy, zwraca pole -> następna akcja"""
+    side = 2
+    while side * side < length + 2:
+        side += 2
+    cycle = hamiltonian_cycle(side)
+    env.reset()
+    for x, y in env.snake:
+        env._release(y * env.grid_count + x)
+    env.snake.clear()
+    for x, y in cycle[:length]:
+        env.snake.appendleft((x, y))
+        env._occupy(y * env.grid_count + x)
+    env.food = None  # Bez jedzenia długość węża się nie zmienia
+    env.max_steps_per_game = float('inf')
+    return {(x, y): DIRECTION_ACTIONS[(nx - x, ny - y)]
+            for (x, y), (nx, ny) in zip(cycle, cycle[1:] + cycle[:1])}
+
+def measure(size, sparse, length, steps):
+    tracemalloc.start()
+    env = SnakeEnv(size, sparse=sparse)
+    next_action = corner_snake(env, length)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    def run():
+        for _ in range(steps):
+            env.step(next_action[env.snake[0]])
+
+    step_seconds = best_of(3, run)
+    food_seconds = best_of(3, lambda: [env.generate_food() for _ in range(1000)])
+    reset_seconds = best_of(3, env.reset)
+    return {
+        'size': size,
+        'engine': type(env).__name__,
+        'memory_mb': memory / (1024 * 1024),
+        'reset_ms': reset_seconds * 1000,
+        'steps_per_sec': steps / step_seconds,
+        'food_us': food_seconds / 1000 * 1e6,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark silnika dla różnych rozmiarów planszy")
+    parser.add_argument('--length', type=int, default=1000, help="długość węża")
+    parser.add_argument('--steps', type=int, default=100000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    args = parser.parse_args()
+
+    print(f"{'plansza':>11} {'silnik':<15} {'pamięć MB':>10} {'reset ms':>9} {'kroki/s':>10} {'jedzenie µs':>12}")
+    for size in args.sizes:
+        for sparse in (False, True):
+            if not sparse and size > DENSE_MAX_SIZE:
+                continue
+            row = measure(size, sparse, min(args.length, size * size // 2), args.steps)
+            print(f"{size:>5}x{size:<5} {row['engine']:<15} {row['memory_mb']:10.2f} {row['reset_ms']:9.3f} "
+                  f"{row['steps_per_sec']:10,.0f} {row['food_us']:12.2f}")
+
+if __name__ == "__main__":
+    main()
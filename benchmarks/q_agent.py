@@ -0,0 +1,116 @@
+"""Czas uczenia QAgent (tablica NumPy) vs naiwny Q-learning na słowniku krotek
+
+Oba agenty uczą się w tej samej pętli SnakeEnv, aż średni wynik z ostatnich
+100 gier osiągnie próg. Mierzony jest czas, liczba gier i aktualizacje/s.
+
+Uruchomienie: python -m benchmarks.q_agent [--target 8] [--grid 20] [--max-games 5000]
+"""
+import argparse
+import random
+import time
+
+from agents.random_agent import RandomAgent
+from agents.q_agent import QAgent, LEARNING_RATE, DISCOUNT, EPSILON_START, EPSILON_MIN, EPSILON_DECAY
+from env.observation import ObservationEncoder
+from env.snake_env import SnakeEnv
+
+class NaiveQAgent(RandomAgent):
+    """Q-learning w stylu słownikowym: stan to krotka z surowego węża, aktualizacja po każdym ruchu
+
+    Ten sam interfejs i ta sama historia/statystyki co QAgent - różni się
+    tylko reprezentacja tablicy Q, kodowanie stanu i sposób aktualizacji.
+    """
+
+    def __init__(self, grid_count):
+        super().__init__()
+        self.grid_count = grid_count
+        self.q_table = {}
+        self.epsilon = EPSILON_START
+        self.updates = 0
+        self.update_seconds = 0.0
+
+    def get_state(self, snake, food, direction):
+        head_x, head_y = snake[0]
+        dx, dy = direction
+
+        def danger(x, y):
+            return (x < 0 or x >= self.grid_count or y < 0 or y >= self.grid_count
+                    or [x, y] in [list(part) for part in snake])
+
+        return (danger(head_x + dx, head_y + dy), danger(head_x - dy, head_y + dx),
+                danger(head_x + dy, head_y - dx), dx, dy,
+                food[1] < head_y, food[1] > head_y, food[0] < head_x, food[0] > head_x)
+
+    def get_action(self, snake, food, direction):
+        allowed = [a for a, d in enumerate(((0, -1), (0, 1), (-1, 0), (1, 0)))
+                   if (d[0], d[1]) != (-direction[0], -direction[1])]
+        self._state = self.get_state(snake, food, direction)  # Stan sprzed ruchu dla record_move
+        if random.random() < self.epsilon:
+            return random.choice(allowed)
+        values = self.q_table.setdefault(self._state, [0.0] * 4)
+        best = max(values[a] for a in allowed)
+        return random.choice([a for a in allowed if values[a] == best])
+
+    def record_move(self, head, length, food, direction, action, reward, new_snake, new_food, game_over,
+                    death_cause=None):
+        super().record_move(head, length, food, direction, action, reward, new_snake, new_food, game_over,
+                            death_cause)
+        start = time.perf_counter()
+        values = self.q_table.setdefault(self._state, [0.0] * 4)
+        future = 0.0
+        if not game_over:
+            new_direction = self.action_to_direction(action)
+            future = max(self.q_table.setdefault(self.get_state(new_snake, new_food, new_direction), [0.0] * 4))
+        values[action] += LEARNING_RATE * (reward + DISCOUNT * future - values[action])
+        self.updates += 1
+        self.update_seconds += time.perf_counter() - start
+        if game_over:
+            self.epsilon = max(EPSILON_MIN, self.epsilon * EPSILON_DECAY)
+
+    def updates_per_sec(self):
+        return self.updates / self.update_seconds if self.update_seconds else 0.0
+
+def train(agent, grid_count, target, max_games, window=100):
+    """Uczy agenta w pętli jak SnakeGame.update, zwraca (czas, gry, średnia, aktualizacje/s)"""
+    env = SnakeEnv(grid_count)
+    encoder = ObservationEncoder(env)
+    start = time.perf_counter()
+    stats = agent.game_stats
+    while stats.games < max_games:
+        env.reset()
+        while True:
+            if hasattr(agent, 'get_action_from_observation'):
+                action = agent.get_action_from_observation(*encoder.update())
+            else:
+                action = agent.get_action(env.snake, env.food, env.direction)
+            old_head, old_length = env.snake[0], len(env.snake)
+            old_food = env.food
+            old_direction = env.direction.copy()
+            _, reward, done = env.step(action)
+            if done:
+                agent.record_move(old_head, old_length, old_food, old_direction, action, reward, None, old_food,
+                                  True, death_cause=env.death_cause)
+                break
+            agent.record_move(old_head, old_length, old_food, old_direction, action, reward, env.snake, env.food,
+                              False)
+        if len(stats.recent_games) == window and stats.window_average('score') >= target:
+            break
+    elapsed = time.perf_counter() - start
+    return elapsed, stats.games, stats.window_average('score'), agent.updates_per_sec()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark uczenia QAgent vs Q-learning na słowniku")
+    parser.add_argument('--target', type=float, default=8.0, help="docelowa średnia z ostatnich 100 gier")
+    parser.add_argument('--grid', type=int, default=20, help="rozmiar planszy")
+    parser.add_argument('--max-games', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    for name, agent in (("naiwny (dict)", NaiveQAgent(args.grid)), ("QAgent (NumPy)", QAgent(args.grid, seed=args.seed))):
+        elapsed, games, average, rate = train(agent, args.grid, args.target, args.max_games)
+        print(f"{name:>16}: {elapsed:7.2f} s, {games:5d} gier, średnia {average:5.2f}, "
+              f"{rate:,.0f} aktualizacji/s")
+
+if __name__ == "__main__":
+    main()
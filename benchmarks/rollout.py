@@ -0,0 +1,39 @@
+"""Skalowanie RolloutCollector względem liczby procesów
+
+Uruchomienie: python -m benchmarks.rollout [--workers 1 2 4 8] [--transitions N]
+"""
+import argparse
+import os
+
+from agents.random_agent import RandomAgent
+from utils.rollout import RolloutCollector
+
+def bench_collector(num_workers, num_transitions, seed=0):
+    """Zwraca przepustowość zbierania dla num_workers procesów"""
+    with RolloutCollector(RandomAgent(), num_workers=num_workers, seed=seed) as collector:
+        # Rozgrzewka - start procesów nie wlicza się do pomiaru
+        for _ in collector.collect(num_workers * collector.slot_size):
+            pass
+        collector.reset_throughput()
+        for _ in collector.collect(num_transitions):
+            pass
+        return collector.get_throughput()
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+    parser = argparse.ArgumentParser(description="Benchmark RolloutCollector")
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers)
+    parser.add_argument('--transitions', type=int, default=500000)
+    args = parser.parse_args()
+
+    base = None
+    for num_workers in args.workers:
+        result = bench_collector(num_workers, args.transitions * num_workers)
+        rate = result['transitions_per_s']
+        base = base or rate / num_workers
+        print(f"Procesy: {num_workers:>3}  {rate:12,.0f} przejść/s  "
+              f"(skalowanie x{rate / base:.2f}, gry: {result['games']})")
+
+if __name__ == "__main__":
+    main()
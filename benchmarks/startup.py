@@ -0,0 +1,77 @@
+"""Czas zimnego startu: osobny proces Pythona dla każdego pomiaru
+
+Mierzy medianę czasu (ms) od uruchomienia interpretera do końca polecenia
+dla pustego Pythona, importów modułów bez okna i poleceń snake_cli.py
+oraz sprawdza, czy polecenie nie załadowało pygame ani numpy.
+
+Uruchomienie: python -m benchmarks.startup [--runs 15]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Uruchamia kod, a na końcu wypisuje na stderr załadowane ciężkie moduły
+PROBE = ("import sys, runpy\n"
+         "sys.argv = {argv!r}\n"
+         "{code}\n"
+         "print(','.join(m for m in ('numpy', 'pygame') if m in sys.modules), file=sys.stderr)")
+
+def cases(models_dir):
+    cli = os.path.join(ROOT, 'snake_cli.py')
+    run_cli = "runpy.run_path({!r}, run_name='__main__')".format(cli)
+    return [
+        ("python (pusty)", [], "pass"),
+        ("import env.snake_env", [], "import env.snake_env"),
+        ("import utils.save_load", [], "import utils.save_load"),
+        ("import agents.factory", [], "import agents.factory"),
+        ("snake_cli.py list", [cli, '--models-dir', models_dir, 'list'], run_cli),
+        ("snake_cli.py report", [cli, '--models-dir', models_dir, 'report'], run_cli),
+        ("snake_cli.py disk", [cli, '--models-dir', models_dir, 'disk'], run_cli),
+        ("import agents.random_agent", [], "import agents.random_agent"),
+        ("import snake_game", [], "import snake_game"),
+    ]
+
+def measure(argv, code, runs):
+    """Zwraca (mediana w ms, ciężkie moduły) dla runs uruchomień"""
+    source = PROBE.format(argv=argv, code=code)
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy')
+    times, heavy = [], ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', source], cwd=ROOT, env=env,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+        times.append(time.perf_counter() - start)
+        heavy = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''
+    return statistics.median(times) * 1000, heavy
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark czasu startu")
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    # Kopia katalogu modeli, żeby pomiar nie tworzył rejestru w models/
+    models_dir = tempfile.mkdtemp(prefix='snake_startup_')
+    try:
+        source = os.path.join(ROOT, 'models')
+        if os.path.isdir(source):
+            for filename in os.listdir(source):
+                if filename.endswith(('.pkl', '.txt', '.seglog')):
+                    shutil.copy(os.path.join(source, filename), models_dir)
+        measure([], "from utils.save_load import ModelManager; ModelManager({!r})".format(models_dir), 1)
+
+        print(f"{'polecenie':<28} {'ms':>8}  załadowane")
+        for name, argv, code in cases(models_dir):
+            milliseconds, heavy = measure(argv, code, args.runs)
+            print(f"{name:<28} {milliseconds:8.1f}  {heavy or '-'}")
+    finally:
+        shutil.rmtree(models_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""Zestaw benchmarków wydajności z wynikami w formacie JSON
+
+Mierzy:
+- kroki/s logiki gry (SnakeEnv.step) przy różnych długościach węża
+- czas generate_food przy coraz pełniejszej planszy
+- koszt ObservationEncoder.update (przyrostowo) względem pełnego przeliczenia
+- SpatialIndex: aktualizacja pola odległości po kroku vs pełny BFS, czas zapytań
+- koszt RandomAgent.record_move i get_detailed_stats przy rosnącej historii
+- wybór akcji: get_action w pętli vs get_actions dla partii (RandomAgent, QAgent)
+- czas ModelManager.save_model/load_model i rozmiar plików względem liczby gier
+- FPS GameRenderer.render_frame (SDL_VIDEODRIVER=dummy)
+- obserwacja pikselowa: PixelEncoder przyrostowo i od zera vs okno pygame
+  z odczytem ekranu, BatchPixelEncoder na grę
+
+Uruchomienie: python -m benchmarks.suite [--output wyniki.json] [--quick]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+
+from agents.q_agent import QAgent
+from agents.random_agent import RandomAgent
+from env.batch_env import BatchSnakeEnv
+from env.observation import ObservationEncoder
+from env.pixels import BatchPixelEncoder, PixelEncoder
+from env.snake_env import SnakeEnv, ACTION_DIRECTIONS, DIRECTION_ACTIONS
+from env.spatial import SpatialIndex
+from utils.save_load import ModelManager
+
+def hamiltonian_cycle(grid_count):
+    """Zwraca cykl przez wszystkie pola planszy (grid_count parzyste)"""
+    cycle = []
+    for y in range(grid_count):
+        xs = range(1, grid_count) if y % 2 == 0 else range(grid_count - 1, 0, -1)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in range(grid_count - 1, -1, -1))
+    return cycle
+
+def make_long_snake(env, length):
+    """Ustawia w env węża o zadanej długości leżącego na cyklu Hamiltona
+
+    Zwraca słownik pole -> akcja prowadząca do następnego pola cyklu.
+    """
+    cycle = hamiltonian_cycle(env.grid_count)
+    env.reset()
+    for x, y in env.snake:
+        env._release(y * env.grid_count + x)
+    env.snake.clear()
+    for x, y in cycle[:length]:
+        env.snake.appendleft((x, y))
+        env._occupy(y * env.grid_count + x)
+    env.food = env.generate_food()
+    env.max_steps_per_game = float('inf')
+
+    next_action = {}
+    for i, (x, y) in enumerate(cycle):
+        nx, ny = cycle[(i + 1) % len(cycle)]
+        next_action[(x, y)] = DIRECTION_ACTIONS[(nx - x, ny - y)]
+    return next_action
+
+def best_of(runs, fn):
+    """Uruchamia fn kilka razy i zwraca najkrótszy czas w sekundach"""
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def bench_engine(lengths, steps):
+    """Kroki/s SnakeEnv.step przy różnych długościach węża"""
+    results = []
+    for length in lengths:
+        env = SnakeEnv()
+        next_action = make_long_snake(env, length)
+        env.food = None  # Bez jedzenia długość węża się nie zmienia
+
+        def run():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+
+        elapsed = best_of(3, run)
+        results.append({'length': length, 'steps_per_sec': round(steps / elapsed)})
+    return results
+
+def bench_food(fill_ratios, calls):
+    """Czas generate_food w mikrosekundach przy różnym zapełnieniu planszy"""
+    results = []
+    for ratio in fill_ratios:
+        env = SnakeEnv()
+        length = max(1, min(env.num_cells - 1, int(env.num_cells * ratio)))
+        make_long_snake(env, length)
+
+        def run():
+            for _ in range(calls):
+                env.generate_food()
+
+        elapsed = best_of(3, run)
+        results.append({'snake_length': length, 'fill_ratio': ratio,
+                        'generate_food_us': round(elapsed / calls * 1e6, 3)})
+    return results
+
+def bench_observation(lengths, steps):
+    """Mikrosekundy na ObservationEncoder.update po kroku: przyrostowo i od zera"""
+    results = []
+    for length in lengths:
+        env = SnakeEnv()
+        next_action = make_long_snake(env, length)
+        env.food = None
+        encoder = ObservationEncoder(env)
+
+        def incremental():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                encoder.update()
+
+        def rebuild():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                encoder._rebuild()
+                encoder._update_features()
+
+        def step_only():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+
+        base = best_of(3, step_only)
+        results.append({
+            'length': length,
+            'incremental_us': round(max(0.0, best_of(3, incremental) - base) / steps * 1e6, 3),
+            'rebuild_us': round(max(0.0, best_of(3, rebuild) - base) / steps * 1e6, 3),
+        })
+    return results
+
+def bench_spatial(lengths, steps):
+    """Mikrosekundy na SpatialIndex.update po kroku (przyrostowo i od zera) i na zapytania"""
+    results = []
+    for length in lengths:
+        env = SnakeEnv()
+        next_action = make_long_snake(env, length)
+        spatial = SpatialIndex(env.grid_count)
+
+        def incremental():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                spatial.update(env.snake, env.food)
+
+        def rebuild():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                spatial._rebuild(env.snake)
+                spatial._rebuild_distance()
+
+        def step_only():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+
+        def queries(query):
+            action = next_action[env.snake[0]]
+            return lambda: [query(action) for _ in range(steps)]
+
+        base = best_of(3, step_only)
+        row = {
+            'length': length,
+            'incremental_us': round(max(0.0, best_of(3, incremental) - base) / steps * 1e6, 3),
+            'rebuild_us': round(max(0.0, best_of(3, rebuild) - base) / steps * 1e6, 3),
+        }
+        spatial.update(env.snake, env.food)
+        row['is_safe_us'] = round(best_of(3, queries(spatial.is_safe)) / steps * 1e6, 3)
+        row['food_distance_us'] = round(best_of(3, queries(spatial.food_distance)) / steps * 1e6, 3)
+        area = queries(lambda action: spatial.reachable_area(action, len(env.snake)))
+        row['reachable_area_us'] = round(best_of(3, area) / steps * 1e6, 3)
+        results.append(row)
+    return results
+
+def fill_history(agent, moves):
+    """Wypełnia historię agenta moves losowymi ruchami (wektorowo)"""
+    rng = np.random.default_rng(0)
+    agent.movement_history.extend({
+        'timestamp': np.full(moves, time.time()),
+        'head_x': rng.integers(0, 30, moves), 'head_y': rng.integers(0, 30, moves),
+        'length': np.ones(moves, dtype=np.int32),
+        'food_x': rng.integers(0, 30, moves), 'food_y': rng.integers(0, 30, moves),
+        'direction': rng.integers(0, 4, moves), 'action': rng.integers(0, 4, moves),
+        'reward': rng.integers(-1, 2, moves),
+    })
+
+def bench_recording(history_sizes, calls):
+    """Koszt record_move i get_detailed_stats przy rosnącej historii"""
+    results = []
+    snake, new_snake = [(5, 5), (4, 5)], [(6, 5), (5, 5)]
+    for size in history_sizes:
+        agent = RandomAgent()
+        fill_history(agent, size)
+
+        def record():
+            for _ in range(calls):
+                agent.record_move(snake[0], len(snake), (9, 9), [1, 0], 3, 0, new_snake, (9, 9), False)
+
+        def stats():
+            for _ in range(calls // 10):
+                agent.get_detailed_stats()
+
+        results.append({
+            'history_moves': size,
+            'record_move_us': round(best_of(3, record) / calls * 1e6, 3),
+            'get_detailed_stats_us': round(best_of(3, stats) / (calls // 10) * 1e6, 3),
+        })
+    return results
+
+def play_games(agent, env, games):
+    """Rozgrywa games gier agentem w bezgłowym silniku, nagrywając ruchy"""
+    played = 0
+    while played < games:
+        snake, food, direction = env.get_observation()
+        action = agent.get_action(snake, food, direction)
+        head, length, old_direction = snake[0], len(snake), list(direction)
+        _, reward, done = env.step(action)
+        agent.record_move(head, length, food, old_direction, action, reward,
+                          None if done else env.snake, env.food, done)
+        if done:
+            played += 1
+            env.reset()
+
+def bench_persistence(game_counts):
+    """Czas save_model/load_model i rozmiar plików względem liczby gier"""
+    results = []
+    models_dir = tempfile.mkdtemp(prefix='snake_bench_')
+    try:
+        manager = ModelManager(models_dir)
+        agent, env = RandomAgent(), SnakeEnv()
+        played = 0
+        for games in game_counts:
+            play_games(agent, env, games - played)
+            played = games
+            filename = f"bench_{games}.pkl"
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                manager.save_model(agent, games, 0, filename)
+                save_s = time.perf_counter() - start
+                start = time.perf_counter()
+                ModelManager(models_dir).load_model(filename)
+                load_s = time.perf_counter() - start
+            pkl_size = os.path.getsize(os.path.join(models_dir, filename))
+            total_size = sum(os.path.getsize(os.path.join(models_dir, f)) for f in os.listdir(models_dir))
+            results.append({
+                'games_played': games,
+                'moves_recorded': agent.movement_history.total,
+                'save_ms': round(save_s * 1000, 3),
+                'load_ms': round(load_s * 1000, 3),
+                'pkl_bytes': pkl_size,
+                'models_dir_bytes': total_size,
+            })
+    finally:
+        shutil.rmtree(models_dir, ignore_errors=True)
+    return results
+
+def bench_rendering(lengths, frames):
+    """FPS render_frame (tryb klasyczny i dirty_rects) przy różnych długościach"""
+    import pygame
+    from utils.visualization import GameRenderer
+
+    class _Game:
+        agent_mode = True
+        auto_agent = True
+        auto_restart = False
+
+    pygame.init()
+    screen = pygame.display.set_mode((600, 600))
+    results = []
+    for dirty in (False, True):
+        for length in lengths:
+            env = SnakeEnv()
+            next_action = make_long_snake(env, length)
+            renderer = GameRenderer(screen, 600, 20, _Game(), dirty_rects=dirty)
+
+            def run():
+                for _ in range(frames):
+                    env.step(next_action[env.snake[0]])
+                    renderer.render_frame(env.snake, env.food, env.score, "Agent", 1,
+                                          env.current_game_steps, False, env.game_over,
+                                          step_id=(env.episode, env.moves))
+
+            elapsed = best_of(2, run)
+            results.append({'mode': 'dirty_rects' if dirty else 'classic',
+                            'length': length, 'fps': round(frames / elapsed, 1)})
+    pygame.quit()
+    return results
+
+def bench_pixels(lengths, steps, batch_size=256):
+    """Mikrosekundy na obserwację pikselową (ramka RGB 30x30 pól po 3 piksele, stos 4 ramek)"""
+    import pygame
+    from utils.visualization import GameRenderer
+
+    pygame.init()
+    screen = pygame.display.set_mode((90, 90))
+    results = []
+    for length in lengths:
+        env = SnakeEnv()
+        next_action = make_long_snake(env, length)
+        env.food = None
+        encoder = PixelEncoder(env, cell_size=3, stack=4)
+        renderer = GameRenderer(screen, 90, 3)
+
+        def incremental():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                encoder.update()
+
+        def rebuild():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                encoder._rebuild()
+
+        def display():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+                renderer.compose_frame(env.snake, env.food, env.score, "Agent", hud=False)
+                pygame.display.flip()
+                pygame.surfarray.array3d(screen)
+
+        def step_only():
+            for _ in range(steps):
+                env.step(next_action[env.snake[0]])
+
+        base = best_of(3, step_only)
+        results.append({
+            'length': length,
+            'incremental_us': round(max(0.0, best_of(3, incremental) - base) / steps * 1e6, 3),
+            'rebuild_us': round(max(0.0, best_of(3, rebuild) - base) / steps * 1e6, 3),
+            'pygame_display_us': round(max(0.0, best_of(3, display) - base) / steps * 1e6, 3),
+        })
+    pygame.quit()
+
+    batch_env = BatchSnakeEnv(batch_size, seed=0)
+    batch_encoder = BatchPixelEncoder(batch_env, cell_size=3, stack=4)
+    agent = RandomAgent()
+    agent.batch_rng = np.random.default_rng(0)
+    actions = [agent.get_actions(batch_env.get_observation()) for _ in range(steps // 10)]
+
+    def batch_steps(encode):
+        def run():
+            for step_actions in actions:
+                batch_env.step(step_actions)
+                if encode:
+                    batch_encoder.update()
+        return run
+
+    base = best_of(3, batch_steps(False))
+    batched = max(0.0, best_of(3, batch_steps(True)) - base)
+    results.append({'batch_size': batch_size,
+                    'batch_us_per_game': round(batched / len(actions) / batch_size * 1e6, 3)})
+    return results
+
+def bench_policy(batch_sizes):
+    """Mikrosekundy na akcję: get_action wołane dla każdej gry vs jedno get_actions"""
+    results = []
+    for agent in (RandomAgent(), QAgent(seed=0)):
+        for size in batch_sizes:
+            observations = BatchSnakeEnv(size, seed=0).get_observation()
+            states = [([tuple(head)], tuple(food), list(ACTION_DIRECTIONS[direction]))
+                      for head, food, direction in zip(observations['heads'].tolist(),
+                                                       observations['food'].tolist(),
+                                                       observations['directions'].tolist())]
+
+            def per_call():
+                for snake, food, direction in states:
+                    agent.get_action(snake, food, direction)
+
+            def batched():
+                agent.get_actions(observations)
+
+            results.append({
+                'agent': agent.__class__.__name__,
+                'batch_size': size,
+                'per_call_us': round(best_of(3, per_call) / size * 1e6, 3),
+                'batched_us': round(best_of(3, batched) / size * 1e6, 3),
+            })
+    return results
+
+def run_suite(quick=False):
+    """Uruchamia wszystkie benchmarki i zwraca wyniki jako słownik"""
+    scale = 10 if quick else 1
+    lengths = [1, 100, 400, 800]
+    results = {
+        'engine': bench_engine(lengths, 50000 // scale),
+        'generate_food': bench_food([0.0, 0.5, 0.9, 0.99], 20000 // scale),
+        'observation': bench_observation(lengths, 20000 // scale),
+        'spatial': bench_spatial(lengths, 2000 // scale),
+        'recording': bench_recording([0, 10_000, 100_000, 1_000_000] if not quick
+                                     else [0, 10_000, 100_000], 20000 // scale),
+        'policy': bench_policy([1, 64, 1024] if quick else [1, 64, 1024, 16384]),
+        'persistence': bench_persistence([50, 200, 500] if quick else [50, 500, 2000, 5000]),
+        'rendering': bench_rendering(lengths, 300 // scale),
+        'pixels': bench_pixels(lengths, 2000 // scale),
+    }
+    try:
+        import pygame
+        pygame_version = pygame.version.ver
+    except ImportError:
+        pygame_version = None
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pygame': pygame_version,
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarki wydajności Snake RL")
+    parser.add_argument('--output', help="plik JSON z wynikami (domyślnie stdout)")
+    parser.add_argument('--quick', action='store_true', help="krótsze pomiary")
+    args = parser.parse_args()
+
+    random.seed(0)
+    report = run_suite(args.quick)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        print(f"Wyniki zapisane: {args.output}")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""Rozmiar i szybkość odczytu historii ruchów: pickle vs pliki .straj
+
+Porównuje bajty na ruch i ruchy/s odczytu dla:
+- dawnej historii (lista słowników w pickle agenta),
+- pickle ReplayBuffer (kolumny NumPy),
+- eksportu utils.trajectory (zlib i lzma, odczyt iter_batches).
+
+Uruchomienie: python -m benchmarks.trajectory [--moves 200000] [--batch 4096]
+"""
+import argparse
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+
+from agents.random_agent import RandomAgent
+from env.snake_env import SnakeEnv
+from utils.trajectory import export_history, iter_batches
+
+def record_games(moves, seed=0):
+    """Nagrywa gry RandomAgent, aż historia będzie miała co najmniej moves ruchów"""
+    random.seed(seed)
+    env = SnakeEnv()
+    agent = RandomAgent(history_capacity=moves)
+    while agent.movement_history.total < moves:
+        env.reset()
+        while True:
+            head, length, food, direction = env.snake[0], len(env.snake), env.food, env.direction.copy()
+            action = agent.get_action(env.snake, env.food, env.direction)
+            _, reward, done = env.step(action)
+            if done:
+                agent.record_move(head, length, food, direction, action, reward, None, food, True)
+                break
+            agent.record_move(head, length, food, direction, action, reward, env.snake, env.food, False)
+    return agent.movement_history
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark eksportu trajektorii")
+    parser.add_argument('--moves', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=4096)
+    args = parser.parse_args()
+
+    buffer = record_games(args.moves)
+    rows = len(buffer)
+    results = []
+
+    # Dawny format: lista słowników w pickle
+    legacy = pickle.dumps([buffer.get_move(row) for row in range(buffer.first_row, buffer.total)])
+    _, seconds = timed(lambda: pickle.loads(legacy))
+    results.append(("pickle (lista słowników)", len(legacy), rows, seconds))
+
+    # Pickle bufora kolumnowego
+    columnar = pickle.dumps(buffer)
+    _, seconds = timed(lambda: pickle.loads(columnar))
+    results.append(("pickle (ReplayBuffer)", len(columnar), rows, seconds))
+
+    for codec in ('zlib', 'lzma'):
+        directory = tempfile.mkdtemp()
+        try:
+            writer = export_history(buffer, directory, codec)
+            size = sum(os.path.getsize(path) for path in writer.paths)
+            _, seconds = timed(lambda: sum(len(batch['action']) for batch in iter_batches(directory, args.batch)))
+            results.append((f".straj ({codec})", size, writer.rows_written, seconds))
+            _, seconds = timed(lambda: sum(len(batch['action'])
+                                           for batch in iter_batches(directory, args.batch, ['action', 'reward'])))
+            results.append((f".straj ({codec}, 2 kolumny)", size, writer.rows_written, seconds))
+        finally:
+            shutil.rmtree(directory)
+
+    print(f"{'format':<28} {'B/ruch':>8} {'ruchy/s odczytu':>16}")
+    for name, size, count, seconds in results:
+        print(f"{name:<28} {size / count:8.2f} {count / seconds:16,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Env package
\ No newline at end of file
@@ -0,0 +1,185 @@
+import numpy as np
+
+from env.snake_env import (GRID_COUNT, MAX_STEPS_PER_GAME, ACTION_DIRECTIONS,
+                           REWARD_FOOD, REWARD_DEATH, REWARD_NONE)
+
+# Przesunięcia dla akcji (0=góra, 1=dół, 2=lewo, 3=prawo)
+ACTION_DX = np.array([d[0] for d in ACTION_DIRECTIONS], dtype=np.int32)
+ACTION_DY = np.array([d[1] for d in ACTION_DIRECTIONS], dtype=np.int32)
+
+# Kody przyczyn końca gry
+CAUSE_NONE = 0
+CAUSE_WALL = 1
+CAUSE_SELF = 2
+CAUSE_TIMEOUT = 3
+CAUSE_WIN = 4
+CAUSE_NAMES = {CAUSE_NONE: None, CAUSE_WALL: 'wall', CAUSE_SELF: 'self',
+               CAUSE_TIMEOUT: 'timeout', CAUSE_WIN: 'win'}
+
+# Ile razy losować pole dla jedzenia zanim przejdziemy na losowanie z wolnych pól
+FOOD_SAMPLING_ROUNDS = 4
+
+class BatchSnakeEnv:
+    """N niezależnych gier Snake krokowanych jednocześnie w NumPy
+
+    Zasady są takie same jak w SnakeEnv (ściany, kolizja z ciałem, jedzenie,
+    limit kroków, nagrody -1/0/+1). Plansze, głowy, ciała i jedzenie są
+    trzymane w tablicach, a step() przesuwa wszystkie gry jedną serią
+    operacji tablicowych. Zakończone gry są automatycznie resetowane.
+
+    Ciało węża to bufor cykliczny numerów pól (y * grid_count + x) - głowa
+    jest pod head_ptr, ogon length - 1 pozycji wcześniej.
+    """
+
+    def __init__(self, num_envs, grid_count=GRID_COUNT,
+                 max_steps_per_game=MAX_STEPS_PER_GAME, seed=None):
+        self.num_envs = num_envs
+        self.grid_count = grid_count
+        self.num_cells = grid_count * grid_count
+        self.max_steps_per_game = max_steps_per_game
+        self.rng = np.random.default_rng(seed)
+
+        n, cells = num_envs, self.num_cells
+        self.board = np.zeros((n, cells), dtype=bool)  # Zajętość pól przez węża
+        self.body = np.zeros((n, cells), dtype=np.int32)  # Bufor cykliczny ciała
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.heads = np.zeros((n, 2), dtype=np.int32)  # [x, y]
+        self.food = np.zeros((n, 2), dtype=np.int32)  # [x, y]
+        self.food_cell = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)  # Indeks akcji
+        self.steps = np.zeros(n, dtype=np.int32)
+        self.score = np.zeros(n, dtype=np.int32)
+
+        # Wyniki ostatnio zakończonych gier (przed automatycznym resetem)
+        self.final_score = np.zeros(n, dtype=np.int32)
+        self.final_length = np.zeros(n, dtype=np.int32)
+        self.death_cause = np.zeros(n, dtype=np.int8)
+
+        self._all = np.arange(n)
+        # Obserwacja to widoki na wewnętrzne tablice (ważne do następnego kroku)
+        self._observation = {
+            'heads': self.heads,
+            'food': self.food,
+            'directions': self.direction,
+            'lengths': self.length,
+            'board': self.board.reshape(n, grid_count, grid_count),
+        }
+        self.reset()
+
+    def reset(self):
+        """Resetuje wszystkie gry i zwraca obserwację"""
+        self._reset_envs(self._all)
+        self.death_cause[:] = CAUSE_NONE
+        return self._observation
+
+    def get_observation(self):
+        """Zwraca słownik widoków: heads, food, directions, lengths, board"""
+        return self._observation
+
+    def step(self, actions):
+        """Wykonuje krok we wszystkich grach i zwraca (obserwacja, nagrody, końce)
+
+        actions - tablica N akcji (0-3). Nagrody mają wartości -1/0/+1 jak
+        w SnakeEnv. Gry zakończone w tym kroku są od razu resetowane, a ich
+        wynik i przyczyna końca trafiają do final_score i death_cause.
+        """
+        actions = np.asarray(actions, dtype=np.int8)
+        g = self.grid_count
+        self.direction[:] = actions
+        self.steps += 1
+
+        # Nowe pozycje głów
+        new_x = self.heads[:, 0] + ACTION_DX[actions]
+        new_y = self.heads[:, 1] + ACTION_DY[actions]
+        wall = (new_x < 0) | (new_x >= g) | (new_y < 0) | (new_y >= g)
+        new_cell = np.where(wall, 0, new_y * g + new_x)
+
+        # Kolizja z ciałem sprawdzana przed przesunięciem ogona (jak w SnakeEnv)
+        hit_self = ~wall & self.board[self._all, new_cell]
+        timeout = ~wall & ~hit_self & (self.steps >= self.max_steps_per_game)
+        dead = wall | hit_self | timeout
+        alive = ~dead
+        ate = alive & (new_cell == self.food_cell)
+
+        rewards = np.full(self.num_envs, REWARD_NONE, dtype=np.int8)
+        rewards[wall | hit_self] = REWARD_DEATH
+        rewards[ate] = REWARD_FOOD
+
+        self.death_cause[:] = CAUSE_NONE
+        self.death_cause[wall] = CAUSE_WALL
+        self.death_cause[hit_self] = CAUSE_SELF
+        self.death_cause[timeout] = CAUSE_TIMEOUT
+
+        # Usunięcie ogona w grach, w których wąż nie zjadł jedzenia
+        moved = np.flatnonzero(alive & ~ate)
+        tail_ptr = (self.head_ptr[moved] - self.length[moved] + 1) % self.num_cells
+        self.board[moved, self.body[moved, tail_ptr]] = False
+
+        # Dodanie nowej głowy
+        living = np.flatnonzero(alive)
+        cells = new_cell[living]
+        self.head_ptr[living] = (self.head_ptr[living] + 1) % self.num_cells
+        self.body[living, self.head_ptr[living]] = cells
+        self.board[living, cells] = True
+        self.heads[living, 0] = new_x[living]
+        self.heads[living, 1] = new_y[living]
+
+        # Jedzenie: wydłużenie, punkt i reset licznika kroków
+        eaters = np.flatnonzero(ate)
+        self.length[eaters] += 1
+        self.score[eaters] += 1
+        self.steps[eaters] = 0
+
+        # Pełna plansza to wygrana - nie ma już miejsca na jedzenie
+        won = eaters[self.length[eaters] == self.num_cells]
+        self.death_cause[won] = CAUSE_WIN
+        dead[won] = True
+        self._place_food(eaters[self.length[eaters] < self.num_cells])
+
+        # Automatyczny reset zakończonych gier
+        done = np.flatnonzero(dead)
+        if done.size:
+            self.final_score[done] = self.score[done]
+            self.final_length[done] = self.length[done]
+            self._reset_envs(done)
+
+        return self._observation, rewards, dead
+
+    def _reset_envs(self, idx):
+        """Resetuje wybrane gry do stanu początkowego"""
+        center = self.grid_count // 2
+        start_cell = center * self.grid_count + center
+        self.board[idx] = False
+        self.board[idx, start_cell] = True
+        self.body[idx, 0] = start_cell
+        self.head_ptr[idx] = 0
+        self.length[idx] = 1
+        self.heads[idx] = center
+        self.direction[idx] = 3  # Początkowo w prawo
+        self.steps[idx] = 0
+        self.score[idx] = 0
+        self._place_food(idx)
+
+    def _place_food(self, idx):
+        """Losuje jedzenie na wolnych polach dla wybranych gier"""
+        pending = np.asarray(idx)
+        # Losowanie z odrzucaniem - szybkie, gdy plansze są w większości puste
+        for _ in range(FOOD_SAMPLING_ROUNDS):
+            if pending.size == 0:
+                return
+            cells = self.rng.integers(0, self.num_cells, pending.size)
+            free = ~self.board[pending, cells]
+            self._set_food(pending[free], cells[free])
+            pending = pending[~free]
+        if pending.size == 0:
+            return
+        # Prawie pełne plansze - losowy wybór spośród wolnych pól
+        weights = self.rng.random((pending.size, self.num_cells))
+        weights[self.board[pending]] = -1.0
+        self._set_food(pending, weights.argmax(axis=1))
+
+    def _set_food(self, idx, cells):
+        self.food_cell[idx] = cells
+        self.food[idx, 0] = cells % self.grid_count
+        self.food[idx, 1] = cells // self.grid_count
@@ -0,0 +1,135 @@
+import numpy as np
+
+# Wartości pól siatki obserwacji
+CELL_EMPTY = 0
+CELL_BODY = 1
+CELL_HEAD = 2
+CELL_FOOD = 3
+
+# Cechy (uint8, 0/1): niebezpieczeństwo względem kierunku ruchu,
+# aktualny kierunek (one-hot) i położenie jedzenia względem głowy
+FEATURE_NAMES = (
+    'danger_straight', 'danger_right', 'danger_left',
+    'dir_up', 'dir_down', 'dir_left', 'dir_right',
+    'food_up', 'food_down', 'food_left', 'food_right',
+)
+NUM_FEATURES = len(FEATURE_NAMES)
+
+class ObservationEncoder:
+    """Zakodowana obserwacja SnakeEnv aktualizowana przyrostowo
+
+    Siatka uint8 (grid[y, x]) i wektor cech leżą w jednym buforze.
+    update() po jednym ruchu zmienia tylko pola głowy, poprzedniej głowy,
+    ogona i jedzenia - O(1) niezależnie od długości węża. Pełne przeliczenie
+    jest robione tylko po resecie gry lub gdy stan zmienił się poza step().
+
+    Agenci dostają widoki tylko do odczytu (grid, features, flat) - zawsze
+    te same obiekty, bez alokacji w każdym kroku. Kto chce je zachować
+    (np. w historii), musi zrobić kopię.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        grid_count = env.grid_count
+        self._buffer = np.zeros(grid_count * grid_count + NUM_FEATURES, dtype=np.uint8)
+        self._cells = self._buffer[:grid_count * grid_count]
+        self._features = self._buffer[grid_count * grid_count:]
+
+        # Widoki tylko do odczytu dla agentów
+        self.flat = self._buffer.view()
+        self.flat.flags.writeable = False
+        self.grid = self._cells.view().reshape(grid_count, grid_count)
+        self.grid.flags.writeable = False
+        self.features = self._features.view()
+        self.features.flags.writeable = False
+
+        # Stan, do którego odnosi się zawartość bufora
+        self._episode = None
+        self._moves = None
+        self._head = None
+        self._tail = None
+        self._length = 0
+        self._food = None
+        self.full_rebuilds = 0
+        self.update()
+
+    def update(self):
+        """Synchronizuje bufor ze stanem silnika i zwraca (grid, features)"""
+        env = self.env
+        if env.episode == self._episode and env.moves == self._moves + 1:
+            self._apply_move()
+        elif env.episode != self._episode or env.moves != self._moves:
+            self._rebuild()
+        self._update_features()
+        return self.grid, self.features
+
+    def _rebuild(self):
+        """Przelicza całą siatkę od zera"""
+        env = self.env
+        grid_count = env.grid_count
+        cells = self._cells
+        cells[:] = CELL_EMPTY
+        for x, y in env.snake:
+            cells[y * grid_count + x] = CELL_BODY
+        head = env.snake[0]
+        cells[head[1] * grid_count + head[0]] = CELL_HEAD
+        if env.food is not None:
+            cells[env.food[1] * grid_count + env.food[0]] = CELL_FOOD
+        self._remember()
+        self.full_rebuilds += 1
+
+    def _apply_move(self):
+        """Nanosi jeden ruch: nowa głowa, stara głowa w ciele, cofnięty ogon, jedzenie"""
+        env = self.env
+        grid_count = env.grid_count
+        cells = self._cells
+        old_x, old_y = self._head
+        cells[old_y * grid_count + old_x] = CELL_BODY
+        if len(env.snake) == self._length:
+            # Bez jedzenia ogon się cofnął (nowa głowa nie może wejść na ogon)
+            tail_x, tail_y = self._tail
+            cells[tail_y * grid_count + tail_x] = CELL_EMPTY
+        head = env.snake[0]
+        cells[head[1] * grid_count + head[0]] = CELL_HEAD
+        if env.food != self._food and env.food is not None:
+            cells[env.food[1] * grid_count + env.food[0]] = CELL_FOOD
+        self._remember()
+
+    def _remember(self):
+        """Zapamiętuje stan silnika odzwierciedlony w buforze"""
+        env = self.env
+        self._episode = env.episode
+        self._moves = env.moves
+        self._head = env.snake[0]
+        self._tail = env.snake[-1]
+        self._length = len(env.snake)
+        self._food = env.food
+
+    def _update_features(self):
+        """Przelicza wektor cech (O(1))"""
+        env = self.env
+        features = self._features
+        head_x, head_y = env.snake[0]
+        dx, dy = env.direction
+        features[0] = self._is_danger(head_x + dx, head_y + dy)
+        features[1] = self._is_danger(head_x - dy, head_y + dx)  # Skręt w prawo
+        features[2] = self._is_danger(head_x + dy, head_y - dx)  # Skręt w lewo
+        features[3] = dy < 0
+        features[4] = dy > 0
+        features[5] = dx < 0
+        features[6] = dx > 0
+        food = env.food
+        if food is None:
+            features[7:11] = 0
+        else:
+            features[7] = food[1] < head_y
+            features[8] = food[1] > head_y
+            features[9] = food[0] < head_x
+            features[10] = food[0] > head_x
+
+    def _is_danger(self, x, y):
+        """Czy wejście na pole (x, y) kończy grę (ściana lub ciało, łącznie z ogonem)"""
+        grid_count = self.env.grid_count
+        if x < 0 or x >= grid_count or y < 0 or y >= grid_count:
+            return 1
+        return self.env.occupied[y * grid_count + x]
@@ -0,0 +1,288 @@
+import numpy as np
+
+from env.observation import CELL_BODY, CELL_EMPTY, CELL_FOOD, CELL_HEAD
+
+# Kolory pól jak w GameRenderer (tryb agenta): puste, ciało, głowa, jedzenie
+RGB_PALETTE = np.zeros((4, 3), dtype=np.uint8)
+RGB_PALETTE[CELL_EMPTY] = (0, 0, 0)
+RGB_PALETTE[CELL_BODY] = (128, 0, 128)
+RGB_PALETTE[CELL_HEAD] = (255, 255, 0)
+RGB_PALETTE[CELL_FOOD] = (255, 0, 0)
+GRAY_PALETTE = np.round(RGB_PALETTE @ np.array([0.299, 0.587, 0.114])).astype(np.uint8)[:, None]
+
+class PixelRasterizer:
+    """Rysuje pola planszy (kody CELL_*) do ramek uint8 bez pygame
+
+    cell_size - piksele na bok pola, downsample - pola na bok piksela
+    (kolor piksela to średnia kolorów pól bloku). Ramka ma bok
+    grid_count * cell_size // downsample i 3 kanały (RGB) albo 1 (odcienie
+    szarości). Ramki są trzymane płasko: (..., piksele, kanały).
+    """
+
+    def __init__(self, grid_count, cell_size=1, downsample=1, grayscale=False):
+        if cell_size < 1 or downsample < 1 or (cell_size > 1 and downsample > 1):
+            raise ValueError("cell_size i downsample muszą być >= 1 i tylko jedno z nich > 1")
+        if grid_count % downsample:
+            raise ValueError(f"Rozmiar planszy {grid_count} nie dzieli się przez downsample={downsample}")
+        self.grid_count = grid_count
+        self.cell_size = cell_size
+        self.downsample = downsample
+        self.size = grid_count * cell_size // downsample
+        self.palette = GRAY_PALETTE if grayscale else RGB_PALETTE
+        self.channels = self.palette.shape[1]
+
+        cells = np.arange(grid_count * grid_count)
+        y, x = np.divmod(cells, grid_count)
+        if downsample == 1:
+            # Piksele każdego pola (pola, cell_size^2)
+            dy, dx = np.divmod(np.arange(cell_size * cell_size), cell_size)
+            self.cell_pixels = (y[:, None] * cell_size + dy) * self.size + x[:, None] * cell_size + dx
+        else:
+            # Piksel każdego pola i pola każdego piksela (piksele, downsample^2)
+            self.cell_pixel = (y // downsample) * self.size + x // downsample
+            py, px = np.divmod(np.arange(self.size * self.size), self.size)
+            dy, dx = np.divmod(np.arange(downsample * downsample), downsample)
+            self.block_cells = (py[:, None] * downsample + dy) * grid_count + px[:, None] * downsample + dx
+
+    def render(self, kinds, out):
+        """Rysuje całe plansze kinds (N, pola) do out (N, piksele, kanały)"""
+        colors = self.palette[kinds]
+        n, g, k, c = len(kinds), self.grid_count, self.downsample, self.cell_size
+        if k > 1:
+            blocks = colors.reshape(n, g // k, k, g // k, k, self.channels).sum(axis=(2, 4), dtype=np.uint32)
+            out[:] = ((blocks + k * k // 2) // (k * k)).reshape(n, -1, self.channels)
+        elif c > 1:
+            image = colors.reshape(n, g, g, self.channels).repeat(c, axis=1).repeat(c, axis=2)
+            out[:] = image.reshape(n, -1, self.channels)
+        else:
+            out[:] = colors
+
+    def paint(self, kinds, games, cells, out):
+        """Przerysowuje pola cells gier games (tablice tej samej długości) w out (N, piksele, kanały)"""
+        k = self.downsample
+        if k == 1:
+            out[games[:, None], self.cell_pixels[cells]] = self.palette[kinds[games, cells]][:, None]
+            return
+        pixels = self.cell_pixel[cells]
+        colors = self.palette[kinds[games[:, None], self.block_cells[pixels]]]
+        out[games, pixels] = (colors.sum(axis=1, dtype=np.uint32) + k * k // 2) // (k * k)
+
+class FrameStack:
+    """Bufor ostatnich stack ramek N gier z widokiem bez kopiowania
+
+    Ramki leżą w buforze (2 * stack, N, bok * bok, kanały), a kolejna ramka
+    trafia do następnego miejsca - okno ostatnich stack ramek jest zawsze
+    ciągłym wycinkiem bufora (widok, nie kopia). Nowa ramka to kopia
+    poprzedniej (jeden ciągły blok pamięci dla wszystkich gier) domalowana
+    w zmienionych polach. Po dojściu do końca bufora ostatnie ramki są
+    przenoszone na początek (średnio niecała jedna kopia ramki na krok).
+    Przy stack=1 ramka jest rysowana w miejscu.
+    """
+
+    def __init__(self, num_games, stack, size, channels):
+        self.stack = stack
+        self.size = size
+        self.channels = channels
+        self.buffer = np.zeros((2 * stack if stack > 1 else 1, num_games, size * size, channels), dtype=np.uint8)
+        self.position = stack - 1  # Miejsce bieżącej ramki
+
+    @property
+    def current(self):
+        """Bieżąca ramka wszystkich gier (N, piksele, kanały) - widok do rysowania"""
+        return self.buffer[self.position]
+
+    def advance(self):
+        """Przechodzi do nowej ramki - kopii poprzedniej, do domalowania zmian"""
+        if self.stack == 1:
+            return
+        buffer, stack = self.buffer, self.stack
+        if self.position + 1 == len(buffer):
+            buffer[:stack - 1] = buffer[self.position - stack + 2:self.position + 1]
+            self.position = stack - 2
+        np.copyto(buffer[self.position + 1], buffer[self.position])
+        self.position += 1
+
+    def fill(self, games):
+        """Wypełnia okno gier games kopiami bieżącej ramki (początek gry)"""
+        if self.stack > 1:
+            self.buffer[self.position - self.stack + 1:self.position, games] = self.buffer[self.position, games]
+
+    def window(self):
+        """Zwraca widok tylko do odczytu ostatnich ramek: (N, stack, bok, bok, 3)
+
+        Bez osi stack przy stack=1 i bez osi kanałów dla odcieni szarości.
+        """
+        frames = self.buffer[self.position - self.stack + 1:self.position + 1]
+        frames = frames.reshape(frames.shape[:2] + (self.size, self.size, self.channels)).swapaxes(0, 1)
+        if self.channels == 1:
+            frames = frames[..., 0]
+        if self.stack == 1:
+            frames = frames[:, 0]
+        frames.flags.writeable = False
+        return frames
+
+class PixelEncoder:
+    """Obserwacja pikselowa SnakeEnv rysowana wprost do tablicy NumPy
+
+    update() po jednym ruchu przerysowuje tylko pola, które mogły się
+    zmienić (poprzednia i nowa głowa, ogon, stare i nowe jedzenie) - O(1)
+    niezależnie od długości węża. Pełne rysowanie jest robione po resecie
+    gry albo gdy stan zmienił się poza step(). Z stack > 1 obserwacja to
+    stack ostatnich ramek (na początku gry kopie pierwszej).
+
+    update() zwraca widok tylko do odczytu na bufor enkodera: (bok, bok, 3)
+    dla RGB, (bok, bok) dla odcieni szarości, z osią stack na początku przy
+    stack > 1. Widok jest ważny do następnego update() - kto chce go
+    zachować, musi zrobić kopię.
+
+    Agenci z get_action_from_pixels(frames) dostają tę obserwację
+    w SnakeGame i utils.tournament (ustawienia z pixel_encoder_for).
+    """
+
+    def __init__(self, env, cell_size=1, downsample=1, grayscale=False, stack=1):
+        self.env = env
+        self.rasterizer = PixelRasterizer(env.grid_count, cell_size, downsample, grayscale)
+        self.frames = FrameStack(1, stack, self.rasterizer.size, self.rasterizer.channels)
+        self._kinds = np.zeros((1, env.grid_count * env.grid_count), dtype=np.uint8)
+        self._games = np.zeros(5, dtype=np.int64)  # Indeks gry (zawsze 0) dla pól do przerysowania
+        self._observation = None
+
+        # Stan, do którego odnosi się zawartość bufora
+        self._episode = None
+        self._moves = None
+        self._cells = None  # (głowa, ogon, jedzenie) jako numery pól
+        self.full_rebuilds = 0
+        self.update()
+
+    def update(self):
+        """Synchronizuje ramkę ze stanem silnika i zwraca obserwację (widok)"""
+        env = self.env
+        if env.episode == self._episode and env.moves == self._moves + 1:
+            self.frames.advance()
+            self._apply_move()
+        elif env.episode != self._episode or env.moves != self._moves:
+            self._rebuild()
+        else:
+            return self._observation
+        self._observation = self.frames.window()[0]
+        return self._observation
+
+    def _state_cells(self):
+        env = self.env
+        grid_count = env.grid_count
+        (head_x, head_y), (tail_x, tail_y) = env.snake[0], env.snake[-1]
+        food = -1 if env.food is None else env.food[1] * grid_count + env.food[0]
+        return head_y * grid_count + head_x, tail_y * grid_count + tail_x, food
+
+    def _rebuild(self):
+        """Rysuje całą ramkę od zera i wypełnia nią okno ramek"""
+        env = self.env
+        grid_count = env.grid_count
+        kinds = self._kinds[0]
+        kinds[:] = CELL_EMPTY
+        body = np.fromiter((y * grid_count + x for x, y in env.snake), dtype=np.int64, count=len(env.snake))
+        kinds[body] = CELL_BODY
+        head, _, food = cells = self._state_cells()
+        kinds[head] = CELL_HEAD
+        if food >= 0:
+            kinds[food] = CELL_FOOD
+        self.rasterizer.render(self._kinds, self.frames.current)
+        self.frames.fill(self._games[:1])
+        self._remember(cells)
+        self.full_rebuilds += 1
+
+    def _apply_move(self):
+        """Przerysowuje pola zmienione jednym ruchem"""
+        old_head, old_tail, old_food = self._cells
+        head, tail, food = cells = self._state_cells()
+        kinds = self._kinds[0]
+        occupied = self.env.occupied
+        changed = np.array([old_head, old_tail, old_food, head, food], dtype=np.int64)
+        changed = changed[changed >= 0]
+        for cell in changed.tolist():
+            if cell == food:
+                kinds[cell] = CELL_FOOD
+            elif cell == head:
+                kinds[cell] = CELL_HEAD
+            else:
+                kinds[cell] = CELL_BODY if occupied[cell] else CELL_EMPTY
+        self.rasterizer.paint(self._kinds, self._games[:len(changed)], changed, self.frames.current)
+        self._remember(cells)
+
+    def _remember(self, cells):
+        self._episode = self.env.episode
+        self._moves = self.env.moves
+        self._cells = cells
+
+def pixel_encoder_for(agent, env):
+    """Zwraca PixelEncoder dla agenta (argumenty z opcjonalnego słownika agent.pixel_settings)"""
+    return PixelEncoder(env, **getattr(agent, 'pixel_settings', {}))
+
+class BatchPixelEncoder:
+    """Obserwacje pikselowe wszystkich gier BatchSnakeEnv naraz (N, ...)
+
+    update() trzeba wywołać po każdym step() (i reset()): w grach, które
+    zrobiły ruch, przerysowuje wektorowo tylko pola poprzedniej i nowej
+    głowy, ogona i jedzenia, a gry zresetowane w tym kroku (death_cause)
+    rysuje od nowa. Zwraca widok tylko do odczytu (N, [stack,] bok, bok[, 3])
+    ważny do następnego update().
+    """
+
+    def __init__(self, batch_env, cell_size=1, downsample=1, grayscale=False, stack=1):
+        self.env = batch_env
+        self.rasterizer = PixelRasterizer(batch_env.grid_count, cell_size, downsample, grayscale)
+        n = batch_env.num_envs
+        self.frames = FrameStack(n, stack, self.rasterizer.size, self.rasterizer.channels)
+        self._kinds = np.zeros((n, batch_env.num_cells), dtype=np.uint8)
+        self._games = np.repeat(np.arange(n), 5)
+        self._cells = None  # (N, 3): głowa, ogon, jedzenie
+        self.reset()
+
+    def reset(self):
+        """Rysuje wszystkie gry od nowa (po BatchSnakeEnv.reset()) i zwraca obserwację"""
+        self._rebuild(np.arange(self.env.num_envs))
+        return self.frames.window()
+
+    def update(self):
+        """Nanosi ostatni step() na ramki i zwraca obserwację (widok)"""
+        env = self.env
+        self.frames.advance()
+        moved = env.death_cause == 0
+        cells = self._state_cells()
+        changed = np.concatenate([self._cells, cells[:, [0, 2]]], axis=1)  # (N, 5)
+        games = self._games.reshape(-1, 5)[moved].ravel()
+        changed = changed[moved].ravel()
+        kinds = np.where(env.board[games, changed], CELL_BODY, CELL_EMPTY).astype(np.uint8)
+        kinds[changed == cells[games, 0]] = CELL_HEAD
+        kinds[changed == cells[games, 2]] = CELL_FOOD
+        self._kinds[games, changed] = kinds
+        self.rasterizer.paint(self._kinds, games, changed, self.frames.current)
+        self._cells = cells
+        reset = np.flatnonzero(~moved)
+        if reset.size:
+            self._rebuild(reset)
+        return self.frames.window()
+
+    def _state_cells(self):
+        env = self.env
+        games = np.arange(env.num_envs)
+        heads = env.heads[:, 1].astype(np.int64) * env.grid_count + env.heads[:, 0]
+        tails = env.body[games, (env.head_ptr - env.length + 1) % env.num_cells]
+        return np.stack([heads, tails, env.food_cell], axis=1).astype(np.int64)
+
+    def _rebuild(self, games):
+        """Rysuje wybrane gry od zera i wypełnia nimi okno ramek"""
+        env = self.env
+        kinds = env.board[games].astype(np.uint8) * CELL_BODY
+        cells = self._state_cells()
+        rows = np.arange(len(games))
+        kinds[rows, cells[games, 0]] = CELL_HEAD
+        kinds[rows, cells[games, 2]] = CELL_FOOD
+        self._kinds[games] = kinds
+        current = np.empty((len(games),) + self.frames.current.shape[1:], dtype=np.uint8)
+        self.rasterizer.render(kinds, current)
+        self.frames.current[games] = current
+        self.frames.fill(games)
+        if self._cells is None:
+            self._cells = cells
+        self._cells[games] = cells[games]
@@ -0,0 +1,225 @@
+import random
+from collections import deque
+
+# Domyślne ustawienia gry
+GRID_COUNT = 30
+MAX_STEPS_PER_GAME = 1000  # Maksymalna liczba kroków bez jedzenia
+
+# Kierunki [x, y] odpowiadające akcjom agenta (0=góra, 1=dół, 2=lewo, 3=prawo)
+ACTION_DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+DIRECTION_ACTIONS = {direction: action for action, direction in enumerate(ACTION_DIRECTIONS)}
+
+# Od tylu pól SnakeEnv tworzy planszę rzadką (SparseSnakeEnv)
+SPARSE_MIN_CELLS = 1 << 16
+# Na planszy rzadkiej jedzenie jest losowane do skutku, dopóki wąż zajmuje najwyżej tę część pól
+SPARSE_MAX_FILL = 0.5
+
+# Nagrody
+REWARD_FOOD = 1
+REWARD_DEATH = -1
+REWARD_NONE = 0
+
+class SnakeEnv:
+    """Silnik gry Snake bez grafiki (nie korzysta z pygame)
+
+    Zawiera całą logikę gry: ruch, jedzenie, kolizje ze ścianą i z ciałem
+    oraz limit kroków. Interfejs reset()/step(action) pozwala uruchamiać
+    gry bez okna i bez ograniczania liczby klatek.
+
+    Ciało węża to deque (głowa na początku) z mapą zajętości pól, a wolne
+    pola są trzymane w indeksowanej liście - sprawdzenie kolizji, ruch
+    i losowanie jedzenia kosztują O(1) niezależnie od długości węża.
+    Zapełnienie całej planszy kończy grę wygraną (death_cause = 'win').
+
+    Każda gra ma własne ziarno (episode_seed) i własny generator jedzenia,
+    więc gra jest w pełni wyznaczona przez (ziarno, akcje) - patrz
+    utils.replay_log. Ziarna kolejnych gier pochodzą z seed, a bez niego
+    z globalnego random (random.seed nadal daje powtarzalne przebiegi).
+
+    Plansze od SPARSE_MIN_CELLS pól są tworzone jako SparseSnakeEnv
+    (sparse=True/False wymusza wybór).
+    """
+
+    sparse = False
+
+    def __new__(cls, grid_count=GRID_COUNT, max_steps_per_game=MAX_STEPS_PER_GAME, seed=None, sparse=None):
+        if cls is SnakeEnv:
+            if sparse is None:
+                sparse = grid_count * grid_count >= SPARSE_MIN_CELLS
+            if sparse:
+                cls = SparseSnakeEnv
+        return super().__new__(cls)
+
+    def __init__(self, grid_count=GRID_COUNT, max_steps_per_game=MAX_STEPS_PER_GAME, seed=None, sparse=None):
+        self.grid_count = grid_count
+        self.num_cells = grid_count * grid_count
+        self.max_steps_per_game = max_steps_per_game
+        self.snake = deque()
+        self.episode = 0  # Numer gry (zwiększany przy każdym resecie)
+        self.seed_source = random.Random(seed if seed is not None else random.getrandbits(64))
+        self.rng = random.Random()  # Generator jedzenia bieżącej gry
+        self.reset()
+
+    def reset(self, seed=None):
+        """Resetuje grę do stanu początkowego i zwraca obserwację
+
+        seed - ziarno nowej gry (domyślnie kolejne ze strumienia ziaren).
+        """
+        self.episode_seed = seed if seed is not None else self.seed_source.getrandbits(63)
+        self.rng.seed(self.episode_seed)
+
+        self._clear_cells()
+
+        # Wąż zaczyna w środku
+        start = (self.grid_count // 2, self.grid_count // 2)
+        self.snake = deque([start])
+        self._occupy(start[1] * self.grid_count + start[0])
+        self.direction = [1, 0]  # Początkowo idzie w prawo
+        self.food = self.generate_food()
+        self.score = 0
+        self.game_over = False
+        self.death_cause = None  # 'wall', 'self', 'timeout' lub 'win'
+        self.current_game_steps = 0
+        self.moves = 0  # Liczba wykonanych ruchów w tej grze
+        self.actions = []  # Akcje agenta w tej grze (do zapisu powtórki)
+        self.replayable = True  # Czy gra to same akcje agenta (bez ruchów w trybie człowieka)
+        self.episode += 1
+        return self.get_observation()
+
+    def _clear_cells(self):
+        """Tworzy pustą mapę zajętości (pole = y * grid_count + x) i listę wolnych pól
+
+        Wolne pola zawsze w tej samej kolejności - inaczej położenie jedzenia
+        zależałoby od przebiegu poprzednich gier, a nie tylko od ziarna.
+        """
+        self.occupied = bytearray(self.num_cells)
+        self.free_cells = list(range(self.num_cells))
+        self.free_index = list(range(self.num_cells))
+
+    def generate_food(self):
+        """Generuje nowe jedzenie na losowym wolnym polu (None gdy brak miejsca)"""
+        if not self.free_cells:
+            return None
+        cell = self.free_cells[self.rng.randrange(len(self.free_cells))]
+        return (cell % self.grid_count, cell // self.grid_count)
+
+    def _occupy(self, cell):
+        """Oznacza pole jako zajęte i usuwa je z listy wolnych pól"""
+        self.occupied[cell] = 1
+        index = self.free_index[cell]
+        last = self.free_cells.pop()
+        if last != cell:
+            self.free_cells[index] = last
+            self.free_index[last] = index
+
+    def _release(self, cell):
+        """Oznacza pole jako wolne i dopisuje je do listy wolnych pól"""
+        self.occupied[cell] = 0
+        self.free_index[cell] = len(self.free_cells)
+        self.free_cells.append(cell)
+
+    def get_observation(self):
+        """Zwraca obserwację (snake, food, direction) w formacie agentów"""
+        return self.snake, self.food, self.direction
+
+    def step(self, action=None):
+        """Wykonuje jeden krok gry i zwraca (obserwacja, nagroda, koniec)
+
+        action - akcja agenta (0-3). None oznacza ruch w bieżącym kierunku
+        (tryb człowieka) - wtedy kroki nie są liczone i nie ma limitu kroków.
+        """
+        if self.game_over:
+            return self.get_observation(), REWARD_NONE, True
+
+        if action is not None:
+            self.direction = list(ACTION_DIRECTIONS[action])
+            self.current_game_steps += 1
+            self.actions.append(action)
+        else:
+            self.replayable = False
+
+        # Nowa pozycja głowy węża
+        head = self.snake[0]
+        new_head = (head[0] + self.direction[0], head[1] + self.direction[1])
+
+        # Sprawdzenie kolizji ze ścianą
+        if (new_head[0] < 0 or new_head[0] >= self.grid_count or
+                new_head[1] < 0 or new_head[1] >= self.grid_count):
+            return self._end_game('wall', REWARD_DEATH)
+
+        # Sprawdzenie kolizji z własnym ciałem (łącznie z ogonem, jak dotąd)
+        cell = new_head[1] * self.grid_count + new_head[0]
+        if self.occupied[cell]:
+            return self._end_game('self', REWARD_DEATH)
+
+        # Sprawdzenie maksymalnej liczby kroków
+        if action is not None and self.current_game_steps >= self.max_steps_per_game:
+            return self._end_game('timeout', REWARD_NONE)
+
+        # Dodanie nowej głowy
+        self.snake.appendleft(new_head)
+        self._occupy(cell)
+        self.moves += 1
+
+        # Sprawdzenie czy wąż zjadł jedzenie
+        if new_head == self.food:
+            self.score += 1
+            self.current_game_steps = 0  # Reset kroków po zjedzeniu
+            # Pełna plansza - wygrana
+            if len(self.snake) == self.num_cells:
+                self.food = None
+                return self._end_game('win', REWARD_FOOD)
+            self.food = self.generate_food()
+            return self.get_observation(), REWARD_FOOD, False
+
+        # Usunięcie ogona jeśli nie zjadł jedzenia
+        tail = self.snake.pop()
+        self._release(tail[1] * self.grid_count + tail[0])
+        return self.get_observation(), REWARD_NONE, False
+
+    def _end_game(self, cause, reward):
+        """Kończy grę z podaną przyczyną"""
+        self.game_over = True
+        self.death_cause = cause
+        return self.get_observation(), reward, True
+
+class CellSet(set):
+    """Zbiór zajętych pól, który można czytać jak mapę zajętości: occupied[pole] -> bool"""
+    __getitem__ = set.__contains__
+
+class SparseSnakeEnv(SnakeEnv):
+    """SnakeEnv dla dużych plansz (np. 1000x1000 i więcej)
+
+    Zamiast map całej planszy trzyma tylko zbiór zajętych pól (CellSet),
+    a jedzenie losuje spośród wszystkich pól, aż trafi na wolne. Pamięć,
+    reset i krok zależą od długości węża, a nie od rozmiaru planszy.
+    Gdy wąż zajmuje więcej niż SPARSE_MAX_FILL pól, wolne pola są wypisywane
+    (O(rozmiar planszy), tylko przy prawie pełnej planszy).
+    """
+
+    sparse = True
+
+    def _clear_cells(self):
+        self.occupied = CellSet()
+        self.free_cells = self.free_index = None
+
+    def _occupy(self, cell):
+        self.occupied.add(cell)
+
+    def _release(self, cell):
+        self.occupied.discard(cell)
+
+    def generate_food(self):
+        """Generuje nowe jedzenie na losowym wolnym polu (None gdy brak miejsca)"""
+        occupied = self.occupied
+        if len(occupied) <= self.num_cells * SPARSE_MAX_FILL:
+            randrange = self.rng.randrange
+            while True:
+                cell = randrange(self.num_cells)
+                if cell not in occupied:
+                    return (cell % self.grid_count, cell // self.grid_count)
+        free_cells = [cell for cell in range(self.num_cells) if cell not in occupied]
+        if not free_cells:
+            return None
+        cell = free_cells[self.rng.randrange(len(free_cells))]
+        return (cell % self.grid_count, cell // self.grid_count)
@@ -0,0 +1,325 @@
+import heapq
+from collections import deque
+
+from env.snake_env import SPARSE_MIN_CELLS, CellSet
+
+UNREACHABLE = 1 << 30  # Odległość pól zajętych i odciętych od jedzenia
+
+# Na planszy rzadkiej odległość do jedzenia liczy A* z limitem rozwinięć pól
+# (SEARCH_BUDGET na segment węża, co najmniej SEARCH_MIN_BUDGET)
+SEARCH_BUDGET = 4
+SEARCH_MIN_BUDGET = 64
+
+def move_targets(cell, grid_count):
+    """Zwraca pola docelowe ruchów 0-3 z pola cell (-1, gdy ruch wchodzi w ścianę)"""
+    y, x = divmod(cell, grid_count)
+    last = grid_count - 1
+    return (cell - grid_count if y else -1, cell + grid_count if y < last else -1,
+            cell - 1 if x else -1, cell + 1 if x < last else -1)
+
+class BoardNeighbors:
+    """Sąsiedzi pól planszy liczeni z (x, y): neighbors[pole] to krotka pól sąsiednich wewnątrz planszy"""
+
+    def __init__(self, grid_count):
+        self.grid_count = grid_count
+
+    def __getitem__(self, cell):
+        grid_count = self.grid_count
+        y, x = divmod(cell, grid_count)
+        last = grid_count - 1
+        if 0 < x < last and 0 < y < last:
+            return (cell - grid_count, cell + grid_count, cell - 1, cell + 1)
+        return tuple(target for target in move_targets(cell, grid_count) if target >= 0)
+
+class OccupiedCells(CellSet):
+    """Zajęte pola planszy rzadkiej z zapisem jak w bytearray: occupied[pole] = 1/0"""
+
+    def __setitem__(self, cell, value):
+        if value:
+            self.add(cell)
+        else:
+            self.discard(cell)
+
+class CellMarks(dict):
+    """Znaczniki odwiedzin pól planszy rzadkiej (brak wpisu = None)"""
+
+    __getitem__ = dict.get
+
+class SpatialIndex:
+    """Zapytania przestrzenne dla agentów: bezpieczny ruch, odległość do jedzenia, wolne miejsce
+
+    update(snake, food) synchronizuje indeks ze stanem gry. Po jednym ruchu
+    węża zmienia tylko pola głowy i ogona, a pole odległości BFS od jedzenia
+    (ciało jest przeszkodą) naprawia lokalnie: zajęcie głowy przelicza tylko
+    pola, których wszystkie najkrótsze drogi prowadziły przez nią, a
+    zwolnienie ogona rozchodzi się tylko tam, gdzie droga się skraca. Pełny
+    BFS jest robiony po zjedzeniu (nowe jedzenie), po resecie gry i gdy stan
+    nie jest kolejnym ruchem poprzedniego.
+
+    Plansze od SPARSE_MIN_CELLS pól (jak SparseSnakeEnv; sparse=True/False
+    wymusza wybór) nie mają map całej planszy: zajętość to zbiór pól węża,
+    sąsiedzi są liczeni z (x, y), a zamiast pola odległości food_distance
+    uruchamia A* z limitem rozwinięć zależnym od długości węża. Pamięć
+    i koszt kroku zależą wtedy od długości węża, nie od rozmiaru planszy.
+
+    Ruch do pola ogona jest niebezpieczny (jak w SnakeEnv - kolizja jest
+    sprawdzana przed cofnięciem ogona). Odległości traktują ciało jako
+    nieruchome, więc są górnym oszacowaniem.
+    """
+
+    def __init__(self, grid_count, sparse=None):
+        self.grid_count = grid_count
+        self.num_cells = grid_count * grid_count
+        self.sparse = self.num_cells >= SPARSE_MIN_CELLS if sparse is None else sparse
+        if self.sparse:
+            self.neighbors = BoardNeighbors(grid_count)
+            self.occupied = OccupiedCells()
+            self.distance = None  # Bez pola odległości - patrz _search_food
+            self.visited = None  # Znaczniki tworzone dla każdego reachable_area
+        else:
+            board = BoardNeighbors(grid_count)
+            self.neighbors = [board[cell] for cell in range(self.num_cells)]
+            self.occupied = bytearray(self.num_cells)
+            self.distance = [UNREACHABLE] * self.num_cells  # Odległość BFS od jedzenia
+            self.visited = [0] * self.num_cells  # Numer ostatniego reachable_area, które policzyło pole
+        self.visit = 0
+        self.body = deque()  # Pola węża (głowa na początku)
+        self.head = None
+        self.targets = (-1, -1, -1, -1)  # Pola docelowe ruchów z głowy (-1 - ściana)
+        self.food = None  # Pole jedzenia albo None
+        self.full_rebuilds = 0
+        self.distance_rebuilds = 0
+
+    def update(self, snake, food):
+        """Synchronizuje indeks ze stanem gry (snake - ciało (x, y) z głową na początku)"""
+        grid_count = self.grid_count
+        head_x, head_y = snake[0]
+        head = head_y * grid_count + head_x
+        food = None if food is None else food[1] * grid_count + food[0]
+        # Przy nowym jedzeniu pole odległości i tak jest liczone od zera
+        repair = food == self.food and not self.sparse
+        if not self._apply_move(snake, head, repair):
+            self._rebuild(snake)
+            self.food = food
+            self._rebuild_distance()
+        elif food != self.food:
+            self.food = food
+            self._rebuild_distance()
+        self.targets = move_targets(self.head, grid_count)
+
+    def _apply_move(self, snake, head, repair):
+        """Nanosi ruch głowy na head, jeśli snake to poprzedni stan po jednym ruchu (albo ten sam)"""
+        body = self.body
+        length = len(snake)
+        if not body or length - len(body) not in (0, 1):
+            return False
+        tail_x, tail_y = snake[-1]
+        if head == body[0]:
+            return length == len(body) and tail_y * self.grid_count + tail_x == body[-1]
+        if head not in self.neighbors[body[0]] or self.occupied[head]:
+            return False
+        if length > 1:
+            neck_x, neck_y = snake[1]
+            if neck_y * self.grid_count + neck_x != body[0]:
+                return False
+        body.appendleft(head)
+        self.head = head
+        self.occupied[head] = 1
+        if repair:
+            self._block(head)
+        if length < len(body):
+            tail = body.pop()
+            self.occupied[tail] = 0
+            if repair:
+                self._unblock(tail)
+        return tail_y * self.grid_count + tail_x == body[-1]
+
+    def _rebuild(self, snake):
+        """Odtwarza zajętość pól od zera"""
+        grid_count = self.grid_count
+        self.occupied = occupied = OccupiedCells() if self.sparse else bytearray(self.num_cells)
+        self.body = deque(y * grid_count + x for x, y in snake)
+        for cell in self.body:
+            occupied[cell] = 1
+        self.head = self.body[0]
+        self.full_rebuilds += 1
+
+    def _rebuild_distance(self):
+        """Liczy pole odległości od jedzenia pełnym BFS (plansza rzadka nie ma pola)"""
+        if self.sparse:
+            return
+        self.distance = distance = [UNREACHABLE] * self.num_cells
+        self.distance_rebuilds += 1
+        if self.food is None:
+            return
+        neighbors, occupied = self.neighbors, self.occupied
+        distance[self.food] = steps = 0
+        frontier = [self.food]
+        while frontier:
+            steps += 1
+            layer = []
+            for cell in frontier:
+                for neighbor in neighbors[cell]:
+                    if distance[neighbor] == UNREACHABLE and not occupied[neighbor]:
+                        distance[neighbor] = steps
+                        layer.append(neighbor)
+            frontier = layer
+
+    def _block(self, cell):
+        """Naprawia pole odległości po zajęciu pola cell"""
+        distance, neighbors = self.distance, self.neighbors
+        if distance[cell] == UNREACHABLE:
+            return
+        # Pola bez innej drogi o krok krótszej, warstwami BFS od cell
+        # (stare odległości zostają do końca przeglądu)
+        lost = [cell]
+        lost_set = {cell}
+        for parent in lost:
+            child_distance = distance[parent] + 1
+            for child in neighbors[parent]:
+                if distance[child] != child_distance or child in lost_set:
+                    continue
+                for other in neighbors[child]:
+                    if distance[other] == child_distance - 1 and other not in lost_set:
+                        break
+                else:
+                    lost_set.add(child)
+                    lost.append(child)
+        for lost_cell in lost:
+            distance[lost_cell] = UNREACHABLE
+        # Utracone pola dostają odległość od brzegu nienaruszonej części
+        heap = []
+        for lost_cell in lost[1:]:
+            best = min(distance[neighbor] for neighbor in neighbors[lost_cell])
+            if best != UNREACHABLE:
+                distance[lost_cell] = best + 1
+                heap.append((best + 1, lost_cell))
+        heapq.heapify(heap)
+        occupied = self.occupied
+        while heap:
+            steps, current = heapq.heappop(heap)
+            if steps != distance[current]:
+                continue
+            steps += 1
+            for neighbor in neighbors[current]:
+                if steps < distance[neighbor] and not occupied[neighbor]:
+                    distance[neighbor] = steps
+                    heapq.heappush(heap, (steps, neighbor))
+
+    def _unblock(self, cell):
+        """Naprawia pole odległości po zwolnieniu pola cell"""
+        distance, neighbors, occupied = self.distance, self.neighbors, self.occupied
+        best = min(distance[neighbor] for neighbor in neighbors[cell])
+        if best == UNREACHABLE:
+            return
+        distance[cell] = best + 1
+        queue = deque((cell,))
+        while queue:
+            current = queue.popleft()
+            steps = distance[current] + 1
+            for neighbor in neighbors[current]:
+                if steps < distance[neighbor] and not occupied[neighbor]:
+                    distance[neighbor] = steps
+                    queue.append(neighbor)
+
+    def is_safe(self, action):
+        """Czy ruch nie kończy gry (ściana albo ciało, łącznie z ogonem)"""
+        target = self.targets[action]
+        return target >= 0 and not self.occupied[target]
+
+    def safe_actions(self):
+        """Zwraca listę akcji, które nie kończą gry"""
+        occupied = self.occupied
+        return [action for action, target in enumerate(self.targets) if target >= 0 and not occupied[target]]
+
+    def food_distance(self, action=None):
+        """Zwraca liczbę ruchów do jedzenia zaczynając od action (None - najlepszy ruch)
+
+        None, gdy ruch nie jest bezpieczny albo jedzenie jest odcięte ciałem.
+        Na planszy rzadkiej wynik pochodzi z _search_food.
+        """
+        if action is None:
+            distances = [d for d in map(self.food_distance, range(len(self.targets))) if d is not None]
+            return min(distances) if distances else None
+        target = self.targets[action]
+        if target < 0 or self.occupied[target]:
+            return None
+        steps = self._search_food(target) if self.sparse else self.distance[target]
+        if steps is None or steps == UNREACHABLE:
+            return None
+        return steps + 1
+
+    def _search_food(self, start):
+        """Zwraca odległość od start do jedzenia z A* (metryka miejska), None gdy jedzenie jest odcięte
+
+        Liczba rozwiniętych pól jest ograniczona - po wyczerpaniu limitu
+        zwraca dolne oszacowanie z najlepszego pola kolejki. Poza okolicą
+        węża oszacowanie jest dokładne, więc limit dotyczy tylko objazdów.
+        Gdy ciało nie leży między start a jedzeniem, wynik to od razu
+        odległość miejska (koszt zależny od długości węża).
+        """
+        food = self.food
+        if food is None:
+            return None
+        grid_count, occupied = self.grid_count, self.occupied
+        food_y, food_x = divmod(food, grid_count)
+        start_y, start_x = divmod(start, grid_count)
+        # Bez ciała w prostokącie między start a jedzeniem droga wzdłuż jego boków jest najkrótsza
+        low_x, high_x = sorted((start_x, food_x))
+        low_y, high_y = sorted((start_y, food_y))
+        for y, x in (divmod(cell, grid_count) for cell in self.body):
+            if low_x <= x <= high_x and low_y <= y <= high_y:
+                break
+        else:
+            return abs(start_x - food_x) + abs(start_y - food_y)
+        budget = max(SEARCH_MIN_BUDGET, SEARCH_BUDGET * len(self.body))
+        best = {start: 0}
+        heap = [(abs(start_x - food_x) + abs(start_y - food_y), 0, start)]
+        while heap:
+            total, steps, cell = heapq.heappop(heap)
+            steps = -steps
+            if cell == food:
+                return steps
+            if steps != best[cell]:
+                continue
+            budget -= 1
+            if not budget:
+                return total
+            # Krok w stronę jedzenia nie zmienia sumy odległości i szacunku, krok od jedzenia dodaje 2
+            y, x = divmod(cell, grid_count)
+            closer = (y > food_y, y < food_y, x > food_x, x < food_x)
+            steps += 1
+            for neighbor, toward in zip(move_targets(cell, grid_count), closer):
+                if neighbor >= 0 and steps < best.get(neighbor, UNREACHABLE) and not occupied[neighbor]:
+                    best[neighbor] = steps
+                    heapq.heappush(heap, (total if toward else total + 2, -steps, neighbor))
+        return None
+
+    def reachable_area(self, action, limit=None):
+        """Zwraca liczbę pól dostępnych po ruchu (z polem docelowym), 0 dla ruchu niebezpiecznego
+
+        Zwolniony po ruchu ogon liczy się jako wolny (chyba że ruch zjada
+        jedzenie). limit przerywa liczenie po tylu polach - wystarczy do
+        sprawdzenia, czy wąż się zmieści. Koszt zależy tylko od liczby
+        odwiedzonych pól - znaczniki odwiedzin nie są czyszczone, każde
+        wywołanie ma własny numer (na planszy rzadkiej - własny słownik).
+        """
+        target = self.targets[action]
+        if target < 0 or self.occupied[target]:
+            return 0
+        if limit is None:
+            limit = self.num_cells
+        neighbors, occupied = self.neighbors, self.occupied
+        self.visit = visit = self.visit + 1
+        visited = CellMarks() if self.visited is None else self.visited
+        tail = self.body[-1] if target != self.food else -1
+        visited[target] = visit
+        count = 1
+        stack = [target]
+        while stack and count < limit:
+            for neighbor in neighbors[stack.pop()]:
+                if visited[neighbor] != visit and (not occupied[neighbor] or neighbor == tail):
+                    visited[neighbor] = visit
+                    count += 1
+                    stack.append(neighbor)
+        return min(count, limit)
@@ -0,0 +1,107 @@
+"""Lekki punkt wejścia bez okna: punkty kontrolne, raporty i gry bez grafiki
+
+Każde polecenie importuje tylko to, czego potrzebuje - list, report i disk
+nie ładują ani pygame, ani numpy (start w kilkadziesiąt ms, pomiar:
+python -m benchmarks.startup).
+
+Uruchomienie:
+    python snake_cli.py list [--min-score 5] [--limit 20]
+    python snake_cli.py report [snake_model_100_....pkl]
+    python snake_cli.py disk
+    python snake_cli.py play [--agent q] [--model plik.pkl] [--games 100] [--seed 0]
+
+Porównanie wielu punktów kontrolnych: python -m utils.tournament
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+
+from agents.factory import AGENTS, create_agent
+from env.snake_env import GRID_COUNT
+
+MODELS_DIR = "models"
+
+def command_list(manager, args):
+    rows = manager.registry.list(min_score=args.min_score, limit=args.limit)
+    if not rows:
+        print("Brak dostępnych modeli")
+        return
+    print(f"{'plik':<40} {'gry':>7} {'najlepszy':>9} {'KB':>8}  zapisany")
+    for row in rows:
+        saved_at = datetime.fromtimestamp(row['saved_at']).strftime('%Y-%m-%d %H:%M:%S')
+        size_kb = (row['pkl_size'] + row['txt_size']) / 1024
+        games = '-' if row['games_played'] is None else row['games_played']
+        best = '-' if row['best_score'] is None else row['best_score']
+        print(f"{row['filename']:<40} {games:>7} {best:>9} {size_kb:8.1f}  {saved_at}")
+
+def command_report(manager, args):
+    manager.print_model_summary(args.filename)
+
+def command_disk(manager, args):
+    usage = manager.get_disk_usage()
+    print(f"Pliki: {usage['file_count']}, razem: {usage['total_size_mb']} MB, "
+          f"średnio: {usage['average_size_kb']} KB")
+
+def command_play(manager, args):
+    from utils.tournament import game_seeds, play_games
+
+    grid_count = args.grid
+    if args.model:
+        model_data = manager.load_model(args.model)
+        if model_data is None:
+            sys.exit(1)
+        agent = model_data['agent']
+        # Agent gra na planszy, na której się uczył; inny --grid to błąd, nie cicha zmiana
+        model_grid = getattr(agent, 'grid_count', None)
+        if model_grid is not None:
+            if grid_count not in (None, model_grid):
+                print(f"Model {args.model} jest dla planszy {model_grid}, a podano --grid {grid_count}")
+                sys.exit(1)
+            grid_count = model_grid
+    if grid_count is None:
+        grid_count = GRID_COUNT
+    if not args.model:
+        agent = create_agent(args.agent, grid_count)
+    start = time.perf_counter()
+    scores, steps, causes = play_games(agent, game_seeds(args.seed, args.games), grid_count)
+    elapsed = time.perf_counter() - start
+    counts = {cause: causes.count(cause) for cause in set(causes)}
+    steps = int(steps.sum())
+    print(f"Gry: {len(scores)}, średni wynik: {scores.mean():.2f}, najlepszy: {scores.max()}")
+    print("Przyczyny końca: " + ", ".join(f"{cause}: {count}" for cause, count in sorted(counts.items())))
+    print(f"Kroki: {steps}, {steps / elapsed if elapsed else 0:,.0f} kroków/s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snake RL bez okna: modele, raporty, gry bez grafiki")
+    parser.add_argument('--models-dir', default=MODELS_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    listing = subparsers.add_parser('list', help="punkty kontrolne od najnowszych (z rejestru)")
+    listing.add_argument('--min-score', type=int)
+    listing.add_argument('--limit', type=int)
+    listing.set_defaults(handler=command_list)
+
+    report = subparsers.add_parser('report', help="raport punktu kontrolnego (domyślnie najnowszego)")
+    report.add_argument('filename', nargs='?')
+    report.set_defaults(handler=command_report)
+
+    disk = subparsers.add_parser('disk', help="użycie dysku przez punkty kontrolne")
+    disk.set_defaults(handler=command_disk)
+
+    play = subparsers.add_parser('play', help="rozegraj gry bez grafiki i pokaż wyniki")
+    play.add_argument('--agent', choices=sorted(AGENTS), default='random')
+    play.add_argument('--model', help="plik .pkl z katalogu modeli (zamiast nowego agenta)")
+    play.add_argument('--games', type=int, default=100)
+    play.add_argument('--seed', type=int, help="ziarno serii gier (powtarzalne wyniki)")
+    play.add_argument('--grid', type=int,
+                      help=f"rozmiar planszy (domyślnie z modelu albo {GRID_COUNT})")
+    play.set_defaults(handler=command_play)
+
+    args = parser.parse_args(argv)
+
+    from utils.save_load import ModelManager
+    args.handler(ModelManager(args.models_dir), args)
+
+if __name__ == "__main__":
+    main()
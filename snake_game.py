@@ -1,21 +1,37 @@
 import pygame
-import random
+import argparse
+import os
 import sys
+import time
 from datetime import datetime
 
 # Importy z naszych modułów
-from agents.random_agent import RandomAgent
+from agents.factory import AGENTS, create_agent
+from env.observation import ObservationEncoder
+from env.pixels import pixel_encoder_for
+from env.snake_env import MAX_STEPS_PER_GAME, SnakeEnv
 from utils.save_load import ModelManager
+from utils.checkpoint_writer import AsyncCheckpointWriter
+from utils.metrics import Metrics
+from utils.replay_log import EpisodeRecord, ReplayLogWriter
 from utils.visualization import GameRenderer
 
-# Inicjalizacja pygame
-pygame.init()
-
-# Stałe gry
-WINDOW_SIZE = 600
+# Domyślne ustawienia gry (rozmiar planszy można podać przy tworzeniu SnakeGame)
+WINDOW_SIZE = 600  # Największe okno; większe plansze są pokazywane w przesuwanym widoku
 GRID_SIZE = 20
 GRID_COUNT = WINDOW_SIZE // GRID_SIZE
 
+# Tryb turbo: symulacja bez limitu, ekran odświeżany TURBO_FPS razy na sekundę
+TURBO_FPS = 30
+TURBO_TIME_CHECK = 64  # Co ile kroków sprawdzać, czy czas na klatkę
+
+# Metryki (klawisz M lub zmienna środowiskowa SNAKE_METRICS ze ścieżką pliku)
+METRICS_PATH = os.path.join("metrics", "snake_metrics.prom")
+METRICS_EXPORT_INTERVAL = 10.0  # Sekundy między eksportami
+
+# Gry agenta zapisywane jako (ziarno, akcje) - patrz utils/replay_log.py
+REPLAY_LOG_PATH = os.path.join("replays", "games.srep")
+
 # Kolory
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -26,28 +42,85 @@ YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
 class SnakeGame:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+    def __init__(self, agent=None, grid_count=GRID_COUNT, grid_size=GRID_SIZE):
+        self.grid_count = grid_count
+        self.window_size = min(grid_count * grid_size, WINDOW_SIZE)
+        
+        # pygame jest inicjalizowany dopiero przy tworzeniu okna, nie przy imporcie
+        pygame.init()
+        self.screen = pygame.display.set_mode((self.window_size, self.window_size))
         pygame.display.set_caption("Snake Game - Human/Agent Mode")
         self.clock = pygame.time.Clock()
         
         # Inicjalizacja komponentów
-        self.agent = RandomAgent()
+        self.agent = agent if agent is not None else create_agent('random', grid_count)
         self.model_manager = ModelManager()
-        self.renderer = GameRenderer(self.screen, WINDOW_SIZE, GRID_SIZE, self)
+        self.checkpoint_writer = AsyncCheckpointWriter(self.model_manager)
+        self.renderer = GameRenderer(self.screen, self.window_size, grid_size, self, dirty_rects=True,
+                                     grid_count=grid_count)
+        
+        # Logika gry (bez pygame); duże plansze są rzadkie (SparseSnakeEnv), a limit
+        # kroków bez jedzenia rośnie z planszą, żeby do jedzenia dało się dojść
+        self.engine = SnakeEnv(grid_count, max(MAX_STEPS_PER_GAME, 2 * grid_count))
+        self.observation = None  # ObservationEncoder dla agentów z get_action_from_observation (jak pixels)
+        self.pixels = None  # PixelEncoder dla agentów z get_action_from_pixels (tworzony przy pierwszym ruchu)
+        
+        # Tryb turbo (tylko agent) - przełączany klawiszami F i G
+        self.turbo = False
+        self.turbo_render = 'fps'  # 'fps' - stałe odświeżanie, 'games' - tylko po zakończonych grach
+        self.turbo_steps_per_sec = 0.0
+        
+        # Instrumentacja faz pętli gry (domyślnie wyłączona)
+        self.metrics = Metrics(os.environ.get('SNAKE_METRICS', METRICS_PATH), METRICS_EXPORT_INTERVAL)
+        self.metrics.extra['checkpoint_writer'] = self.checkpoint_writer.get_metrics
+        self.metrics_enabled = False
+        if 'SNAKE_METRICS' in os.environ:
+            self.set_metrics_enabled(True)
+        
+        # Log powtórek gier agenta (otwierany przy pierwszej zakończonej grze)
+        self.replay_writer = None
         
         self.reset_game()
     
+    # Stan gry przechowuje silnik - SnakeGame jest tylko nakładką interaktywną
+    @property
+    def snake(self):
+        return self.engine.snake
+    
+    @property
+    def food(self):
+        return self.engine.food
+    
+    @property
+    def direction(self):
+        return self.engine.direction
+    
+    @direction.setter
+    def direction(self, value):
+        self.engine.direction = value
+    
+    @property
+    def score(self):
+        return self.engine.score
+    
+    @property
+    def game_over(self):
+        return self.engine.game_over
+    
+    @property
+    def current_game_steps(self):
+        return self.engine.current_game_steps
+    
+    @property
+    def max_steps_per_game(self):
+        return self.engine.max_steps_per_game
+    
     def reset_game(self):
         """Resetuje grę do stanu początkowego"""
-        # Wąż zaczyna w środku
-        self.snake = [(GRID_COUNT // 2, GRID_COUNT // 2)]
-        self.direction = [1, 0]  # Początkowo idzie w prawo
-        self.food = self.generate_food()
-        self.score = 0
-        self.game_over = False
-        self.current_game_steps = 0
-        self.max_steps_per_game = 1000  # Maksymalna liczba kroków na grę
+        self.engine.reset()
+        # Agent losuje z ziarna gry, więc gra jest odtwarzalna z (ziarno, akcje)
+        if hasattr(self.agent, 'seed_episode'):
+            self.agent.seed_episode(self.engine.episode_seed)
         
         # Zachowaj licznik gier jeśli agent już grał
         if not hasattr(self, 'games_played'):
@@ -65,45 +138,28 @@ class SnakeGame:
         if self.auto_agent:
             self.human_mode = False
             self.agent_mode = True
-            print(f"DEBUG RESET: auto_agent={self.auto_agent}, ustawiam agent_mode=True")
         else:
             self.human_mode = True
             self.agent_mode = False
-            print(f"DEBUG RESET: auto_agent={self.auto_agent}, ustawiam agent_mode=False")
         
         self.paused = False
         
         # System zapisywania
         self.save_interval = 50  # Zapisz co 50 gier
     
-    def generate_food(self):
-        """Generuje nowe jedzenie w losowym miejscu"""
-        while True:
-            food = (random.randint(0, GRID_COUNT - 1), random.randint(0, GRID_COUNT - 1))
-            if food not in self.snake:
-                return food
-    
     def handle_events(self):
         """Obsługuje zdarzenia klawiatury"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 # Zapisz przed wyjściem
                 if self.agent_mode:
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    emergency_filename = f"emergency_save_{timestamp}.pkl"
-                    self.model_manager.save_model(self.agent, self.games_played, 
-                                               getattr(self, 'best_score', 0), emergency_filename, 
-                                               getattr(self, 'total_restarts', 0))
+                    self.emergency_save()
                 return False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     # Zapisz przed wyjściem
                     if self.agent_mode:
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        emergency_filename = f"emergency_save_{timestamp}.pkl"
-                        self.model_manager.save_model(self.agent, self.games_played, 
-                                                   getattr(self, 'best_score', 0), emergency_filename, 
-                                                   getattr(self, 'total_restarts', 0))
+                        self.emergency_save()
                     return False
                 elif event.key == pygame.K_r and self.game_over:  # Restart
                     self.total_restarts += 1
@@ -121,16 +177,18 @@ class SnakeGame:
                     print("Pauza" if self.paused else "Wznów")
                 elif event.key == pygame.K_s:  # Zapisz
                     if self.agent_mode:
-                        self.model_manager.save_model(self.agent, self.games_played, 
-                                                   getattr(self, 'best_score', 0), 
-                                                   total_restarts=getattr(self, 'total_restarts', 0))
+                        self.checkpoint_writer.request_save(self.agent, self.games_played, 
+                                                            getattr(self, 'best_score', 0), 
+                                                            total_restarts=getattr(self, 'total_restarts', 0))
                 elif event.key == pygame.K_l:  # Wczytaj
                     if self.agent_mode:
+                        self.checkpoint_writer.flush()  # Najnowszy zapis musi być już na dysku
                         latest_model = self.model_manager.get_latest_model()
                         if latest_model:
                             model_data = self.model_manager.load_model(latest_model)
                             if model_data:
                                 self.agent = model_data['agent']
+                                self.pixels = None  # Ustawienia ramek mogą być inne
                                 self.games_played = model_data.get('games_played', 0)
                                 self.best_score = model_data.get('best_score', 0)
                 elif event.key == pygame.K_t:  # Pokaż raport TXT
@@ -141,6 +199,7 @@ class SnakeGame:
                         self.model_manager.list_all_reports()
                 elif event.key == pygame.K_c:  # Czyszczenie starych plików
                     if self.agent_mode:
+                        self.checkpoint_writer.flush()  # Zapisy w toku muszą trafić do rejestru
                         usage = self.model_manager.get_disk_usage()
                         print(f"Użycie dysku: {usage['file_count']} plików, {usage['total_size_mb']} MB")
                         self.model_manager.cleanup_old_files(keep_last=5)
@@ -149,7 +208,6 @@ class SnakeGame:
                     self.agent_mode = True
                     self.human_mode = False
                     print("Auto agent: WŁĄCZONY")
-                    print(f"DEBUG: auto_agent={self.auto_agent}, agent_mode={self.agent_mode}")
                 elif event.key == pygame.K_2:  # Auto agent OFF
                     self.auto_agent = False
                     self.agent_mode = False
@@ -158,10 +216,17 @@ class SnakeGame:
                 elif event.key == pygame.K_3:  # Auto restart ON
                     self.auto_restart = True
                     print("Auto restart: WŁĄCZONY")
-                    print(f"DEBUG: auto_restart={self.auto_restart}")
                 elif event.key == pygame.K_4:  # Auto restart OFF
                     self.auto_restart = False
                     print("Auto restart: WYŁĄCZONY")
+                elif event.key == pygame.K_f:  # Tryb turbo
+                    self.turbo = not self.turbo
+                    print("Turbo: WŁĄCZONE" if self.turbo else "Turbo: WYŁĄCZONE")
+                elif event.key == pygame.K_g:  # Odświeżanie w trybie turbo
+                    self.turbo_render = 'games' if self.turbo_render == 'fps' else 'fps'
+                    print(f"Turbo - odświeżanie: {'po każdej grze' if self.turbo_render == 'games' else f'{TURBO_FPS} FPS'}")
+                elif event.key == pygame.K_m:  # Metryki
+                    self.set_metrics_enabled(not self.metrics_enabled)
                 elif not self.game_over and not self.paused and self.human_mode:
                     # Sterowanie człowiekiem
                     if event.key == pygame.K_UP and self.direction != [0, 1]:
@@ -179,95 +244,92 @@ class SnakeGame:
         if self.game_over or self.paused:
             return
         
-        # Sterowanie agentem
-        if self.agent_mode:
-            action = self.agent.get_action(self.snake, self.food, self.direction)
-            old_snake = self.snake.copy()
-            old_food = self.food
-            old_direction = self.direction.copy()
-            
-            self.direction = self.agent.action_to_direction(action)
-            self.current_game_steps += 1
-        
-        # Nowa pozycja głowy węża
-        new_head = (
-            self.snake[0][0] + self.direction[0],
-            self.snake[0][1] + self.direction[1]
-        )
-        
-        # Sprawdzenie kolizji ze ścianą
-        if (new_head[0] < 0 or new_head[0] >= GRID_COUNT or 
-            new_head[1] < 0 or new_head[1] >= GRID_COUNT):
-            self.game_over = True
-            if self.agent_mode:
-                # Rejestruj ruch (śmierć)
-                self.agent.record_move(old_snake, old_food, old_direction, action, -1, None, old_food, True)
-                self.games_played += 1
-                # Zapisz co save_interval gier
-                if self.games_played % self.save_interval == 0:
-                    self.model_manager.save_model(self.agent, self.games_played, 
-                                               getattr(self, 'best_score', 0), 
-                                               total_restarts=getattr(self, 'total_restarts', 0))
-                # Automatyczny restart
-                if self.auto_restart:
-                    self.total_restarts += 1
-                    print(f"DEBUG: Auto restart! total_restarts={self.total_restarts}")
-                    self.reset_game()
-            return
-        
-        # Sprawdzenie kolizji z własnym ciałem
-        if new_head in self.snake:
-            self.game_over = True
-            if self.agent_mode:
-                # Rejestruj ruch (śmierć)
-                self.agent.record_move(old_snake, old_food, old_direction, action, -1, None, old_food, True)
-                self.games_played += 1
-                if self.games_played % self.save_interval == 0:
-                    self.model_manager.save_model(self.agent, self.games_played, 
-                                               getattr(self, 'best_score', 0), 
-                                               total_restarts=getattr(self, 'total_restarts', 0))
-                # Automatyczny restart
-                if self.auto_restart:
-                    self.total_restarts += 1
-                    print(f"DEBUG: Auto restart! total_restarts={self.total_restarts}")
-                    self.reset_game()
+        # Sterowanie człowiekiem - ruch w bieżącym kierunku
+        if not self.agent_mode:
+            self.engine.step()
             return
         
-        # Sprawdzenie maksymalnej liczby kroków
-        if self.agent_mode and self.current_game_steps >= self.max_steps_per_game:
-            self.game_over = True
-            if self.agent_mode:
-                # Rejestruj ruch (timeout)
-                self.agent.record_move(old_snake, old_food, old_direction, action, 0, None, old_food, True)
-                self.games_played += 1
-                if self.games_played % self.save_interval == 0:
-                    self.model_manager.save_model(self.agent, self.games_played, 
-                                               getattr(self, 'best_score', 0), 
-                                               total_restarts=getattr(self, 'total_restarts', 0))
-                # Automatyczny restart
-                if self.auto_restart:
-                    self.total_restarts += 1
-                    print(f"DEBUG: Auto restart! total_restarts={self.total_restarts}")
-                    self.reset_game()
-            return
+        # Sterowanie agentem
+        action = self.choose_action()
+        # Ze starego węża wystarczą głowa i długość (bez kopiowania ciała)
+        old_head = self.snake[0]
+        old_length = len(self.snake)
+        old_food = self.food
+        old_direction = self.direction.copy()
         
-        # Dodanie nowej głowy
-        self.snake.insert(0, new_head)
+        _, reward, done = self.engine.step(action)
         
-        # Sprawdzenie czy wąż zjadł jedzenie
-        if new_head == self.food:
-            self.score += 1
-            self.food = self.generate_food()
-            if self.agent_mode:
-                # Rejestruj ruch (sukces - zjadł jedzenie)
-                self.agent.record_move(old_snake, old_food, old_direction, action, 1, self.snake, self.food, False)
-                self.current_game_steps = 0  # Reset kroków po zjedzeniu
+        if done:
+            # Rejestruj ruch (śmierć lub timeout)
+            self.record_agent_move(old_head, old_length, old_food, old_direction, action, reward, None, old_food,
+                                   True, death_cause=self.engine.death_cause)
+            self.end_agent_game()
         else:
-            # Usunięcie ogona jeśli nie zjadł jedzenia
-            self.snake.pop()
-            if self.agent_mode:
-                # Rejestruj ruch (neutralny)
-                self.agent.record_move(old_snake, old_food, old_direction, action, 0, self.snake, self.food, False)
+            # Rejestruj ruch (sukces - zjadł jedzenie lub neutralny)
+            self.record_agent_move(old_head, old_length, old_food, old_direction, action, reward, self.snake,
+                                   self.food, False)
+    
+    def choose_action(self):
+        """Pyta agenta o akcję dla bieżącego stanu"""
+        if hasattr(self.agent, 'get_action_from_observation'):
+            # Gęsta siatka planszy tylko dla agentów, którzy jej używają
+            if self.observation is None:
+                self.observation = ObservationEncoder(self.engine)
+            return self.agent.get_action_from_observation(*self.observation.update())
+        if hasattr(self.agent, 'get_action_from_pixels'):
+            if self.pixels is None:
+                self.pixels = pixel_encoder_for(self.agent, self.engine)
+            return self.agent.get_action_from_pixels(self.pixels.update())
+        return self.agent.get_action(self.snake, self.food, self.direction)
+    
+    def record_agent_move(self, *move, **details):
+        """Przekazuje agentowi dane o wykonanym ruchu"""
+        self.agent.record_move(*move, **details)
+    
+    def set_metrics_enabled(self, enabled):
+        """Włącza/wyłącza pomiar czasu faz i liczniki (wyłączone nic nie kosztują)"""
+        metrics = self.metrics
+        if enabled and not self.metrics_enabled:
+            metrics.wrap(self, 'handle_events', 'handle_events')
+            metrics.wrap(self, 'choose_action', 'get_action')
+            metrics.wrap(self.engine, 'step', 'step', on_result=metrics.count_step(self.engine))
+            metrics.wrap(self, 'record_agent_move', 'record_move')
+            metrics.wrap(self, 'draw', 'draw')
+            metrics.wrap(self.checkpoint_writer, 'request_save', 'checkpoint_save')
+            print(f"Metryki: WŁĄCZONE ({metrics.path})")
+        elif not enabled and self.metrics_enabled:
+            metrics.unwrap_all()
+            metrics.export()
+            print("Metryki: WYŁĄCZONE")
+        self.metrics_enabled = enabled
+    
+    def emergency_save(self):
+        """Zapisuje agenta przed wyjściem i czeka na zakończenie wszystkich zapisów"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        emergency_filename = f"emergency_save_{timestamp}.pkl"
+        self.checkpoint_writer.request_save(self.agent, self.games_played, 
+                                            getattr(self, 'best_score', 0), emergency_filename, 
+                                            getattr(self, 'total_restarts', 0))
+        self.checkpoint_writer.flush()
+    
+    def end_agent_game(self):
+        """Obsługuje koniec gry agenta: licznik, zapis i automatyczny restart"""
+        self.games_played += 1
+        record = EpisodeRecord.from_env(self.engine)
+        if record is not None:
+            if self.replay_writer is None:
+                self.replay_writer = ReplayLogWriter(REPLAY_LOG_PATH)
+            self.replay_writer.append(record)
+        # Zapisz co save_interval gier
+        if self.games_played % self.save_interval == 0:
+            self.checkpoint_writer.request_save(self.agent, self.games_played, 
+                                                getattr(self, 'best_score', 0), 
+                                                total_restarts=getattr(self, 'total_restarts', 0),
+                                                periodic=True)
+        # Automatyczny restart
+        if self.auto_restart:
+            self.total_restarts += 1
+            self.reset_game()
     
     def draw(self):
         """Rysuje grę używając renderera"""
@@ -283,14 +345,50 @@ class SnakeGame:
             games_played=games_played,
             current_steps=current_steps,
             paused=self.paused,
-            game_over=self.game_over
+            game_over=self.game_over,
+            step_id=(self.engine.episode, self.engine.moves)
         )
     
+    def run_turbo_frame(self):
+        """Wykonuje tyle kroków agenta, ile zmieści się w jednej klatce TURBO_FPS"""
+        start = time.perf_counter()
+        deadline = start + 1.0 / TURBO_FPS
+        games_before = self.games_played
+        steps = 0
+        while not self.game_over and not self.paused:
+            for _ in range(TURBO_TIME_CHECK):
+                self.update()
+                steps += 1
+                if self.game_over or self.paused:
+                    break
+            if time.perf_counter() >= deadline:
+                break
+        
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.turbo_steps_per_sec = steps / elapsed
+        
+        # Odświeżanie co klatkę albo tylko po zakończonej grze
+        if self.turbo_render == 'fps' or self.games_played != games_before or self.game_over:
+            self.draw()
+        
+        # Gdy nie ma już czego symulować, nie kręć pętli bez przerwy
+        if steps == 0:
+            self.clock.tick(TURBO_FPS)
+        else:
+            self.clock.tick()
+    
     def run(self):
         """Główna pętla gry"""
         running = True
         while running:
             running = self.handle_events()
+            if self.metrics_enabled:
+                self.metrics.maybe_export()
+            if self.turbo and self.agent_mode:
+                self.run_turbo_frame()
+                continue
+            
             self.update()
             self.draw()
             
@@ -300,9 +398,20 @@ class SnakeGame:
             else:
                 self.clock.tick(10)  # Wolniejsze dla człowieka
         
+        self.checkpoint_writer.close()
+        if self.replay_writer is not None:
+            self.replay_writer.close()
+        if self.metrics_enabled:
+            self.metrics.export()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
-    game = SnakeGame()
+    # python snake_game.py [random|q] [--grid 1000] [--cell 10]
+    parser = argparse.ArgumentParser(description="Snake - gra człowieka i agenta")
+    parser.add_argument('agent', nargs='?', default='random', choices=sorted(AGENTS))
+    parser.add_argument('--grid', type=int, default=GRID_COUNT, help="rozmiar planszy w polach")
+    parser.add_argument('--cell', type=int, default=GRID_SIZE, help="rozmiar pola w pikselach")
+    args = parser.parse_args()
+    game = SnakeGame(create_agent(args.agent, args.grid), args.grid, args.cell)
     game.run() 
\ No newline at end of file
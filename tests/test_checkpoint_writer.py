@@ -0,0 +1,68 @@
+import os
+import threading
+
+from agents.random_agent import RandomAgent
+from utils import history_log
+from utils.checkpoint_writer import AsyncCheckpointWriter
+from utils.save_load import ModelManager
+
+def blocked_writer(manager):
+    """Zwraca (writer, started, release) - każdy zapis sygnalizuje started i czeka na release"""
+    started, release = threading.Event(), threading.Event()
+    write = manager.write_checkpoint
+    def slow_write(checkpoint):
+        started.set()
+        release.wait()
+        write(checkpoint)
+    manager.write_checkpoint = slow_write
+    return AsyncCheckpointWriter(manager), started, release
+
+def test_queued_saves_with_different_names_are_all_written(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    writer, started, release = blocked_writer(manager)
+    agent = RandomAgent(history_capacity=100)
+    writer.request_save(agent, 1, filename="first.pkl")
+    started.wait()  # Kolejne zapisy czekają w kolejce
+    for name in ("snake_model_2.pkl", "emergency_save.pkl", "snake_model_2.pkl"):
+        agent.movement_history.append((1, 1), 1, None, 3, 3, 0)
+        writer.request_save(agent, 2, filename=name)
+    release.set()
+    writer.close()
+
+    assert writer.saves_failed == 0
+    assert writer.saves_coalesced == 1
+    for name in ("first.pkl", "snake_model_2.pkl", "emergency_save.pkl"):
+        assert os.path.exists(tmp_path / name)
+        assert name in manager.list_models()
+    assert manager.load_model("snake_model_2.pkl")['agent'].movement_history.total == 3
+    assert manager.load_model("emergency_save.pkl")['agent'].movement_history.total == 2
+
+def test_queued_periodic_saves_keep_only_newest(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    writer, started, release = blocked_writer(manager)
+    agent = RandomAgent(history_capacity=1_000)
+    writer.request_save(agent, 0, filename="start.pkl")
+    started.wait()
+    for games in range(1, 6):
+        for _ in range(10):
+            agent.movement_history.append((games, 0), 1, None, 3, 3, 0)
+        writer.request_save(agent, games, periodic=True)
+    agent.movement_history.append((9, 9), 1, None, 3, 3, 0)
+    writer.request_save(agent, 5, filename="emergency_save.pkl")
+    release.set()
+    writer.close()
+
+    assert writer.saves_failed == 0
+    assert writer.saves_coalesced == 4
+    periodic = [name for name in os.listdir(tmp_path) if name.startswith("snake_model_")
+                and name.endswith(".pkl")]
+    assert len(periodic) == 1 and periodic[0].startswith("snake_model_5_")
+    history = manager.load_model(periodic[0])['agent'].movement_history
+    assert history.total == 50 and history.first_row == 0
+    heads = history.get_range(0, 50)['head_x']
+    assert heads.tolist() == [games for games in range(1, 6) for _ in range(10)]
+    log_path = str(tmp_path / f"history_{agent.movement_history.log_id}.seglog")
+    segments = list(history_log.iter_segments(log_path))
+    assert [(start, count) for start, count, _ in segments] == [(0, 10), (10, 10), (20, 10), (30, 10),
+                                                                  (40, 10), (50, 1)]
+    assert os.path.exists(tmp_path / "emergency_save.pkl")
@@ -0,0 +1,32 @@
+from agents.q_agent import QAgent
+from env.observation import ObservationEncoder
+from env.snake_env import SnakeEnv
+
+def play(agent, env, encoder, moves):
+    """Wykonuje moves ruchów agenta (albo mniej, gdy gra się skończy)"""
+    for _ in range(moves):
+        head, length, food, direction = env.snake[0], len(env.snake), env.food, list(env.direction)
+        action = agent.get_action_from_observation(*encoder.update())
+        _, reward, done = env.step(action)
+        agent.record_move(head, length, food, direction, action, reward, None if done else env.snake,
+                          env.food, done)
+        if done:
+            return
+
+def test_reset_mid_game_drops_pending_transition():
+    env = SnakeEnv(20, seed=1)
+    encoder = ObservationEncoder(env)
+    agent = QAgent(20, epsilon=0.0, seed=1)
+    agent.seed_episode(env.episode_seed)
+    play(agent, env, encoder, 3)
+    assert not env.game_over and agent._pending is not None
+    transitions = agent.transitions
+
+    # Gra przerwana z zewnątrz (np. restart w SnakeGame) - bez ruchu kończącego
+    env.reset()
+    agent.seed_episode(env.episode_seed)
+    play(agent, env, encoder, 1)
+    assert agent.transitions == transitions
+
+    play(agent, env, encoder, 1)
+    assert agent.transitions == transitions + 1
@@ -0,0 +1,49 @@
+import os
+
+from agents.random_agent import RandomAgent
+from env.snake_env import SnakeEnv
+from utils.registry import REGISTRY_FILENAME
+from utils.save_load import ModelManager
+
+def play(agent, moves, seed=0):
+    """Dopisuje agentowi moves ruchów (z restartem po końcu gry)"""
+    env = SnakeEnv(10, seed=seed)
+    for _ in range(moves):
+        if env.game_over:
+            env.reset()
+        old_head, old_length, old_food = env.snake[0], len(env.snake), env.food
+        direction = list(env.direction)
+        action = agent.get_action(env.snake, env.food, direction)
+        _, reward, done = env.step(action)
+        agent.record_move(old_head, old_length, old_food, direction, action, reward,
+                          None if done else env.snake, env.food, done)
+
+def disk_usage(models_dir):
+    return sum(os.path.getsize(os.path.join(models_dir, name)) for name in os.listdir(models_dir)
+               if name != REGISTRY_FILENAME)
+
+def test_size_cap_counts_history_logs(tmp_path):
+    manager = ModelManager(str(tmp_path))
+    # Stary agent ma własny log, którego nie używa żaden z nowych punktów kontrolnych
+    old_agent = RandomAgent(history_capacity=20_000)
+    for i in range(3):
+        play(old_agent, 5_000, seed=i)
+        assert manager.save_model(old_agent, i, filename=f"old_{i}.pkl")
+    new_agent = RandomAgent(history_capacity=1_000)
+    for i in range(3):
+        play(new_agent, 200, seed=i)
+        assert manager.save_model(new_agent, 10 + i, filename=f"new_{i}.pkl")
+
+    logs = [name for name in os.listdir(tmp_path) if name.endswith('.seglog')]
+    assert len(logs) == 2
+    # Same pliki .pkl/.txt mieszczą się w limicie, dopiero z logami go przekraczają
+    _, _, checkpoint_bytes = manager.registry.totals()
+    limit = (checkpoint_bytes + max(os.path.getsize(tmp_path / name) for name in logs)) / 2
+    assert checkpoint_bytes <= limit < disk_usage(tmp_path)
+
+    removed = manager.registry.apply_retention(max_size_mb=limit / (1024 * 1024))
+
+    assert disk_usage(tmp_path) <= limit
+    assert set(removed) >= {f"old_{i}.pkl" for i in range(3)}
+    assert os.path.exists(tmp_path / "new_2.pkl")
+    assert len([name for name in os.listdir(tmp_path) if name.endswith('.seglog')]) == 1
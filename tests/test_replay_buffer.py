@@ -0,0 +1,29 @@
+import random
+
+from agents.random_agent import RandomAgent
+from env.snake_env import SnakeEnv
+
+def test_body_stops_at_unrecorded_moves():
+    rng = random.Random(3)
+    env = SnakeEnv(12, seed=3)
+    agent = RandomAgent(history_capacity=10_000)
+    history = agent.movement_history
+    partial = complete = 0
+    for step in range(3_000):
+        if env.game_over:
+            env.reset()
+        body = list(env.snake)[1:]
+        if step % 50 < 3:
+            env.step()  # Ruch w trybie człowieka - nie trafia do historii
+            continue
+        head, length, food, direction = env.snake[0], len(env.snake), env.food, list(env.direction)
+        action = agent.get_action(env.snake, env.food, direction)
+        _, reward, done = env.step(action)
+        agent.record_move(head, length, food, direction, action, reward, None if done else env.snake,
+                          env.food, done)
+
+        rebuilt = history.get_body(history.total - 1)
+        assert rebuilt == body[:len(rebuilt)]
+        partial += len(rebuilt) < len(body)
+        complete += len(rebuilt) == len(body) > 0
+    assert partial and complete  # Były i przerwy po ruchach człowieka, i całe ciała
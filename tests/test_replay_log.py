@@ -0,0 +1,29 @@
+import struct
+
+import numpy as np
+
+from utils.replay_log import EpisodeRecord, pack_actions, read_replay_log
+
+def test_round_trip_large_grid(tmp_path):
+    path = tmp_path / "games.srep"
+    records = [EpisodeRecord(2**62 + 5, 100_000, 200_000, [3, 3, 0, 2, 1], 2, 'self'),
+               EpisodeRecord(7, 30, 500, [0, 1, 2, 3, 3, 3], 0, 'timeout')]
+    with open(path, 'wb') as f:
+        for record in records:
+            f.write(record.to_bytes())
+
+    for record, read in zip(records, read_replay_log(path), strict=True):
+        assert (read.seed, read.grid_count, read.max_steps_per_game, read.score, read.death_cause) == \
+               (record.seed, record.grid_count, record.max_steps_per_game, record.score, record.death_cause)
+        np.testing.assert_array_equal(read.actions, record.actions)
+
+def test_reads_old_format(tmp_path):
+    path = tmp_path / "old.srep"
+    actions = [3, 3, 1]
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sQHIIIB', b'SREP', 11, 30, 500, 0, len(actions), 1) + pack_actions(actions))
+        f.write(EpisodeRecord(12, 70_000, 500, actions, 0, 'wall').to_bytes())
+    old, new = read_replay_log(path)
+    assert (old.seed, old.grid_count, old.death_cause) == (11, 30, 'wall')
+    assert (new.seed, new.grid_count, new.death_cause) == (12, 70_000, 'wall')
+    np.testing.assert_array_equal(old.actions, actions)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from agents.random_agent import RandomAgent
+from utils import history_log
+from utils.save_load import ModelManager
+
+def add_moves(agent, count):
+    history = agent.movement_history
+    for i in range(count):
+        history.append((history.total % 10, 0), 1, None, 3, 3, 0)
+
+def test_failed_history_write_leaves_no_gap(tmp_path, monkeypatch):
+    manager = ModelManager(str(tmp_path))
+    agent = RandomAgent(history_capacity=1_000)
+    add_moves(agent, 30)
+    assert manager.save_model(agent, 1, filename="a.pkl")
+
+    # Zapis urywa się w połowie segmentu (brak ostatniej kolumny)
+    append_segment = history_log.append_segment
+    def broken_append(path, columns, start_row):
+        append_segment(path, {name: column for name, column in columns.items() if name != 'game_over'},
+                       start_row)
+    monkeypatch.setattr(history_log, 'append_segment', broken_append)
+    add_moves(agent, 20)
+    assert not manager.save_model(agent, 2, filename="b.pkl")
+    monkeypatch.setattr(history_log, 'append_segment', append_segment)
+
+    add_moves(agent, 5)
+    assert manager.save_model(agent, 3, filename="c.pkl")
+    history = manager.load_model("c.pkl")['agent'].movement_history
+    assert history.total == 55 and history.first_row == 0
+    rows = history.get_range(0, 55)
+    np.testing.assert_array_equal(rows['head_x'], np.arange(55) % 10)
+    assert history_log.end_row(str(tmp_path / f"history_{agent.movement_history.log_id}.seglog")) == 55
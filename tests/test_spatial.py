@@ -0,0 +1,32 @@
+import random
+
+from env.snake_env import SnakeEnv
+from env.spatial import SpatialIndex
+
+def test_sparse_index_matches_dense():
+    rng = random.Random(5)
+    # Plansza mniejsza niż SEARCH_MIN_BUDGET - A* zawsze kończy przed limitem, więc wyniki są dokładne
+    env = SnakeEnv(8, seed=5)
+    dense = SpatialIndex(8, sparse=False)
+    sparse = SpatialIndex(8, sparse=True)
+    for _ in range(3_000):
+        if env.game_over:
+            env.reset()
+        dense.update(env.snake, env.food)
+        sparse.update(env.snake, env.food)
+        assert dense.safe_actions() == sparse.safe_actions()
+        for action in range(4):
+            assert dense.food_distance(action) == sparse.food_distance(action)
+            assert dense.reachable_area(action) == sparse.reachable_area(action)
+        safe = dense.safe_actions()
+        env.step(rng.choice(safe) if safe else 0)
+
+def test_huge_board_index_stays_small():
+    env = SnakeEnv(3_000, seed=1)
+    spatial = SpatialIndex(3_000)
+    spatial.update(env.snake, env.food)
+    assert spatial.sparse and len(spatial.occupied) == len(env.snake)
+    head_x, head_y = env.snake[0]
+    food_x, food_y = env.food
+    assert spatial.food_distance() == abs(head_x - food_x) + abs(head_y - food_y)
+    assert spatial.reachable_area(spatial.safe_actions()[0], 100) == 100
@@ -0,0 +1,144 @@
+import threading
+import time
+
+class AsyncCheckpointWriter:
+    """Zapisuje punkty kontrolne ModelManager w osobnym wątku
+
+    request_save() robi w wątku gry tylko tanią migawkę (mały .pkl, raport
+    i kopia nowych wierszy historii) i od razu wraca. Wątek zapisu zapisuje
+    pliki atomowo (plik tymczasowy + zmiana nazwy). Zapisy zgłoszone jeden
+    po drugim, zanim wątek zdążył je wykonać, są łączone: z okresowych
+    zapisów (periodic=True, każdy pod inną nazwą z licznikiem gier) trafia
+    na dysk tylko najnowszy, a z nazwanych - najnowszy dla każdej nazwy.
+    Segmenty historii są zapisywane ze wszystkich migawek.
+    flush() czeka na zapis wszystkiego (np. przed wyjściem z gry).
+    """
+
+    def __init__(self, model_manager):
+        self.model_manager = model_manager
+        self._pending = []  # Migawki czekające na zapis
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+        # Metryki
+        self.saves_requested = 0
+        self.saves_written = 0
+        self.saves_coalesced = 0
+        self.saves_failed = 0
+        self.max_queue_depth = 0
+        self.last_snapshot_ms = 0.0
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.total_write_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def request_save(self, agent, games_played, best_score=0, filename=None, total_restarts=0,
+                     periodic=False):
+        """Zleca zapis punktu kontrolnego (argumenty jak w ModelManager.save_model)
+
+        periodic - zapis automatyczny, który może zastąpić nowszy okresowy
+        zapis z kolejki (nazwane zapisy, np. emergency_save, nigdy nie są pomijane).
+        """
+        start = time.perf_counter()
+        try:
+            checkpoint = self.model_manager.prepare_checkpoint(agent, games_played, best_score,
+                                                               filename, total_restarts)
+        except Exception as e:
+            print(f"Błąd zapisywania: {e}")
+            return False
+        checkpoint.periodic = periodic
+        self.last_snapshot_ms = (time.perf_counter() - start) * 1000
+
+        with self._condition:
+            if self._closed:
+                return False
+            self._pending.append(checkpoint)
+            self.saves_requested += 1
+            self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+            self._condition.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """Czeka, aż wszystkie zleczone zapisy trafią na dysk"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """Zapisuje zaległe punkty kontrolne i zatrzymuje wątek zapisu"""
+        self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def get_metrics(self):
+        """Zwraca metryki: głębokość kolejki, liczniki i czasy zapisu"""
+        with self._condition:
+            queue_depth = len(self._pending)
+            writing = self._writing
+        written = self.saves_written
+        return {
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'writing': writing,
+            'saves_requested': self.saves_requested,
+            'saves_written': written,
+            'saves_coalesced': self.saves_coalesced,
+            'saves_failed': self.saves_failed,
+            'last_snapshot_ms': round(self.last_snapshot_ms, 3),
+            'last_write_ms': round(self.last_write_ms, 3),
+            'avg_write_ms': round(self.total_write_ms / written, 3) if written else 0.0,
+            'max_write_ms': round(self.max_write_ms, 3),
+        }
+
+    def _coalesce(self, batch):
+        """Zwraca migawki do zapisu, w kolejności zgłoszeń
+
+        Zostaje najnowszy zapis okresowy i najnowszy zapis każdej nazwy pliku.
+        Segmenty historii pominiętych migawek są dopisywane razem z następną
+        zapisywaną, więc log nadal powstaje wiersz po wierszu.
+        """
+        def key(checkpoint):
+            return None if checkpoint.periodic else checkpoint.filepath
+
+        latest = {key(checkpoint): index for index, checkpoint in enumerate(batch)}
+        writes = []
+        segments = []
+        for index, checkpoint in enumerate(batch):
+            segments.extend(checkpoint.segments)
+            if latest[key(checkpoint)] == index:
+                checkpoint.segments = segments
+                segments = []
+                writes.append(checkpoint)
+        self.saves_coalesced += len(batch) - len(writes)
+        return writes
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                batch = self._pending
+                self._pending = []
+                self._writing = True
+
+            start = time.perf_counter()
+            for checkpoint in self._coalesce(batch):
+                try:
+                    self.model_manager.write_checkpoint(checkpoint)
+                    self.saves_written += 1
+                except Exception as e:
+                    self.saves_failed += 1
+                    print(f"Błąd zapisywania: {e}")
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._condition:
+                self.last_write_ms = elapsed_ms
+                self.max_write_ms = max(self.max_write_ms, elapsed_ms)
+                self.total_write_ms += elapsed_ms
+                self._writing = False
+                self._condition.notify_all()
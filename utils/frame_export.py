@@ -0,0 +1,183 @@
+"""Eksport gier z pliku powtórek do klatek PNG albo stosów NumPy, bez okna
+
+Gry są odtwarzane z (ziarno, akcje) w osobnych procesach i rysowane
+przez GameRenderer.compose_frame na powierzchniach poza ekranem
+(SDL_VIDEODRIVER=dummy), więc eksport nie dotyka ani uczenia, ani pętli
+okna gry. Każda gra trafia do katalogu game_NNNNN/ z plikami
+frame_NNNNN.png albo do pliku game_NNNNN.npy z tablicą (klatki, wysokość,
+szerokość, 3) uint8 zapisywaną na dysk klatka po klatce. Spis
+wyeksportowanych gier jest w episodes.json.
+
+Uruchomienie:
+    python -m utils.frame_export replays/games.srep klatki/ [--worst 20] [--cause wall self]
+                                 [--games 3 7] [--format npy] [--cell 10] [--every 2]
+                                 [--hud] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+
+from utils.replay_log import DEATH_CAUSES, read_replay_log
+
+FORMATS = ('png', 'npy')
+CELL_SIZE = 10  # Piksele na pole
+MAX_FRAME_SIZE = 600  # Większe plansze są rysowane w widoku podążającym za głową
+
+def episode_name(number):
+    return f"game_{number:05d}"
+
+def frame_steps(actions, every=1):
+    """Zwraca kroki, po których zapisywana jest klatka (zawsze początek i koniec gry)"""
+    steps = list(range(0, actions + 1, every))
+    if steps[-1] != actions:
+        steps.append(actions)
+    return steps
+
+def render_episode(record, path, fmt='png', cell_size=CELL_SIZE, every=1, hud=False):
+    """Odtwarza grę i zapisuje jej klatki (katalog PNG albo plik .npy), zwraca liczbę klatek"""
+    import pygame
+
+    from utils.visualization import GameRenderer
+    pygame.font.init()
+    size = min(record.grid_count * cell_size, MAX_FRAME_SIZE)
+    surface = pygame.Surface((size, size))
+    renderer = GameRenderer(surface, size, cell_size, grid_count=record.grid_count)
+
+    env = record.make_env()
+    actions = record.actions.tolist()
+    steps = frame_steps(len(actions), every)
+    if fmt == 'npy':
+        temp_path = path + '.tmp'
+        frames = np.lib.format.open_memmap(temp_path, mode='w+', dtype=np.uint8,
+                                           shape=(len(steps), size, size, 3))
+    else:
+        os.makedirs(path, exist_ok=True)
+
+    step = 0
+    for index, target in enumerate(steps):
+        while step < target:
+            env.step(actions[step])
+            step += 1
+        renderer.compose_frame(env.snake, env.food, env.score, "Agent", current_steps=step,
+                               game_over=env.game_over, hud=hud)
+        if fmt == 'npy':
+            pixels = pygame.image.tostring(surface, 'RGB')
+            frames[index] = np.frombuffer(pixels, dtype=np.uint8).reshape(size, size, 3)
+        else:
+            pygame.image.save(surface, os.path.join(path, f"frame_{index:05d}.png"))
+
+    if fmt == 'npy':
+        frames.flush()
+        del frames
+        os.replace(temp_path, path)
+    return len(steps)
+
+# --- Procesy robocze ---
+
+_worker = {}
+
+def _init_worker(output_dir, fmt, cell_size, every, hud):
+    _worker.update(output_dir=output_dir, fmt=fmt, cell_size=cell_size, every=every, hud=hud)
+
+def _export_task(task):
+    number, record = task
+    start = time.perf_counter()
+    name = episode_name(number) + ('.npy' if _worker['fmt'] == 'npy' else '')
+    frames = render_episode(record, os.path.join(_worker['output_dir'], name), _worker['fmt'],
+                            _worker['cell_size'], _worker['every'], _worker['hud'])
+    return {
+        'game': number,
+        'seed': record.seed,
+        'score': record.score,
+        'death_cause': record.death_cause,
+        'steps': len(record.actions),
+        'frames': frames,
+        'path': name,
+    }, time.perf_counter() - start
+
+def select_episodes(path, games=None, causes=None, worst=None):
+    """Zwraca [(numer gry, EpisodeRecord)] z pliku powtórek według filtrów
+
+    games - numery gier, causes - przyczyny końca, worst - N gier
+    z najniższym wynikiem (po pozostałych filtrach).
+    """
+    wanted = set(games) if games else None
+    selected = [(number, record) for number, record in enumerate(read_replay_log(path))
+                if (wanted is None or number in wanted) and (not causes or record.death_cause in causes)]
+    if worst is not None:
+        selected = sorted(selected, key=lambda item: (item[1].score, len(item[1].actions)))[:worst]
+        selected.sort(key=lambda item: item[0])
+    return selected
+
+def export_episodes(episodes, output_dir, fmt='png', cell_size=CELL_SIZE, every=1, hud=False,
+                    workers=None, progress=None):
+    """Eksportuje gry [(numer, EpisodeRecord)] do output_dir i zwraca spis (lista słowników)
+
+    workers=1 rysuje w bieżącym procesie. progress - opcjonalna funkcja
+    (wyeksportowane gry, wszystkie gry).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Nieznany format: {fmt} (dostępne: {', '.join(FORMATS)})")
+    os.makedirs(output_dir, exist_ok=True)
+    settings = (output_dir, fmt, cell_size, every, hud)
+    workers = min(workers or os.cpu_count() or 1, len(episodes)) or 1
+    entries = []
+
+    def collect(results):
+        for entry, elapsed in results:
+            entry['seconds'] = round(elapsed, 3)
+            entries.append(entry)
+            if progress:
+                progress(len(entries), len(episodes))
+
+    if workers == 1:
+        _init_worker(*settings)
+        collect(map(_export_task, episodes))
+    else:
+        with mp.get_context().Pool(workers, _init_worker, settings) as pool:
+            collect(pool.imap_unordered(_export_task, episodes))
+
+    entries.sort(key=lambda entry: entry['game'])
+    temp_path = os.path.join(output_dir, 'episodes.json.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2)
+        f.write("\n")
+    os.replace(temp_path, os.path.join(output_dir, 'episodes.json'))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description="Eksport gier z pliku powtórek do klatek PNG lub NumPy")
+    parser.add_argument('path', help="plik powtórek .srep")
+    parser.add_argument('output_dir')
+    parser.add_argument('--games', type=int, nargs='+', help="numery gier w pliku (od 0)")
+    parser.add_argument('--cause', nargs='+', choices=[cause for cause in DEATH_CAUSES if cause],
+                        help="tylko gry zakończone tą przyczyną")
+    parser.add_argument('--worst', type=int, help="N gier z najniższym wynikiem")
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--cell', type=int, default=CELL_SIZE, help="piksele na pole")
+    parser.add_argument('--every', type=int, default=1, help="co która klatka (koniec gry zawsze)")
+    parser.add_argument('--hud', action='store_true', help="rysuj napisy (wynik, instrukcje)")
+    parser.add_argument('--workers', type=int, help="liczba procesów (domyślnie liczba rdzeni)")
+    args = parser.parse_args()
+
+    episodes = select_episodes(args.path, args.games, args.cause, args.worst)
+    if not episodes:
+        print("Brak gier do eksportu")
+        return
+    start = time.perf_counter()
+    print(f"Gry: {len(episodes)}, format: {args.format}, katalog: {args.output_dir}")
+    entries = export_episodes(episodes, args.output_dir, args.format, args.cell, max(args.every, 1), args.hud,
+                              args.workers)
+    elapsed = time.perf_counter() - start
+    frames = sum(entry['frames'] for entry in entries)
+    print(f"Klatki: {frames}, czas: {elapsed:.1f} s, {frames / elapsed if elapsed else 0:,.0f} klatek/s")
+
+if __name__ == "__main__":
+    main()
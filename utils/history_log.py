@@ -0,0 +1,132 @@
+import os
+import struct
+
+import numpy as np
+
+from utils.replay_buffer import FIELDS
+
+# Segment logu: nagłówek (magic, pierwszy wiersz, liczba wierszy) i kolumny po kolei
+SEGMENT_MAGIC = b'SSEG'
+SEGMENT_HEADER = struct.Struct('<4sQI')
+ROW_SIZE = sum(np.dtype(dtype).itemsize for _, dtype in FIELDS)
+
+def segment_size(count):
+    """Rozmiar segmentu z count wierszami w bajtach"""
+    return SEGMENT_HEADER.size + count * ROW_SIZE
+
+def append_segment(path, columns, start_row):
+    """Dopisuje segment z wierszami [start_row, start_row + n) na koniec logu
+
+    Zwraca rozmiar pliku po zapisie. Przy błędzie zapisu plik jest
+    przycinany do poprzedniego rozmiaru.
+    """
+    count = len(columns[FIELDS[0][0]])
+    with open(path, 'ab') as f:
+        size = f.tell()
+        try:
+            f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, start_row, count))
+            for name, dtype in FIELDS:
+                f.write(np.ascontiguousarray(columns[name], dtype=dtype).data)
+            f.flush()
+        except BaseException:
+            # Niepełny segment zasłoniłby następne - log wraca do stanu sprzed zapisu
+            f.truncate(size)
+            raise
+        return f.tell()
+
+def iter_segments(path, limit=None):
+    """Zwraca kolejne segmenty jako (pierwszy wiersz, liczba wierszy, offset danych)
+
+    limit - czytaj tylko pierwsze limit bajtów pliku (stan z chwili zapisu
+    punktu kontrolnego). Niepełny segment na końcu pliku jest pomijany.
+    """
+    if not os.path.exists(path):
+        return
+    size = os.path.getsize(path) if limit is None else min(limit, os.path.getsize(path))
+    with open(path, 'rb') as f:
+        offset = 0
+        while offset + SEGMENT_HEADER.size <= size:
+            f.seek(offset)
+            magic, start_row, count = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+            data_offset = offset + SEGMENT_HEADER.size
+            end = data_offset + count * ROW_SIZE
+            if magic != SEGMENT_MAGIC or end > size:
+                return
+            yield start_row, count, data_offset
+            offset = end
+
+def end_row(path, limit=None):
+    """Zwraca numer wiersza za ostatnim zapisanym w logu (0 dla pustego logu)"""
+    last = 0
+    for start_row, count, _ in iter_segments(path, limit):
+        last = start_row + count
+    return last
+
+def _contiguous_pieces(path, start, stop, limit=None):
+    """Zwraca (pierwszy wiersz, kawałki segmentów) najdłuższego ciągłego zakresu kończącego się na stop"""
+    pieces = []
+    for seg_start, count, data_offset in iter_segments(path, limit):
+        lo, hi = max(start, seg_start), min(stop, seg_start + count)
+        if lo < hi:
+            pieces.append((seg_start, count, data_offset, lo, hi))
+
+    # Zostaw tylko ciągły zakres przylegający do stop
+    first = stop
+    contiguous = []
+    for piece in reversed(pieces):
+        if piece[4] != first:
+            break
+        contiguous.append(piece)
+        first = piece[3]
+    contiguous.reverse()
+    return first, contiguous
+
+class MappedRows:
+    """Wiersze [first, stop) logu zmapowane w pamięci (np.memmap, tylko do odczytu)
+
+    Plik nie jest czytany przy otwarciu - system wczytuje strony dopiero
+    przy dostępie do danych. Każdy segment to osobny kawałek z widokami
+    kolumn, więc zakres w jednym segmencie jest zwracany bez kopiowania.
+    """
+
+    def __init__(self, path, start, stop, limit=None):
+        self.first, contiguous = _contiguous_pieces(path, start, stop, limit)
+        self.stop = stop
+        self.pieces = []  # (pierwszy wiersz, koniec, słownik widoków kolumn)
+        if not contiguous:
+            return
+        _, count, data_offset, _, _ = contiguous[-1]
+        raw = np.memmap(path, dtype=np.uint8, mode='r', shape=(data_offset + count * ROW_SIZE,))
+        for seg_start, count, data_offset, lo, hi in contiguous:
+            columns = {}
+            column_offset = data_offset
+            for name, dtype in FIELDS:
+                itemsize = np.dtype(dtype).itemsize
+                begin = column_offset + (lo - seg_start) * itemsize
+                columns[name] = raw[begin:begin + (hi - lo) * itemsize].view(dtype)
+                column_offset += count * itemsize
+            self.pieces.append((lo, hi, columns))
+
+    def __len__(self):
+        return self.stop - self.first
+
+    def get_range(self, start, stop):
+        """Zwraca kolumny wierszy [start, stop) (widoki, gdy zakres leży w jednym segmencie)"""
+        start, stop = max(start, self.first), min(stop, self.stop)
+        parts = [(lo, hi, columns) for lo, hi, columns in self.pieces if lo < stop and hi > start]
+        if len(parts) == 1:
+            lo, _, columns = parts[0]
+            return {name: column[start - lo:stop - lo] for name, column in columns.items()}
+        return {name: np.concatenate([columns[name][max(start, lo) - lo:min(stop, hi) - lo]
+                                      for lo, hi, columns in parts] or [np.zeros(0, dtype=dtype)])
+                for name, dtype in FIELDS}
+
+def read_rows(path, start, stop, limit=None):
+    """Czyta wiersze [start, stop) z logu, zwraca (pierwszy wiersz, słownik kolumn)
+
+    Wiersze brakujące w logu (np. nadpisane w buforze przed zapisem) są
+    pomijane - zwracany jest najdłuższy ciągły zakres kończący się na stop.
+    """
+    rows = MappedRows(path, start, stop, limit)
+    columns = {name: np.array(column) for name, column in rows.get_range(rows.first, stop).items()}
+    return rows.first, columns
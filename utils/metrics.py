@@ -0,0 +1,140 @@
+import json
+import os
+import time
+
+# Przyczyny końca gry zliczane osobno
+DEATH_CAUSES = ('wall', 'self', 'timeout', 'win')
+
+class Metrics:
+    """Czasy faz pętli gry i liczniki zdarzeń z okresowym eksportem do pliku
+
+    Pomiar działa przez podmianę metod na konkretnych obiektach (wrap) na
+    wersje mierzące czas - po unwrap_all() obiekty wracają do zwykłych metod
+    klasy, więc wyłączona instrumentacja nic nie kosztuje.
+
+    Eksport (export/maybe_export) zapisuje migawkę do pliku:
+    - *.jsonl - dopisuje jedną linię JSON na eksport,
+    - inne (np. *.prom) - nadpisuje atomowo plik w formacie tekstowym
+      Prometheusa, który może czytać lokalny scraper (textfile collector).
+    """
+
+    def __init__(self, path, export_interval=10.0):
+        self.path = path
+        self.export_interval = export_interval
+        self.format = 'jsonl' if path.endswith('.jsonl') else 'prometheus'
+        self.started = time.time()
+        self.next_export = time.perf_counter() + export_interval
+
+        self.phases = {}  # faza -> [liczba wywołań, łączny czas, maks. czas]
+        self.counters = {'games': 0, 'steps': 0, 'food_eaten': 0}
+        self.deaths = {cause: 0 for cause in DEATH_CAUSES}
+        self.extra = {}  # Dodatkowe źródła metryk: nazwa -> funkcja zwracająca słownik
+        self._wrapped = []
+
+    def wrap(self, obj, name, phase, on_result=None):
+        """Podmienia obj.name na wersję mierzącą czas fazy phase"""
+        original = getattr(obj, name)
+        stats = self.phases.setdefault(phase, [0, 0.0, 0.0])
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = original(*args, **kwargs)
+            elapsed = clock() - start
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        setattr(obj, name, timed)
+        self._wrapped.append((obj, name))
+
+    def unwrap_all(self):
+        """Przywraca oryginalne metody wszystkich obiektów"""
+        for obj, name in reversed(self._wrapped):
+            obj.__dict__.pop(name, None)
+        self._wrapped.clear()
+
+    def count_step(self, env):
+        """Zwraca funkcję zliczającą wynik SnakeEnv.step (do wrap on_result)"""
+        counters, deaths = self.counters, self.deaths
+
+        def on_step(result):
+            _, reward, done = result
+            counters['steps'] += 1
+            if reward > 0:
+                counters['food_eaten'] += 1
+            if done:
+                counters['games'] += 1
+                if env.death_cause in deaths:
+                    deaths[env.death_cause] += 1
+
+        return on_step
+
+    def snapshot(self):
+        """Zwraca bieżące wartości metryk jako słownik"""
+        data = {
+            'timestamp': time.time(),
+            'uptime_s': round(time.time() - self.started, 3),
+            'phases': {
+                phase: {
+                    'calls': calls,
+                    'total_s': round(total, 6),
+                    'avg_us': round(total / calls * 1e6, 3) if calls else 0.0,
+                    'max_us': round(peak * 1e6, 3),
+                }
+                for phase, (calls, total, peak) in self.phases.items()
+            },
+            'counters': dict(self.counters),
+            'deaths': dict(self.deaths),
+        }
+        for name, source in self.extra.items():
+            data[name] = source()
+        return data
+
+    def maybe_export(self):
+        """Eksportuje metryki, jeśli minął export_interval"""
+        if time.perf_counter() >= self.next_export:
+            self.export()
+
+    def export(self):
+        """Zapisuje migawkę metryk do pliku"""
+        self.next_export = time.perf_counter() + self.export_interval
+        data = self.snapshot()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            if self.format == 'jsonl':
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(data) + "\n")
+            else:
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(self.to_prometheus(data))
+                os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Błąd eksportu metryk: {e}")
+
+    def to_prometheus(self, data):
+        """Formatuje migawkę w formacie tekstowym Prometheusa"""
+        lines = [
+            "# TYPE snake_phase_calls_total counter",
+            *(f'snake_phase_calls_total{{phase="{p}"}} {v["calls"]}' for p, v in data['phases'].items()),
+            "# TYPE snake_phase_seconds_total counter",
+            *(f'snake_phase_seconds_total{{phase="{p}"}} {v["total_s"]}' for p, v in data['phases'].items()),
+            "# TYPE snake_phase_max_seconds gauge",
+            *(f'snake_phase_max_seconds{{phase="{p}"}} {v["max_us"] / 1e6}' for p, v in data['phases'].items()),
+        ]
+        for name, value in data['counters'].items():
+            lines += [f"# TYPE snake_{name}_total counter", f"snake_{name}_total {value}"]
+        lines.append("# TYPE snake_deaths_total counter")
+        lines += [f'snake_deaths_total{{cause="{cause}"}} {value}' for cause, value in data['deaths'].items()]
+        for name, values in self.extra.items():
+            for key, value in data[name].items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines += [f"# TYPE snake_{name}_{key} gauge", f"snake_{name}_{key} {value}"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,271 @@
+import os
+import sqlite3
+import threading
+import time
+
+REGISTRY_FILENAME = "registry.sqlite"
+
+# Pola odczytywane z raportu .txt przy jednorazowym imporcie starych punktów kontrolnych
+_REPORT_FIELDS = {
+    "Liczba rozegranych gier: ": 'games_played',
+    "Najlepszy wynik: ": 'best_score',
+    "Liczba restartów: ": 'total_restarts',
+    "Typ agenta: ": 'agent_type',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    filename TEXT PRIMARY KEY,
+    txt_filename TEXT,
+    saved_at REAL NOT NULL,
+    games_played INTEGER,
+    best_score INTEGER,
+    total_restarts INTEGER,
+    agent_type TEXT,
+    pkl_size INTEGER NOT NULL,
+    txt_size INTEGER NOT NULL DEFAULT 0,
+    history_logs TEXT
+);
+CREATE INDEX IF NOT EXISTS checkpoints_saved_at ON checkpoints (saved_at);
+CREATE INDEX IF NOT EXISTS checkpoints_best_score ON checkpoints (best_score, saved_at);
+"""
+
+class CheckpointRegistry:
+    """Indeks punktów kontrolnych w SQLite (models/registry.sqlite)
+
+    Każdy zapis dopisuje wiersz z liczbą gier, najlepszym wynikiem, rozmiarem
+    plików i czasem zapisu, więc najnowszy/najlepszy model i zapytania po
+    wyniku korzystają z indeksu zamiast os.listdir i stat każdego pliku.
+    Przy pierwszym użyciu w katalogu bez rejestru istniejące pliki .pkl są
+    importowane raz (metadane z raportów .txt, a bez raportu - z read_metadata,
+    np. ModelManager.load_metadata). Usuwanie plików przez
+    retencję zawsze usuwa parę .pkl/.txt razem z wierszem.
+    """
+
+    def __init__(self, models_dir, read_metadata=None):
+        self.models_dir = models_dir
+        self.read_metadata = read_metadata
+        self.path = os.path.join(models_dir, REGISTRY_FILENAME)
+        is_new = not os.path.exists(self.path)
+        # Zapisy przychodzą też z wątku AsyncCheckpointWriter
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        # Schemat tylko przy pierwszym otwarciu (user_version = 1 po jego utworzeniu)
+        if not self._db.execute("PRAGMA user_version").fetchone()[0]:
+            self._db.executescript(_SCHEMA + "PRAGMA user_version = 1;")
+        if is_new:
+            self.import_directory()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record(self, filename, games_played=None, best_score=None, total_restarts=0, agent_type=None,
+               txt_filename=None, history_logs=None, saved_at=None):
+        """Zapisuje (lub nadpisuje) wiersz punktu kontrolnego po zapisie plików
+
+        history_logs - nazwy logów historii, z których korzysta .pkl
+        (None gdy nieznane - wtedy retencja nie usuwa żadnych logów).
+        """
+        pkl_size = self._file_size(filename)
+        txt_size = self._file_size(txt_filename) if txt_filename else 0
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (filename, txt_filename if txt_size else None, saved_at or time.time(), games_played,
+                 best_score, total_restarts, agent_type, pkl_size, txt_size,
+                 None if history_logs is None else ','.join(sorted(history_logs))))
+
+    def import_directory(self):
+        """Jednorazowo rejestruje pliki .pkl, które są w katalogu, a nie ma ich w rejestrze"""
+        known = {row['filename'] for row in self._query("SELECT filename FROM checkpoints")}
+        imported = 0
+        for filename in os.listdir(self.models_dir):
+            if not filename.endswith('.pkl') or filename in known:
+                continue
+            txt_filename = filename[:-len('.pkl')] + '.txt'
+            info = self._read_report(txt_filename)
+            has_report = bool(info)
+            if not has_report and self.read_metadata is not None:
+                info = self.read_metadata(filename) or {}
+            self.record(filename, info.get('games_played'), info.get('best_score'),
+                        info.get('total_restarts', 0), info.get('agent_type'),
+                        txt_filename if has_report else None,
+                        saved_at=os.path.getmtime(os.path.join(self.models_dir, filename)))
+            imported += 1
+        return imported
+
+    def _read_report(self, txt_filename):
+        """Odczytuje metadane z raportu .txt (pusty słownik gdy brak raportu)"""
+        try:
+            with open(os.path.join(self.models_dir, txt_filename), 'r', encoding='utf-8') as f:
+                report = f.read()
+        except OSError:
+            return {}
+        info = {}
+        for line in report.splitlines():
+            for prefix, key in _REPORT_FIELDS.items():
+                if key not in info and line.startswith(prefix):
+                    value = line[len(prefix):].strip()
+                    if key == 'agent_type':
+                        info[key] = value
+                    elif value.split(' ')[0].isdigit():  # "5 punktów"
+                        info[key] = int(value.split(' ')[0])
+        return info
+
+    def _file_size(self, filename):
+        try:
+            return os.path.getsize(os.path.join(self.models_dir, filename))
+        except OSError:
+            return 0
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # --- Zapytania ---
+
+    def latest(self):
+        """Zwraca wiersz najnowszego punktu kontrolnego (albo None)"""
+        return self._first_existing("ORDER BY saved_at DESC")
+
+    def best(self):
+        """Zwraca wiersz punktu kontrolnego z najlepszym wynikiem (przy remisie najnowszy)"""
+        return self._first_existing("WHERE best_score IS NOT NULL ORDER BY best_score DESC, saved_at DESC")
+
+    def _first_existing(self, clause):
+        """Pierwszy wiersz zapytania, którego plik nadal istnieje (usunięte z zewnątrz są wypisywane)"""
+        while True:
+            rows = self._query(f"SELECT * FROM checkpoints {clause} LIMIT 1")
+            if not rows:
+                return None
+            if os.path.exists(os.path.join(self.models_dir, rows[0]['filename'])):
+                return rows[0]
+            self.forget(rows[0]['filename'])
+
+    def list(self, min_score=None, max_score=None, limit=None):
+        """Zwraca wiersze od najnowszych, opcjonalnie z wynikiem w przedziale"""
+        conditions, params = [], []
+        if min_score is not None:
+            conditions.append("best_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            conditions.append("best_score <= ?")
+            params.append(max_score)
+        sql = "SELECT * FROM checkpoints"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY saved_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._query(sql, params)
+
+    def totals(self):
+        """Zwraca (liczba punktów kontrolnych, liczba plików, suma rozmiarów .pkl i .txt)"""
+        row = self._query("SELECT COUNT(*), COUNT(txt_filename), COALESCE(SUM(pkl_size + txt_size), 0) "
+                          "FROM checkpoints")[0]
+        return row[0], row[0] + row[1], row[2]
+
+    def history_logs(self):
+        """Zwraca zbiór nazw logów historii używanych przez zarejestrowane punkty kontrolne"""
+        logs = set()
+        for row in self._query("SELECT DISTINCT history_logs FROM checkpoints WHERE history_logs != ''"):
+            if row[0]:
+                logs.update(row[0].split(','))
+        return logs
+
+    # --- Retencja ---
+
+    def forget(self, filename):
+        """Usuwa wiersz z rejestru (bez usuwania plików)"""
+        with self._lock:
+            self._db.execute("DELETE FROM checkpoints WHERE filename = ?", (filename,))
+
+    def remove(self, row):
+        """Usuwa parę plików .pkl/.txt punktu kontrolnego i jego wiersz"""
+        for name in (row['filename'], row['txt_filename']):
+            if name:
+                try:
+                    os.remove(os.path.join(self.models_dir, name))
+                except FileNotFoundError:
+                    pass
+        self.forget(row['filename'])
+
+    def apply_retention(self, keep_last=None, keep_best=None, max_size_mb=None):
+        """Usuwa punkty kontrolne spoza polityki i zwraca listę usuniętych nazw .pkl
+
+        keep_last - zachowaj N najnowszych, keep_best - zachowaj K z najlepszym
+        wynikiem (gdy podano oba, zachowana jest suma zbiorów), max_size_mb -
+        potem usuwaj najstarsze, aż suma rozmiarów zmieści się w limicie
+        (najnowszy punkt kontrolny nie jest nigdy usuwany). Suma obejmuje
+        pary .pkl/.txt i używane przez nie logi historii; logi punktów
+        kontrolnych zaimportowanych bez ich listy nie są liczone.
+        """
+        rows = self.list()  # Od najnowszych
+        removed = []
+        if keep_last is not None or keep_best is not None:
+            keep = set()
+            if keep_last is not None:
+                keep.update(row['filename'] for row in rows[:keep_last])
+            if keep_best is not None:
+                ranked = sorted((row for row in rows if row['best_score'] is not None),
+                                key=lambda row: (row['best_score'], row['saved_at']), reverse=True)
+                keep.update(row['filename'] for row in ranked[:keep_best])
+            if rows:
+                keep.add(rows[0]['filename'])
+            for row in rows:
+                if row['filename'] not in keep:
+                    self.remove(row)
+                    removed.append(row['filename'])
+            rows = [row for row in rows if row['filename'] in keep]
+
+        if max_size_mb is not None:
+            limit = max_size_mb * 1024 * 1024
+            # Log historii zwalnia miejsce dopiero razem z ostatnim (najnowszym)
+            # punktem kontrolnym, który z niego korzysta, a gdy jakiś punkt
+            # kontrolny ma nieznane logi - wcale (patrz _remove_unused_logs)
+            references = {}
+            unknown = 0
+            for row in rows:
+                unknown += row['history_logs'] is None
+                for log_name in self._row_logs(row):
+                    references[log_name] = references.get(log_name, 0) + 1
+            log_sizes = {log_name: self._file_size(log_name) for log_name in references}
+            unused = []  # Logi bez odwołań, usuwane dopiero bez nieznanych logów
+            total = sum(row['pkl_size'] + row['txt_size'] for row in rows) + sum(log_sizes.values())
+            for row in reversed(rows[1:]):  # Od najstarszych
+                if total <= limit:
+                    break
+                self.remove(row)
+                removed.append(row['filename'])
+                total -= row['pkl_size'] + row['txt_size']
+                unknown -= row['history_logs'] is None
+                for log_name in self._row_logs(row):
+                    references[log_name] -= 1
+                    if not references[log_name]:
+                        unused.append(log_name)
+                if not unknown:
+                    total -= sum(log_sizes[log_name] for log_name in unused)
+                    unused = []
+
+        self._remove_unused_logs()
+        return removed
+
+    @staticmethod
+    def _row_logs(row):
+        """Zwraca nazwy logów historii wiersza (pusta lista, gdy nieznane)"""
+        return row['history_logs'].split(',') if row['history_logs'] else []
+
+    def _remove_unused_logs(self):
+        """Usuwa logi historii, do których nie odwołuje się już żaden punkt kontrolny
+
+        Gdy któryś punkt kontrolny ma nieznany log (zaimportowany), logi zostają.
+        """
+        if self._query("SELECT 1 FROM checkpoints WHERE history_logs IS NULL LIMIT 1"):
+            return
+        used = self.history_logs()
+        for filename in os.listdir(self.models_dir):
+            if filename.endswith('.seglog') and filename not in used:
+                os.remove(os.path.join(self.models_dir, filename))
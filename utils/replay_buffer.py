@@ -0,0 +1,221 @@
+import time
+import uuid
+
+import numpy as np
+
+from env.snake_env import ACTION_DIRECTIONS
+
+DEFAULT_CAPACITY = 100_000
+
+# Kolumny bufora i ich typy. Ciało węża nie jest kopiowane - w obrębie gry
+# ciało w kroku t to głowy z kroków t, t-1, ..., t-length+1 (patrz get_body)
+FIELDS = (
+    ('timestamp', np.float64),
+    ('head_x', np.int16), ('head_y', np.int16),
+    ('length', np.int32),
+    ('food_x', np.int16), ('food_y', np.int16),  # -1 gdy brak jedzenia
+    ('direction', np.int8),  # Indeks kierunku przed ruchem (jak akcje 0-3)
+    ('action', np.int8),
+    ('reward', np.int8),
+    ('new_head_x', np.int16), ('new_head_y', np.int16),  # -1 gdy gra się skończyła
+    ('food_eaten', np.bool_),
+    ('game_over', np.bool_),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+
+class ReplayBuffer:
+    """Bufor cykliczny ruchów o stałej pojemności, przechowywany kolumnami
+
+    Każda kolumna to prealokowana tablica NumPy o zwartym typie. Dopisanie
+    ruchu to O(1), losowanie minibatcha jest wektorowe, a fragmenty bez
+    zawinięcia bufora są zwracane jako widoki (bez kopiowania).
+    Wiersze mają numery globalne (0, 1, 2, ... od początku nagrywania) -
+    w buforze są dostępne ostatnie min(total, capacity) z nich.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.total = 0  # Liczba wszystkich dopisanych wierszy
+        self.log_id = uuid.uuid4().hex[:12]  # Identyfikator logu historii (save_load)
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS}
+
+    @classmethod
+    def from_mapped(cls, capacity, total, log_id, rows):
+        """Tworzy bufor wczytywany leniwie z wierszy logu (history_log.MappedRows)
+
+        Odczyty (get_range, recent) korzystają wprost z mapowanego pliku;
+        tablice o pełnej pojemności powstają dopiero przy pierwszym zapisie
+        lub innym użyciu kolumn.
+        """
+        buffer = cls.__new__(cls)
+        buffer.capacity = capacity
+        buffer.total = total
+        buffer.log_id = log_id
+        buffer._mapped = rows
+        if rows.first > total - min(total, capacity):
+            buffer._materialize()  # Log nie ma wszystkich wierszy - liczby muszą się zgadzać
+        return buffer
+
+    def __getattr__(self, name):
+        # Kolumny leniwie wczytanego bufora powstają przy pierwszym użyciu
+        if name == 'columns' and '_mapped' in self.__dict__:
+            self._materialize()
+            return self.columns
+        raise AttributeError(name)
+
+    def _materialize(self):
+        """Kopiuje zmapowane wiersze logu do tablic o pełnej pojemności"""
+        rows = self.__dict__.pop('_mapped')
+        self.columns = {name: np.zeros(self.capacity, dtype=dtype) for name, dtype in FIELDS}
+        self.total = rows.first
+        for lo, hi, columns in rows.pieces:
+            self.extend(columns)
+
+    @property
+    def is_mapped(self):
+        """Czy bufor nadal czyta wiersze z mapowanego logu"""
+        return '_mapped' in self.__dict__
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    @property
+    def first_row(self):
+        """Globalny numer najstarszego wiersza w buforze"""
+        return self.total - len(self)
+
+    def append(self, head, length, food, direction, action, reward,
+               new_head=None, food_eaten=False, game_over=False, timestamp=None):
+        """Dopisuje jeden ruch (nadpisuje najstarszy gdy bufor jest pełny)"""
+        i = self.total % self.capacity
+        c = self.columns
+        c['timestamp'][i] = time.time() if timestamp is None else timestamp
+        c['head_x'][i], c['head_y'][i] = head
+        c['length'][i] = length
+        c['food_x'][i], c['food_y'][i] = food if food is not None else (-1, -1)
+        c['direction'][i] = direction
+        c['action'][i] = action
+        c['reward'][i] = reward
+        c['new_head_x'][i], c['new_head_y'][i] = new_head if new_head is not None else (-1, -1)
+        c['food_eaten'][i] = food_eaten
+        c['game_over'][i] = game_over
+        self.total += 1
+
+    def extend(self, batch):
+        """Dopisuje paczkę wierszy (słownik kolumn lub tablica strukturalna)
+
+        Brakujące kolumny dostają wartość 0 (new_head: -1).
+        """
+        names = batch.dtype.names if hasattr(batch, 'dtype') else tuple(batch)
+        count = len(batch[names[0]])
+        if count > self.capacity:
+            batch = {name: batch[name][-self.capacity:] for name in names}
+            self.total += count - self.capacity
+            count = self.capacity
+        positions = (self.total + np.arange(count)) % self.capacity
+        for name, column in self.columns.items():
+            if name in names:
+                column[positions] = batch[name]
+            else:
+                column[positions] = -1 if name.startswith('new_head') else 0
+        self.total += count
+
+    def _positions(self, rows):
+        return np.asarray(rows) % self.capacity
+
+    def get_range(self, start, stop):
+        """Zwraca kolumny dla wierszy globalnych [start, stop)
+
+        Gdy zakres nie przechodzi przez koniec tablicy, kolumny są widokami
+        (zero-copy), w przeciwnym razie są sklejane z dwóch kawałków.
+        """
+        start = max(start, self.first_row)
+        stop = min(stop, self.total)
+        if '_mapped' in self.__dict__:
+            return self._mapped.get_range(start, stop)
+        if stop <= start:
+            return {name: column[:0] for name, column in self.columns.items()}
+        begin = start % self.capacity
+        end = begin + (stop - start)
+        if end <= self.capacity:
+            return {name: column[begin:end] for name, column in self.columns.items()}
+        end -= self.capacity
+        return {name: np.concatenate((column[begin:], column[:end]))
+                for name, column in self.columns.items()}
+
+    def recent(self, n):
+        """Zwraca kolumny dla ostatnich n wierszy"""
+        return self.get_range(self.total - n, self.total)
+
+    def sample(self, batch_size, rng=None):
+        """Losuje minibatch wierszy (z powtórzeniami), zwraca słownik kolumn"""
+        rng = rng or np.random.default_rng()
+        rows = self.first_row + rng.integers(0, len(self), size=batch_size)
+        positions = self._positions(rows)
+        return {name: column[positions] for name, column in self.columns.items()}
+
+    def get_body(self, row):
+        """Odtwarza ciało węża (bez głowy) dla wiersza globalnego row
+
+        Zwraca None, gdy potrzebne wcześniejsze wiersze zostały już nadpisane.
+        Gdy ruchy nie były nagrywane jeden po drugim (np. ruchy w trybie
+        człowieka w środku gry), zwraca tylko część ciała od głowy do
+        pierwszej przerwy - wcześniejsze wiersze to już inna pozycja węża.
+        """
+        c = self.columns
+        length = int(c['length'][row % self.capacity])
+        if row - length + 1 < self.first_row:
+            return None
+        positions = self._positions(np.arange(row, row - length, -1))
+        xs = c['head_x'][positions]
+        ys = c['head_y'][positions]
+        # Wiersz należy do tego samego ciągu ruchów, jeśli jego nowa głowa to głowa wiersza po nim
+        linked = (c['new_head_x'][positions[1:]] == xs[:-1]) & (c['new_head_y'][positions[1:]] == ys[:-1])
+        known = len(linked) if linked.all() else int(np.argmin(linked))
+        return list(zip(xs[1:known + 1].tolist(), ys[1:known + 1].tolist()))
+
+    def get_move(self, row):
+        """Zwraca wiersz jako słownik w dawnym formacie movement_history"""
+        i = row % self.capacity
+        c = self.columns
+        food = (int(c['food_x'][i]), int(c['food_y'][i]))
+        new_head = (int(c['new_head_x'][i]), int(c['new_head_y'][i]))
+        return {
+            'timestamp': float(c['timestamp'][i]),
+            'snake_head': (int(c['head_x'][i]), int(c['head_y'][i])),
+            'snake_body': self.get_body(row),
+            'food_position': food if food[0] >= 0 else None,
+            'direction': list(ACTION_DIRECTIONS[c['direction'][i]]),
+            'action': int(c['action'][i]),
+            'reward': int(c['reward'][i]),
+            'new_snake_head': new_head if new_head[0] >= 0 else None,
+            'food_eaten': bool(c['food_eaten'][i]),
+            'game_over': bool(c['game_over'][i]),
+            'game_score': int(c['length'][i]) - 1,
+        }
+
+    def nbytes(self):
+        """Rozmiar bufora w bajtach"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def __getstate__(self):
+        # Niezapełniony bufor zapisujemy bez pustej końcówki tablic
+        used = len(self)
+        return {
+            'capacity': self.capacity,
+            'total': self.total,
+            'log_id': self.log_id,
+            'columns': {name: column[:used] for name, column in self.columns.items()},
+        }
+
+    def __setstate__(self, state):
+        self.capacity = state['capacity']
+        self.total = state['total']
+        self.log_id = state.get('log_id') or uuid.uuid4().hex[:12]
+        self.columns = {}
+        for name, dtype in FIELDS:
+            column = np.zeros(self.capacity, dtype=dtype)
+            saved = state['columns'].get(name)
+            if saved is not None:
+                column[:len(saved)] = saved
+            self.columns[name] = column
@@ -0,0 +1,181 @@
+"""Zapis gier jako (ziarno, akcje) i bezgłowe odtwarzanie
+
+Gra SnakeEnv jest wyznaczona przez ziarno (episode_seed) i akcje agenta,
+więc zamiast pełnych stanów wystarczy zapisać ziarno i akcje po 2 bity.
+Odtwarzanie przechodzi przez ten sam silnik z maksymalną prędkością
+i pozwala odtworzyć stan (lub klatkę) w dowolnym kroku oraz sprawdzić,
+czy wynik zgadza się z zapisanym.
+
+Uruchomienie:
+    python -m utils.replay_log verify replays/games.srep
+    python -m utils.replay_log frame replays/games.srep --game 3 --step 50 --output klatka.png
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from env.snake_env import SnakeEnv
+
+RECORD_MAGIC = b'SRE2'
+# magic, ziarno, rozmiar planszy, limit kroków, wynik, liczba akcji, przyczyna końca
+RECORD_HEADER = struct.Struct('<4sQIIIIB')
+# Wcześniejszy format z rozmiarem planszy jako uint16 - tylko do odczytu
+RECORD_HEADERS = {RECORD_MAGIC: RECORD_HEADER, b'SREP': struct.Struct('<4sQHIIIB')}
+DEATH_CAUSES = (None, 'wall', 'self', 'timeout', 'win')
+CAUSE_CODES = {cause: code for code, cause in enumerate(DEATH_CAUSES)}
+
+def pack_actions(actions):
+    """Pakuje akcje 0-3 po 4 w bajcie"""
+    actions = np.asarray(actions, dtype=np.uint8)
+    padded = np.zeros(-(-len(actions) // 4) * 4, dtype=np.uint8)
+    padded[:len(actions)] = actions
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | quads[:, 1] << 2 | quads[:, 2] << 4 | quads[:, 3] << 6).astype(np.uint8).tobytes()
+
+def unpack_actions(data, count):
+    """Odwraca pack_actions"""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    quads = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=1)
+    return quads.reshape(-1)[:count].astype(np.int8)
+
+class EpisodeRecord:
+    """Jedna gra: ziarno, ustawienia planszy, akcje i wynik końcowy"""
+
+    def __init__(self, seed, grid_count, max_steps_per_game, actions, score, death_cause):
+        self.seed = seed
+        self.grid_count = grid_count
+        self.max_steps_per_game = max_steps_per_game
+        self.actions = np.asarray(actions, dtype=np.int8)
+        self.score = score
+        self.death_cause = death_cause
+
+    @classmethod
+    def from_env(cls, env):
+        """Zapis bieżącej gry SnakeEnv (None, gdy grały nie tylko akcje agenta)"""
+        if not env.replayable:
+            return None
+        return cls(env.episode_seed, env.grid_count, env.max_steps_per_game,
+                   env.actions, env.score, env.death_cause)
+
+    def to_bytes(self):
+        return RECORD_HEADER.pack(RECORD_MAGIC, self.seed, self.grid_count, self.max_steps_per_game,
+                                  self.score, len(self.actions),
+                                  CAUSE_CODES[self.death_cause]) + pack_actions(self.actions)
+
+    def make_env(self):
+        """Zwraca SnakeEnv ustawiony na początek tej gry"""
+        env = SnakeEnv(self.grid_count, self.max_steps_per_game, seed=0)
+        env.reset(self.seed)
+        return env
+
+    def replay(self, until=None):
+        """Odtwarza grę (do kroku until) i zwraca SnakeEnv w tym stanie"""
+        env = self.make_env()
+        step = env.step
+        for action in self.actions[:until].tolist():
+            step(action)
+        return env
+
+    def verify(self):
+        """Czy odtworzona gra kończy się z zapisanym wynikiem i przyczyną"""
+        env = self.replay()
+        return env.score == self.score and env.death_cause == self.death_cause
+
+class ReplayLogWriter:
+    """Dopisuje zapisy gier do pliku (append-only)"""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.games = 0
+        self.bytes_written = 0
+        self._file = open(path, 'ab')
+
+    def append(self, record):
+        data = record.to_bytes()
+        self._file.write(data)
+        self.games += 1
+        self.bytes_written += len(data)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def read_replay_log(path):
+    """Zwraca kolejne EpisodeRecord z pliku (urwany ostatni zapis jest pomijany)
+
+    Czyta też zapisy w starszym formacie (SREP), także przemieszane z nowymi
+    w jednym pliku dopisywanym przez kolejne wersje.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            header = f.read(4)
+            if len(header) < 4:
+                return
+            record_header = RECORD_HEADERS.get(header)
+            if record_header is None:
+                raise ValueError(f"Uszkodzony plik powtórek: {path}")
+            header += f.read(record_header.size - 4)
+            if len(header) < record_header.size:
+                return
+            magic, seed, grid_count, max_steps, score, count, cause = record_header.unpack(header)
+            data = f.read(-(-count // 4))
+            if len(data) < -(-count // 4):
+                return
+            yield EpisodeRecord(seed, grid_count, max_steps, unpack_actions(data, count),
+                                score, DEATH_CAUSES[cause])
+
+def render_frame(env, path, grid_size=20):
+    """Zapisuje stan env jako obraz PNG (rysuje GameRenderer na powierzchni poza ekranem)"""
+    import pygame
+
+    from utils.visualization import GameRenderer
+    pygame.font.init()
+    window_size = env.grid_count * grid_size
+    surface = pygame.Surface((window_size, window_size))
+    renderer = GameRenderer(surface, window_size, grid_size)
+    renderer.compose_frame(env.snake, env.food, env.score, "Agent", game_over=env.game_over)
+    pygame.image.save(surface, path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Odtwarzanie gier zapisanych jako (ziarno, akcje)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    verify = subparsers.add_parser('verify', help="odtwórz wszystkie gry i porównaj wyniki")
+    verify.add_argument('path')
+    frame = subparsers.add_parser('frame', help="zapisz klatkę wybranej gry jako PNG")
+    frame.add_argument('path')
+    frame.add_argument('--game', type=int, default=0, help="numer gry w pliku (od 0)")
+    frame.add_argument('--step', type=int, default=None, help="krok (domyślnie koniec gry)")
+    frame.add_argument('--output', default='frame.png')
+    args = parser.parse_args()
+
+    if args.command == 'verify':
+        games = steps = mismatches = 0
+        start = time.perf_counter()
+        for record in read_replay_log(args.path):
+            if not record.verify():
+                mismatches += 1
+                print(f"Niezgodna gra {games}: ziarno {record.seed}")
+            games += 1
+            steps += len(record.actions)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(args.path)
+        print(f"Gry: {games}, kroki: {steps}, niezgodne: {mismatches}, "
+              f"{steps / elapsed if elapsed else 0:,.0f} kroków/s, {size / max(steps, 1):.2f} B/krok")
+    else:
+        for number, record in enumerate(read_replay_log(args.path)):
+            if number == args.game:
+                render_frame(record.replay(args.step), args.output)
+                print(f"Zapisano {args.output}")
+                return
+        print(f"Brak gry {args.game} w {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import multiprocessing as mp
+import os
+import queue
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from env.snake_env import SnakeEnv, GRID_COUNT, MAX_STEPS_PER_GAME, DIRECTION_ACTIONS
+
+# Jeden wiersz = jedno przejście (stan przed ruchem, akcja, nagroda, koniec)
+TRANSITION_DTYPE = np.dtype([
+    ('head_x', np.int16), ('head_y', np.int16),
+    ('food_x', np.int16), ('food_y', np.int16),  # -1 gdy brak jedzenia
+    ('direction', np.int8),  # Indeks kierunku przed ruchem (jak akcje 0-3)
+    ('length', np.int32),
+    ('action', np.int8),
+    ('reward', np.int8),
+    ('done', np.bool_),
+])
+
+def _rollout_worker(worker_id, agent, shm_name, num_slots, slot_size,
+                    free_queue, ready_queue, stop_event, grid_count, max_steps, seed):
+    """Proces roboczy: gra kopią agenta i zapisuje przejścia do pamięci współdzielonej"""
+    random.seed(seed)  # Każdy proces musi mieć własny strumień losowy
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slots = np.ndarray((num_slots, slot_size), dtype=TRANSITION_DTYPE, buffer=shm.buf)
+    env = SnakeEnv(grid_count, max_steps)
+    seed_episode = getattr(agent, 'seed_episode', None)
+    if seed_episode:
+        seed_episode(env.episode_seed)
+    snake, food, direction = env.get_observation()
+    rows = []
+    try:
+        while not stop_event.is_set():
+            try:
+                slot = free_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            games = 0
+            for _ in range(slot_size):
+                head = snake[0]
+                food_x, food_y = food if food is not None else (-1, -1)
+                state = (head[0], head[1], food_x, food_y,
+                         DIRECTION_ACTIONS[tuple(direction)], len(snake))
+                action = agent.get_action(snake, food, direction)
+                (snake, food, direction), reward, done = env.step(action)
+                rows.append(state + (action, reward, done))
+                if done:
+                    games += 1
+                    snake, food, direction = env.reset()
+                    if seed_episode:
+                        seed_episode(env.episode_seed)
+
+            slots[slot] = rows
+            rows.clear()
+            ready_queue.put((worker_id, slot, slot_size, games))
+    finally:
+        del slots
+        shm.close()
+
+class RolloutCollector:
+    """Zbiera przejścia z gier rozgrywanych równolegle w K procesach
+
+    Każdy proces gra własną kopią agenta (dowolny obiekt z get_action)
+    w bezgłowym SnakeEnv. Przejścia trafiają do bloków pamięci współdzielonej
+    (po num_slots slotów na proces), a przez kolejkę idą tylko numery slotów.
+    Proces główny kopiuje slot i oddaje go procesowi - gdy konsument nie
+    nadąża, procesy czekają na wolny slot.
+
+    Użycie:
+        with RolloutCollector(agent, num_workers=8) as collector:
+            for batch in collector.collect(1_000_000):
+                ...  # batch to tablica o typie TRANSITION_DTYPE
+            print(collector.get_throughput())
+    """
+
+    def __init__(self, agent, num_workers=None, slot_size=4096, num_slots=4,
+                 grid_count=GRID_COUNT, max_steps_per_game=MAX_STEPS_PER_GAME, seed=None):
+        self.agent = agent
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.slot_size = slot_size
+        self.num_slots = num_slots
+        self.grid_count = grid_count
+        self.max_steps_per_game = max_steps_per_game
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+
+        self.workers = []
+        self.shared_blocks = []
+        self.slot_views = []
+        self.free_queues = []
+        self.ready_queue = None
+        self.stop_event = None
+        self.start_time = None
+        self.reset_throughput()
+
+    def start(self):
+        """Tworzy bloki pamięci współdzielonej i uruchamia procesy robocze"""
+        if self.workers:
+            return
+        ctx = mp.get_context()
+        self.ready_queue = ctx.Queue()
+        self.stop_event = ctx.Event()
+        block_size = self.num_slots * self.slot_size * TRANSITION_DTYPE.itemsize
+
+        for worker_id in range(self.num_workers):
+            shm = shared_memory.SharedMemory(create=True, size=block_size)
+            self.shared_blocks.append(shm)
+            self.slot_views.append(np.ndarray((self.num_slots, self.slot_size),
+                                              dtype=TRANSITION_DTYPE, buffer=shm.buf))
+            free_queue = ctx.Queue()
+            for slot in range(self.num_slots):
+                free_queue.put(slot)
+            self.free_queues.append(free_queue)
+
+            process = ctx.Process(
+                target=_rollout_worker,
+                args=(worker_id, self.agent, shm.name, self.num_slots, self.slot_size,
+                      free_queue, self.ready_queue, self.stop_event,
+                      self.grid_count, self.max_steps_per_game, self.seed + worker_id),
+                daemon=True)
+            process.start()
+            self.workers.append(process)
+
+        self.start_time = time.perf_counter()
+
+    def collect(self, num_transitions):
+        """Generator zwracający paczki przejść, aż zbierze num_transitions"""
+        self.start()
+        collected = 0
+        while collected < num_transitions:
+            worker_id, slot, count, games = self.ready_queue.get()
+            batch = self.slot_views[worker_id][slot][:count].copy()
+            self.free_queues[worker_id].put(slot)
+
+            collected += count
+            self.transitions_collected += count
+            self.games_collected += games
+            self.worker_transitions[worker_id] += count
+            yield batch
+
+    def reset_throughput(self):
+        """Zeruje liczniki przepustowości (np. po rozgrzewce)"""
+        self.transitions_collected = 0
+        self.games_collected = 0
+        self.worker_transitions = [0] * self.num_workers
+        if self.start_time is not None:
+            self.start_time = time.perf_counter()
+
+    def get_throughput(self):
+        """Zwraca łączną przepustowość zbierania"""
+        elapsed = time.perf_counter() - self.start_time if self.start_time else 0.0
+        return {
+            'workers': self.num_workers,
+            'transitions': self.transitions_collected,
+            'games': self.games_collected,
+            'elapsed_s': round(elapsed, 3),
+            'transitions_per_s': round(self.transitions_collected / elapsed, 1) if elapsed > 0 else 0,
+            'per_worker': list(self.worker_transitions),
+        }
+
+    def close(self):
+        """Zatrzymuje procesy i zwalnia pamięć współdzieloną"""
+        if not self.workers:
+            return
+        self.stop_event.set()
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.slot_views.clear()
+        for shm in self.shared_blocks:
+            shm.close()
+            shm.unlink()
+        self.workers.clear()
+        self.shared_blocks.clear()
+        self.free_queues.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
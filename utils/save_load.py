@@ -1,22 +1,102 @@
+import io
 import pickle
 import os
 from datetime import datetime
 
+from utils.registry import CheckpointRegistry
+
+# history_log i ReplayBuffer (numpy) są importowane dopiero przy zapisie
+# i wczytywaniu historii - listy, raporty i metadane obchodzą się bez nich
+
+class _CheckpointPickler(pickle.Pickler):
+    """Zapisuje historię ruchów do logu segmentów zamiast do pliku .pkl"""
+    
+    def __init__(self, file, manager):
+        from utils.replay_buffer import ReplayBuffer
+        super().__init__(file)
+        self.manager = manager
+        self.buffer_type = ReplayBuffer
+        self.segments = []  # Segmenty logu do dopisania razem z tym .pkl
+        self.logs = set()  # Nazwy logów historii, do których odwołuje się .pkl
+    
+    def persistent_id(self, obj):
+        if isinstance(obj, self.buffer_type):
+            ref = self.manager._plan_history(obj, self.segments)
+            self.logs.add(ref['log'])
+            return ('history', ref)
+        return None
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    """Odtwarza historię ruchów z logu segmentów przy wczytywaniu .pkl"""
+    
+    def __init__(self, file, manager):
+        super().__init__(file)
+        self.manager = manager
+    
+    def persistent_load(self, pid):
+        kind, ref = pid
+        if kind == 'history':
+            return self.manager._read_history(ref)
+        raise pickle.UnpicklingError(f"Nieznany obiekt zewnętrzny: {kind}")
+
+CHECKPOINT_FORMAT = 2  # .pkl: pickle metadanych, potem pickle danych modelu
+
+class Checkpoint:
+    """Migawka punktu kontrolnego gotowa do zapisu na dysk"""
+    
+    def __init__(self, filepath, snapshot, txt_filepath, report, segments, info=None):
+        self.filepath = filepath
+        self.snapshot = snapshot  # Zawartość pliku .pkl
+        self.txt_filepath = txt_filepath
+        self.report = report  # Treść raportu .txt
+        self.segments = segments  # [(ścieżka logu, jego rozmiar przed segmentem, pierwszy wiersz, kolumny)]
+        self.info = info or {}  # Metadane do rejestru (gry, wynik, logi historii...)
+        self.periodic = False  # Zapis okresowy (AsyncCheckpointWriter może go zastąpić nowszym)
+
 class ModelManager:
-    """Zarządza zapisywaniem i wczytywaniem modeli agentów"""
+    """Zarządza zapisywaniem i wczytywaniem modeli agentów
+    
+    Punkt kontrolny składa się z dwóch części: małego pliku .pkl z parametrami
+    i licznikami agenta oraz logu historii ruchów (history_<id>.seglog),
+    do którego przy każdym zapisie dopisywane są tylko nowe wiersze.
+    Plik .pkl pamięta, do którego miejsca log należy do danego zapisu,
+    więc load_model odtworzy dowolny punkt kontrolny, a czas zapisu nie
+    rośnie wraz z długością treningu.
+    
+    Każdy zapis trafia też do rejestru (CheckpointRegistry), z którego
+    korzystają wyszukiwanie, listy, retencja i użycie dysku.
+    """
     
     def __init__(self, models_dir="models"):
         self.models_dir = models_dir
         if not os.path.exists(self.models_dir):
             os.makedirs(self.models_dir)
+        self._log_state = {}  # (liczba wierszy, rozmiar) każdego logu historii
+        self.registry = CheckpointRegistry(self.models_dir, self.load_metadata)
     
     def save_model(self, agent, games_played, best_score=0, filename=None, total_restarts=0):
         """Zapisuje model agenta"""
+        try:
+            self.write_checkpoint(self.prepare_checkpoint(agent, games_played, best_score,
+                                                          filename, total_restarts))
+            return True
+        except Exception as e:
+            print(f"Błąd zapisywania: {e}")
+            return False
+    
+    def prepare_checkpoint(self, agent, games_played, best_score=0, filename=None, total_restarts=0):
+        """Robi spójną migawkę punktu kontrolnego w pamięci (bez zapisu na dysk)
+        
+        Migawka zawiera gotowy .pkl, treść raportu .txt i kopie nowych wierszy
+        historii, więc agent może dalej grać, a zapis wykona write_checkpoint
+        (także w innym wątku - patrz AsyncCheckpointWriter).
+        """
         if filename is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"snake_model_{games_played}_{timestamp}.pkl"
         
         filepath = os.path.join(self.models_dir, filename)
+        txt_filepath = os.path.join(self.models_dir, filename.replace('.pkl', '.txt'))
         model_data = {
             'agent': agent,
             'games_played': games_played,
@@ -25,78 +105,137 @@ class ModelManager:
             'timestamp': datetime.now().isoformat()
         }
         
+        # Plik .pkl to dwa pickle po kolei: małe metadane (load_metadata czyta tylko je)
+        # i dane modelu z agentem
+        snapshot = io.BytesIO()
+        metadata = {key: value for key, value in model_data.items() if key != 'agent'}
+        metadata.update({'format': CHECKPOINT_FORMAT, 'agent_type': agent.__class__.__name__})
+        pickle.dump(metadata, snapshot)
+        pickler = _CheckpointPickler(snapshot, self)
+        pickler.dump(model_data)
+        
         try:
-            # Zapis w formacie .pkl
-            with open(filepath, 'wb') as f:
-                pickle.dump(model_data, f)
-            print(f"Model zapisany: {filepath}")
-            
-            # Zapis w formacie .txt (czytelny)
-            txt_filename = filename.replace('.pkl', '.txt')
-            txt_filepath = os.path.join(self.models_dir, txt_filename)
-            self._save_txt_report(model_data, txt_filepath)
-            
-            return True
+            report = self._build_txt_report(model_data, txt_filepath)
         except Exception as e:
-            print(f"Błąd zapisywania: {e}")
-            return False
+            print(f"Błąd zapisywania raportu TXT: {e}")
+            report = None
+        
+        info = {
+            'games_played': games_played,
+            'best_score': best_score,
+            'total_restarts': total_restarts,
+            'agent_type': agent.__class__.__name__,
+            'history_logs': pickler.logs,
+        }
+        return Checkpoint(filepath, snapshot.getvalue(), txt_filepath, report, pickler.segments, info)
     
-    def _save_txt_report(self, model_data, filepath):
-        """Zapisuje raport w formacie TXT"""
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write("=== RAPORT AGENTA SNAKE ===\n")
-                f.write(f"Data zapisu: {model_data['timestamp']}\n")
-                f.write(f"Typ agenta: {model_data['agent'].__class__.__name__}\n")
-                f.write(f"Liczba rozegranych gier: {model_data['games_played']}\n")
-                f.write(f"Najlepszy wynik: {model_data['best_score']} punktów\n")
-                f.write(f"Liczba restartów: {model_data.get('total_restarts', 0)}\n")
-                
-                # Dodatkowe informacje o agencie
-                if hasattr(model_data['agent'], 'name'):
-                    f.write(f"Nazwa agenta: {model_data['agent'].name}\n")
-                
-                # Statystyki (jeśli dostępne)
-                if hasattr(model_data['agent'], 'get_stats'):
-                    stats = model_data['agent'].get_stats()
-                    f.write("\n=== STATYSTYKI ===\n")
-                    for key, value in stats.items():
-                        f.write(f"{key}: {value}\n")
-                
-                # Szczegółowe statystyki ruchów
-                if hasattr(model_data['agent'], 'get_detailed_stats'):
-                    detailed_stats = model_data['agent'].get_detailed_stats()
-                    if detailed_stats:
-                        f.write("\n=== SZCZEGÓŁOWE STATYSTYKI RUCHÓW ===\n")
-                        f.write(f"Zarejestrowane ruchy: {detailed_stats.get('total_moves_recorded', 0)}\n")
-                        f.write(f"Ostatnie ruchy (analiza): {detailed_stats.get('recent_moves', 0)}\n")
-                        f.write(f"Udane ruchy: {detailed_stats.get('successful_moves_count', 0)}\n")
-                        f.write(f"Wzorce sukcesu: {detailed_stats.get('successful_patterns_count', 0)}\n")
-                        f.write(f"Wzorce porażki: {detailed_stats.get('failed_patterns_count', 0)}\n")
-                        f.write(f"Średni wynik: {detailed_stats.get('average_score', 0):.2f}\n")
-                        
-                        # Rozkład akcji
-                        action_dist = detailed_stats.get('action_distribution', {})
-                        if action_dist:
-                            f.write("\nRozkład akcji (ostatnie 100 ruchów):\n")
-                            for action, count in action_dist.items():
-                                action_names = {0: 'góra', 1: 'dół', 2: 'lewo', 3: 'prawo'}
-                                f.write(f"  {action_names.get(action, action)}: {count}\n")
-                
-                f.write("\n=== INFORMACJE TECHNICZNE ===\n")
-                f.write(f"Plik .pkl: {filepath.replace('.txt', '.pkl')}\n")
-                f.write(f"Plik .txt: {filepath}\n")
+    def write_checkpoint(self, checkpoint):
+        """Zapisuje migawkę na dysk: segmenty historii, potem .pkl i .txt, na końcu wpis w rejestrze"""
+        from utils import history_log
+        for log_path, log_size, start_row, columns in checkpoint.segments:
+            try:
+                size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+                if size != log_size:
+                    raise IOError(f"Log {os.path.basename(log_path)} ma {size} B zamiast {log_size} B "
+                                  f"(nieudany wcześniejszy zapis)")
+                history_log.append_segment(log_path, columns, start_row)
+            except Exception:
+                # Następny zapis zaplanuje historię od stanu logu na dysku, bez luki
+                self._log_state.pop(os.path.basename(log_path), None)
+                raise
+        
+        # Zapis w formacie .pkl
+        self._write_atomic(checkpoint.filepath, checkpoint.snapshot)
+        print(f"Model zapisany: {checkpoint.filepath}")
+        
+        # Zapis w formacie .txt (czytelny)
+        if checkpoint.report is not None:
+            try:
+                self._write_atomic(checkpoint.txt_filepath, checkpoint.report.encode('utf-8'))
+                print(f"Raport TXT zapisany: {checkpoint.txt_filepath}")
+            except Exception as e:
+                print(f"Błąd zapisywania raportu TXT: {e}")
+        
+        self.registry.record(os.path.basename(checkpoint.filepath),
+                             txt_filename=os.path.basename(checkpoint.txt_filepath), **checkpoint.info)
+    
+    def _write_atomic(self, filepath, data):
+        """Zapisuje plik przez plik tymczasowy i zmianę nazwy"""
+        tmp_filepath = filepath + '.tmp'
+        with open(tmp_filepath, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_filepath, filepath)
+    
+    def _build_txt_report(self, model_data, filepath):
+        """Buduje treść raportu TXT"""
+        f = io.StringIO()
+        f.write("=== RAPORT AGENTA SNAKE ===\n")
+        f.write(f"Data zapisu: {model_data['timestamp']}\n")
+        f.write(f"Typ agenta: {model_data['agent'].__class__.__name__}\n")
+        f.write(f"Liczba rozegranych gier: {model_data['games_played']}\n")
+        f.write(f"Najlepszy wynik: {model_data['best_score']} punktów\n")
+        f.write(f"Liczba restartów: {model_data.get('total_restarts', 0)}\n")
+        
+        # Dodatkowe informacje o agencie
+        if hasattr(model_data['agent'], 'name'):
+            f.write(f"Nazwa agenta: {model_data['agent'].name}\n")
+        
+        # Statystyki (jeśli dostępne)
+        if hasattr(model_data['agent'], 'get_stats'):
+            stats = model_data['agent'].get_stats()
+            f.write("\n=== STATYSTYKI ===\n")
+            for key, value in stats.items():
+                f.write(f"{key}: {value}\n")
+        
+        # Szczegółowe statystyki ruchów
+        if hasattr(model_data['agent'], 'get_detailed_stats'):
+            detailed_stats = model_data['agent'].get_detailed_stats()
+            if detailed_stats:
+                f.write("\n=== SZCZEGÓŁOWE STATYSTYKI RUCHÓW ===\n")
+                f.write(f"Zarejestrowane ruchy: {detailed_stats.get('total_moves_recorded', 0)}\n")
+                f.write(f"Ostatnie ruchy (analiza): {detailed_stats.get('recent_moves', 0)}\n")
+                f.write(f"Udane ruchy: {detailed_stats.get('successful_moves_count', 0)}\n")
+                f.write(f"Wzorce sukcesu: {detailed_stats.get('successful_patterns_count', 0)}\n")
+                f.write(f"Wzorce porażki: {detailed_stats.get('failed_patterns_count', 0)}\n")
+                f.write(f"Średni wynik (ostatnie {detailed_stats.get('window_games', 0)} gier): "
+                        f"{detailed_stats.get('average_score', 0):.2f}\n")
+                if 'games' in detailed_stats:
+                    f.write(f"Zarejestrowane gry: {detailed_stats['games']}\n")
+                    f.write(f"Średni wynik (wszystkie gry): {detailed_stats['lifetime_average_score']:.2f}\n")
+                    f.write(f"Wynik EMA: {detailed_stats['score_ema']:.2f}\n")
+                    f.write(f"Percentyle wyniku (p50/p90/p99): {detailed_stats['score_p50']}/"
+                            f"{detailed_stats['score_p90']}/{detailed_stats['score_p99']}\n")
+                    f.write(f"Maks. wynik / długość / kroki: {detailed_stats['max_score']}/"
+                            f"{detailed_stats['max_length']}/{detailed_stats['max_steps']}\n")
+                    f.write(f"Średnia długość / kroki na grę (ostatnie gry): "
+                            f"{detailed_stats['window_average_length']:.2f}/{detailed_stats['window_average_steps']:.2f}\n")
+                    death_causes = detailed_stats['death_causes']
+                    if death_causes:
+                        f.write("Przyczyny końca gry: " + ", ".join(
+                            f"{cause}: {count}" for cause, count in sorted(death_causes.items())) + "\n")
                 
-            print(f"Raport TXT zapisany: {filepath}")
-        except Exception as e:
-            print(f"Błąd zapisywania raportu TXT: {e}")
+                # Rozkład akcji
+                action_dist = detailed_stats.get('action_distribution', {})
+                if action_dist:
+                    f.write("\nRozkład akcji (ostatnie 100 ruchów):\n")
+                    for action, count in action_dist.items():
+                        action_names = {0: 'góra', 1: 'dół', 2: 'lewo', 3: 'prawo'}
+                        f.write(f"  {action_names.get(action, action)}: {count}\n")
+        
+        f.write("\n=== INFORMACJE TECHNICZNE ===\n")
+        f.write(f"Plik .pkl: {filepath.replace('.txt', '.pkl')}\n")
+        f.write(f"Plik .txt: {filepath}\n")
+        
+        return f.getvalue()
     
     def load_model(self, filename):
-        """Wczytuje model agenta"""
+        """Wczytuje model agenta (historia ruchów jest mapowana z logu i czytana na żądanie)"""
         filepath = os.path.join(self.models_dir, filename)
         try:
             with open(filepath, 'rb') as f:
-                model_data = pickle.load(f)
+                model_data = _CheckpointUnpickler(f, self).load()
+                if model_data.get('format') == CHECKPOINT_FORMAT:
+                    model_data = _CheckpointUnpickler(f, self).load()
             
             print(f"Model wczytany: {filepath}")
             return model_data
@@ -104,18 +243,83 @@ class ModelManager:
             print(f"Błąd wczytywania: {e}")
             return None
     
+    def load_metadata(self, filename):
+        """Zwraca metadane punktu kontrolnego bez wczytywania agenta
+        
+        Słownik z games_played, best_score, total_restarts, timestamp
+        i agent_type. Stary format (jeden pickle) wymaga wczytania całości.
+        """
+        filepath = os.path.join(self.models_dir, filename)
+        try:
+            with open(filepath, 'rb') as f:
+                metadata = _CheckpointUnpickler(f, self).load()
+            if metadata.get('format') != CHECKPOINT_FORMAT:
+                agent = metadata.pop('agent', None)
+                metadata['agent_type'] = agent.__class__.__name__
+            return metadata
+        except Exception as e:
+            print(f"Błąd wczytywania: {e}")
+            return None
+    
+    def _plan_history(self, buffer, segments):
+        """Kopiuje wiersze bufora dodane od ostatniego zapisu jako segment logu
+        
+        Zwraca opis stanu logu po dopisaniu segmentu (zapisywany w .pkl).
+        Stan logu w _log_state zakłada, że zaplanowane segmenty zostaną
+        zapisane - write_checkpoint cofa go, gdy zapis segmentu się nie uda.
+        """
+        from utils import history_log
+        log_name = f"history_{buffer.log_id}.seglog"
+        log_path = os.path.join(self.models_dir, log_name)
+        if log_name not in self._log_state:
+            log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+            self._log_state[log_name] = (history_log.end_row(log_path), log_size)
+        written, log_size = self._log_state[log_name]
+        
+        start = max(written, buffer.first_row)
+        if buffer.total > start:
+            columns = {name: column.copy() for name, column in buffer.get_range(start, buffer.total).items()}
+            segments.append((log_path, log_size, start, columns))
+            log_size += history_log.segment_size(buffer.total - start)
+        self._log_state[log_name] = (max(written, buffer.total), log_size)
+        
+        return {
+            'log': log_name,
+            'log_id': buffer.log_id,
+            'log_size': log_size,
+            'capacity': buffer.capacity,
+            'total': buffer.total,
+        }
+    
+    def _read_history(self, ref):
+        """Odtwarza bufor historii ze stanu logu z chwili zapisu"""
+        import uuid
+        from utils import history_log
+        from utils.replay_buffer import ReplayBuffer
+        log_path = os.path.join(self.models_dir, ref['log'])
+        rows = history_log.MappedRows(log_path, ref['total'] - ref['capacity'], ref['total'], ref['log_size'])
+        
+        # Ten sam log można kontynuować tylko z jego najnowszego stanu,
+        # w przeciwnym razie dalsza historia trafi do nowego logu
+        log_id = None
+        if (os.path.exists(log_path) and os.path.getsize(log_path) == ref['log_size']
+                and history_log.end_row(log_path) == ref['total']):
+            log_id = ref['log_id']
+        return ReplayBuffer.from_mapped(ref['capacity'], ref['total'], log_id or uuid.uuid4().hex[:12], rows)
+    
     def get_latest_model(self):
         """Zwraca nazwę najnowszego modelu"""
-        files = [f for f in os.listdir(self.models_dir) if f.endswith('.pkl')]
-        if files:
-            latest_file = max(files, key=lambda x: os.path.getctime(os.path.join(self.models_dir, x)))
-            return latest_file
-        return None
+        row = self.registry.latest()
+        return row['filename'] if row else None
+    
+    def get_best_model(self):
+        """Zwraca nazwę modelu z najlepszym wynikiem"""
+        row = self.registry.best()
+        return row['filename'] if row else None
     
-    def list_models(self):
-        """Listuje wszystkie dostępne modele"""
-        files = [f for f in os.listdir(self.models_dir) if f.endswith('.pkl')]
-        return sorted(files, key=lambda x: os.path.getctime(os.path.join(self.models_dir, x)), reverse=True)
+    def list_models(self, min_score=None):
+        """Listuje wszystkie dostępne modele (od najnowszych, opcjonalnie z wynikiem >= min_score)"""
+        return [row['filename'] for row in self.registry.list(min_score=min_score)]
     
     def print_model_summary(self, filename=None):
         """Wyświetla podsumowanie modelu w konsoli"""
@@ -131,57 +335,49 @@ class ModelManager:
                 with open(txt_filepath, 'r', encoding='utf-8') as f:
                     print(f.read())
             else:
-                print(f"Nie znaleziono raportu TXT dla: {filename}")
+                # Bez raportu - same metadane (bez wczytywania agenta i historii)
+                metadata = self.load_metadata(filename)
+                if metadata is None:
+                    print(f"Nie znaleziono raportu TXT dla: {filename}")
+                    return
+                print(f"\n=== PODSUMOWANIE MODELU: {filename} (brak raportu TXT) ===")
+                for key, value in metadata.items():
+                    print(f"{key}: {value}")
         else:
             print("Brak dostępnych modeli")
     
     def list_all_reports(self):
         """Listuje wszystkie raporty TXT"""
-        txt_files = [f for f in os.listdir(self.models_dir) if f.endswith('.txt')]
-        if txt_files:
+        rows = [row for row in self.registry.list() if row['txt_filename']]
+        if rows:
             print("\n=== DOSTĘPNE RAPORTY ===")
-            for txt_file in sorted(txt_files, reverse=True):
-                filepath = os.path.join(self.models_dir, txt_file)
-                creation_time = datetime.fromtimestamp(os.path.getctime(filepath))
-                print(f"📄 {txt_file} (utworzony: {creation_time.strftime('%Y-%m-%d %H:%M:%S')})")
+            for row in rows:
+                creation_time = datetime.fromtimestamp(row['saved_at'])
+                print(f"📄 {row['txt_filename']} (utworzony: {creation_time.strftime('%Y-%m-%d %H:%M:%S')})")
         else:
             print("Brak dostępnych raportów TXT") 
     
-    def cleanup_old_files(self, keep_last=10):
-        """Usuwa stare pliki, zostawia tylko ostatnie keep_last"""
-        pkl_files = [f for f in os.listdir(self.models_dir) if f.endswith('.pkl')]
-        txt_files = [f for f in os.listdir(self.models_dir) if f.endswith('.txt')]
-        
-        # Sortuj po dacie utworzenia (najnowsze pierwsze)
-        pkl_files.sort(key=lambda x: os.path.getctime(os.path.join(self.models_dir, x)), reverse=True)
-        txt_files.sort(key=lambda x: os.path.getctime(os.path.join(self.models_dir, x)), reverse=True)
-        
-        # Usuń stare pliki
-        for old_file in pkl_files[keep_last:]:
-            filepath = os.path.join(self.models_dir, old_file)
-            os.remove(filepath)
-            print(f"Usunięto stary plik: {old_file}")
+    def cleanup_old_files(self, keep_last=10, keep_best=None, max_size_mb=None):
+        """Usuwa stare punkty kontrolne (pary .pkl/.txt), zostawia ostatnie keep_last
         
-        for old_file in txt_files[keep_last:]:
-            filepath = os.path.join(self.models_dir, old_file)
-            os.remove(filepath)
-            print(f"Usunięto stary plik: {old_file}")
+        keep_best - dodatkowo zostaw K najlepszych, max_size_mb - limit rozmiaru.
+        """
+        for old_file in self.registry.apply_retention(keep_last, keep_best, max_size_mb):
+            print(f"Usunięto stary punkt kontrolny: {old_file}")
         
-        print(f"Zachowano ostatnie {keep_last} plików")
+        print(f"Zachowano ostatnie {keep_last} punktów kontrolnych")
     
     def get_disk_usage(self):
-        """Zwraca informacje o użyciu dysku"""
-        total_size = 0
-        file_count = 0
-        
-        for filename in os.listdir(self.models_dir):
-            filepath = os.path.join(self.models_dir, filename)
-            if os.path.isfile(filepath):
-                total_size += os.path.getsize(filepath)
+        """Zwraca informacje o użyciu dysku (z rejestru, bez przeglądania katalogu)"""
+        _, file_count, total_size = self.registry.totals()
+        for log_name in self.registry.history_logs():
+            log_path = os.path.join(self.models_dir, log_name)
+            if os.path.exists(log_path):
+                total_size += os.path.getsize(log_path)
                 file_count += 1
         
         return {
             'file_count': file_count,
             'total_size_mb': round(total_size / (1024 * 1024), 2),
             'average_size_kb': round(total_size / file_count / 1024, 2) if file_count > 0 else 0
-        } 
\ No newline at end of file
+        }
\ No newline at end of file
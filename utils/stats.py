@@ -0,0 +1,185 @@
+from collections import deque
+
+GAME_WINDOW = 100  # Liczba ostatnich gier w statystykach okienkowych
+MOVE_WINDOW = 100  # Liczba ostatnich ruchów w rozkładzie akcji
+EMA_ALPHA = 0.05   # Waga najnowszej gry w średnich wykładniczych
+NUM_ACTIONS = 4
+
+class IntHistogram:
+    """Histogram nieujemnych liczb całkowitych z dodawaniem/usuwaniem w O(1)
+
+    Służy jako szkic percentyli: wyniki gier to małe liczby całkowite,
+    więc percentyl jest dokładny, a zapytanie kosztuje O(maks. wartość).
+    """
+
+    def __init__(self):
+        self.counts = []
+        self.total = 0
+
+    def add(self, value):
+        if value >= len(self.counts):
+            self.counts.extend([0] * (value + 1 - len(self.counts)))
+        self.counts[value] += 1
+        self.total += 1
+
+    def remove(self, value):
+        self.counts[value] -= 1
+        self.total -= 1
+
+    def percentile(self, q):
+        """Zwraca najmniejszą wartość, od której nie większych jest q% (0 gdy pusty)"""
+        if not self.total:
+            return 0
+        rank = max(1, -(-self.total * q // 100))
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return value
+        return len(self.counts) - 1
+
+class StreamingStats:
+    """Statystyki gier i ruchów aktualizowane w O(1) na każdy zapisany ruch
+
+    Trzyma sumy i maksima z całego życia agenta, sumy kroczące z ostatnich
+    GAME_WINDOW gier i MOVE_WINDOW ruchów, średnie wykładnicze (EMA)
+    oraz histogramy wyników do percentyli. Raporty i HUD czytają gotowe
+    wartości - bez przeglądania historii ruchów.
+    """
+
+    def __init__(self, game_window=GAME_WINDOW, move_window=MOVE_WINDOW):
+        # Całe życie
+        self.moves = 0
+        self.games = 0
+        self.food_eaten = 0
+        self.action_counts = [0] * NUM_ACTIONS
+        self.death_causes = {}
+        self.score_sum = 0
+        self.length_sum = 0
+        self.steps_sum = 0
+        self.max_score = 0
+        self.max_length = 0
+        self.max_steps = 0
+        self.score_histogram = IntHistogram()
+
+        # Bieżąca gra
+        self.game_score = 0
+        self.game_steps = 0
+
+        # Okno ostatnich gier: (wynik, długość, kroki)
+        self.recent_games = deque(maxlen=game_window)
+        self.window_score_sum = 0
+        self.window_length_sum = 0
+        self.window_steps_sum = 0
+        self.window_score_histogram = IntHistogram()
+
+        # Okno ostatnich ruchów: (akcja, nagroda)
+        self.recent_moves = deque(maxlen=move_window)
+        self.window_action_counts = [0] * NUM_ACTIONS
+        self.window_successful_moves = 0
+
+        # Średnie wykładnicze (None do pierwszej gry)
+        self.score_ema = None
+        self.steps_ema = None
+
+    def record_move(self, action, reward, length, game_over, death_cause=None):
+        """Dodaje jeden ruch; length to długość węża po ruchu
+
+        death_cause ('wall', 'self', 'timeout', 'win') - gdy nieznana,
+        jest zgadywana z nagrody ('collision', 'timeout', 'win').
+        """
+        self.moves += 1
+        self.action_counts[action] += 1
+        self.game_steps += 1
+        if reward > 0:
+            self.food_eaten += 1
+            self.game_score += 1
+
+        # Okno ruchów - odjęcie ruchu, który z niego wypada
+        if len(self.recent_moves) == self.recent_moves.maxlen:
+            old_action, old_reward = self.recent_moves[0]
+            self.window_action_counts[old_action] -= 1
+            if old_reward > 0:
+                self.window_successful_moves -= 1
+        self.recent_moves.append((action, reward))
+        self.window_action_counts[action] += 1
+        if reward > 0:
+            self.window_successful_moves += 1
+
+        if game_over:
+            if death_cause is None:
+                death_cause = 'win' if reward > 0 else 'collision' if reward < 0 else 'timeout'
+            self._end_game(length, death_cause)
+
+    def _end_game(self, length, death_cause):
+        """Zamyka bieżącą grę i dopisuje ją do agregatów"""
+        score, steps = self.game_score, self.game_steps
+        self.games += 1
+        self.death_causes[death_cause] = self.death_causes.get(death_cause, 0) + 1
+        self.score_sum += score
+        self.length_sum += length
+        self.steps_sum += steps
+        self.max_score = max(self.max_score, score)
+        self.max_length = max(self.max_length, length)
+        self.max_steps = max(self.max_steps, steps)
+        self.score_histogram.add(score)
+
+        if len(self.recent_games) == self.recent_games.maxlen:
+            old_score, old_length, old_steps = self.recent_games[0]
+            self.window_score_sum -= old_score
+            self.window_length_sum -= old_length
+            self.window_steps_sum -= old_steps
+            self.window_score_histogram.remove(old_score)
+        self.recent_games.append((score, length, steps))
+        self.window_score_sum += score
+        self.window_length_sum += length
+        self.window_steps_sum += steps
+        self.window_score_histogram.add(score)
+
+        if self.score_ema is None:
+            self.score_ema, self.steps_ema = float(score), float(steps)
+        else:
+            self.score_ema += EMA_ALPHA * (score - self.score_ema)
+            self.steps_ema += EMA_ALPHA * (steps - self.steps_ema)
+
+        self.game_score = 0
+        self.game_steps = 0
+
+    def window_average(self, field):
+        """Średnia z okna gier dla 'score', 'length' lub 'steps'"""
+        if not self.recent_games:
+            return 0.0
+        return getattr(self, f'window_{field}_sum') / len(self.recent_games)
+
+    def lifetime_average(self, field):
+        """Średnia z wszystkich gier dla 'score', 'length' lub 'steps'"""
+        if not self.games:
+            return 0.0
+        return getattr(self, f'{field}_sum') / self.games
+
+    def summary(self):
+        """Zwraca słownik ze wszystkimi agregatami"""
+        return {
+            'moves': self.moves,
+            'games': self.games,
+            'food_eaten': self.food_eaten,
+            'action_counts': list(self.action_counts),
+            'death_causes': dict(self.death_causes),
+            'window_games': len(self.recent_games),
+            'window_average_score': self.window_average('score'),
+            'window_average_length': self.window_average('length'),
+            'window_average_steps': self.window_average('steps'),
+            'window_score_p50': self.window_score_histogram.percentile(50),
+            'window_score_p90': self.window_score_histogram.percentile(90),
+            'average_score': self.lifetime_average('score'),
+            'average_length': self.lifetime_average('length'),
+            'average_steps': self.lifetime_average('steps'),
+            'score_p50': self.score_histogram.percentile(50),
+            'score_p90': self.score_histogram.percentile(90),
+            'score_p99': self.score_histogram.percentile(99),
+            'max_score': self.max_score,
+            'max_length': self.max_length,
+            'max_steps': self.max_steps,
+            'score_ema': self.score_ema or 0.0,
+            'steps_ema': self.steps_ema or 0.0,
+        }
@@ -0,0 +1,238 @@
+"""Turniej punktów kontrolnych: każdy model gra ten sam zestaw gier bez okna
+
+Ziarna gier są wyznaczone przez --seed, więc wszystkie modele grają
+dokładnie te same plansze (to samo jedzenie przy tych samych ruchach),
+a wynik nie zależy od liczby procesów. Gry każdego modelu są dzielone na
+paczki po CHUNK_GAMES i rozdzielane między procesy; proces wczytuje model
+raz i trzyma go w pamięci podręcznej. Agenci grają zachłannie (epsilon = 0).
+
+Uruchomienie:
+    python -m utils.tournament [--games 1000] [--seed 0] [--workers 4] [--limit 50]
+                               [--min-score 5] [--baseline random] [--rank-by p90]
+                               [--output wyniki.csv] [plik.pkl ...]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing as mp
+import os
+import random
+import time
+
+import numpy as np
+
+from agents.factory import AGENTS, create_agent
+from env.observation import ObservationEncoder
+from env.pixels import pixel_encoder_for
+from env.snake_env import GRID_COUNT, MAX_STEPS_PER_GAME, SnakeEnv
+
+CHUNK_GAMES = 100  # Gier w jednym zadaniu procesu roboczego
+BASELINE_PREFIX = "agent:"  # Wpis "agent:random" to nowy agent zamiast punktu kontrolnego
+DEATH_CAUSES = ('wall', 'self', 'timeout', 'win')
+RANK_FIELDS = ('mean', 'p50', 'p90', 'best', 'mean_steps')
+
+def game_seeds(seed, games):
+    """Zwraca listę ziaren kolejnych gier (jak strumień ziaren SnakeEnv(seed=seed))"""
+    source = random.Random(seed)
+    return [source.getrandbits(63) for _ in range(games)]
+
+def play_games(agent, seeds, grid_count=GRID_COUNT, max_steps_per_game=MAX_STEPS_PER_GAME):
+    """Rozgrywa po jednej grze na każde ziarno, zwraca (wyniki, kroki, przyczyny końca)
+
+    Agenci z get_action_from_observation dostają cechy z ObservationEncoder,
+    a agenci z get_action_from_pixels ramki z PixelEncoder (przyrostowo, jak
+    w SnakeGame.choose_action).
+    """
+    env = SnakeEnv(grid_count, max_steps_per_game, seed=0)
+    seed_episode = getattr(agent, 'seed_episode', None)
+    if hasattr(agent, 'get_action_from_observation'):
+        encoder = ObservationEncoder(env)
+        get_action = lambda snake, food, direction: agent.get_action_from_observation(*encoder.update())
+    elif hasattr(agent, 'get_action_from_pixels'):
+        pixels = pixel_encoder_for(agent, env)
+        get_action = lambda snake, food, direction: agent.get_action_from_pixels(pixels.update())
+    else:
+        get_action = agent.get_action
+    scores = np.zeros(len(seeds), dtype=np.int32)
+    steps = np.zeros(len(seeds), dtype=np.int32)
+    causes = []
+    for game, seed in enumerate(seeds):
+        snake, food, direction = env.reset(seed)
+        if seed_episode:
+            seed_episode(seed)
+        done = False
+        while not done:
+            (snake, food, direction), _, done = env.step(get_action(snake, food, direction))
+        scores[game] = env.score
+        steps[game] = env.moves
+        causes.append(env.death_cause)
+    return scores, steps, causes
+
+def summarize(name, scores, steps, causes, seconds):
+    """Zwraca wiersz wyników jednego modelu"""
+    row = {
+        'name': name,
+        'games': len(scores),
+        'mean': round(float(scores.mean()), 3),
+        'p50': float(np.percentile(scores, 50)),
+        'p90': float(np.percentile(scores, 90)),
+        'best': int(scores.max()),
+        'mean_steps': round(float(steps.mean()), 1),
+    }
+    for cause in DEATH_CAUSES:
+        row[cause] = round(causes.count(cause) / len(causes), 4)
+    row['steps_per_sec'] = round(float(steps.sum()) / seconds) if seconds else 0
+    return row
+
+# --- Procesy robocze ---
+
+_worker = {}
+
+def _init_worker(models_dir, greedy):
+    _worker.update(models_dir=models_dir, greedy=greedy, agents={})
+
+def _load_agent(entry, grid_count):
+    """Wczytuje (raz na proces) agenta z punktu kontrolnego albo tworzy agenta bazowego"""
+    agents = _worker['agents']
+    if entry not in agents:
+        if entry.startswith(BASELINE_PREFIX):
+            agent = create_agent(entry[len(BASELINE_PREFIX):], grid_count)
+        else:
+            from utils.save_load import ModelManager
+            with contextlib.redirect_stdout(io.StringIO()):  # Bez "Model wczytany" z każdego procesu
+                model_data = ModelManager(_worker['models_dir']).load_model(entry)
+            if model_data is None:
+                raise ValueError(f"Nie można wczytać punktu kontrolnego: {entry}")
+            agent = model_data['agent']
+        if _worker['greedy'] and hasattr(agent, 'epsilon'):
+            agent.epsilon = 0.0
+        agents[entry] = agent
+    return agents[entry]
+
+def _play_chunk(task):
+    entry, index, seeds, grid_count, max_steps_per_game = task
+    start = time.perf_counter()
+    try:
+        agent = _load_agent(entry, grid_count)
+    except Exception as e:
+        # Uszkodzony punkt kontrolny nie przerywa całego turnieju
+        return entry, index, None, None, str(e), 0.0
+    scores, steps, causes = play_games(agent, seeds, grid_count, max_steps_per_game)
+    return entry, index, scores, steps, causes, time.perf_counter() - start
+
+def run_tournament(entries, games=1000, seed=0, workers=None, models_dir="models", grid_count=GRID_COUNT,
+                   max_steps_per_game=MAX_STEPS_PER_GAME, greedy=True, rank_by='mean',
+                   chunk_games=CHUNK_GAMES, progress=None):
+    """Rozgrywa games gier każdym wpisem i zwraca wiersze wyników od najlepszego
+
+    entries - nazwy plików .pkl z models_dir albo "agent:<nazwa>" (agent
+    bazowy z agents.factory). workers=1 gra w bieżącym procesie.
+    progress - opcjonalna funkcja (rozegrane gry, wszystkie gry).
+    Wpisy, których nie da się wczytać, są pomijane z komunikatem.
+    """
+    seeds = game_seeds(seed, games)
+    tasks = [(entry, index, seeds[start:start + chunk_games], grid_count, max_steps_per_game)
+             for entry in entries
+             for index, start in enumerate(range(0, games, chunk_games))]
+    parts = {entry: {} for entry in entries}
+    seconds = dict.fromkeys(entries, 0.0)
+    failed = {}
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+
+    def collect(results):
+        done = 0
+        for entry, index, scores, steps, causes, elapsed in results:
+            if scores is None:
+                failed[entry] = causes
+                continue
+            parts[entry][index] = (scores, steps, causes)
+            seconds[entry] += elapsed
+            done += len(scores)
+            if progress:
+                progress(done, games * len(entries))
+
+    if workers == 1:
+        _init_worker(models_dir, greedy)
+        collect(map(_play_chunk, tasks))
+    else:
+        with mp.get_context().Pool(workers, _init_worker, (models_dir, greedy)) as pool:
+            collect(pool.imap_unordered(_play_chunk, tasks))
+
+    rows = []
+    for entry in entries:
+        if entry in failed:
+            print(f"Pominięto {entry}: {failed[entry]}")
+            continue
+        chunks = [parts[entry][index] for index in sorted(parts[entry])]
+        causes = [cause for chunk in chunks for cause in chunk[2]]
+        rows.append(summarize(entry, np.concatenate([chunk[0] for chunk in chunks]),
+                              np.concatenate([chunk[1] for chunk in chunks]), causes, seconds[entry]))
+    rows.sort(key=lambda row: (row[rank_by], row['mean'], row['p90']), reverse=True)
+    return rows
+
+def write_results(rows, path):
+    """Zapisuje tabelę wyników jako CSV albo JSON (według rozszerzenia)"""
+    if path.endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['rank'] + list(rows[0]))
+        writer.writeheader()
+        for rank, row in enumerate(rows, 1):
+            writer.writerow(dict(row, rank=rank))
+
+def print_table(rows):
+    print(f"{'#':>3} {'model':<40} {'średnia':>8} {'p50':>6} {'p90':>6} {'max':>5} {'kroki':>8} "
+          f"{'ściana':>7} {'ciało':>6} {'limit':>6} {'wygrana':>7}")
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:>3} {row['name']:<40} {row['mean']:8.2f} {row['p50']:6.1f} {row['p90']:6.1f} "
+              f"{row['best']:5d} {row['mean_steps']:8.1f} {row['wall']:7.1%} {row['self']:6.1%} "
+              f"{row['timeout']:6.1%} {row['win']:7.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Turniej punktów kontrolnych na tych samych grach")
+    parser.add_argument('checkpoints', nargs='*', help="pliki .pkl (domyślnie z rejestru modeli)")
+    parser.add_argument('--models-dir', default="models")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help="ziarno zestawu gier")
+    parser.add_argument('--workers', type=int, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument('--limit', type=int, help="najnowsze N punktów kontrolnych z rejestru")
+    parser.add_argument('--min-score', type=int, help="tylko punkty kontrolne z najlepszym wynikiem >= N")
+    parser.add_argument('--baseline', action='append', default=[], choices=sorted(AGENTS),
+                        help="dodaj nowego agenta jako punkt odniesienia (można powtórzyć)")
+    parser.add_argument('--rank-by', choices=RANK_FIELDS, default='mean')
+    parser.add_argument('--explore', action='store_true', help="nie wyłączaj eksploracji (epsilon)")
+    parser.add_argument('--grid', type=int, default=GRID_COUNT)
+    parser.add_argument('--output', help="plik wyników .csv lub .json")
+    args = parser.parse_args()
+
+    entries = [os.path.basename(path) for path in args.checkpoints]
+    if not entries:
+        from utils.save_load import ModelManager
+        registry = ModelManager(args.models_dir).registry
+        entries = [row['filename'] for row in registry.list(min_score=args.min_score, limit=args.limit)]
+    entries += [BASELINE_PREFIX + name for name in args.baseline]
+    if not entries:
+        print("Brak punktów kontrolnych do oceny")
+        return
+
+    start = time.perf_counter()
+    print(f"Modele: {len(entries)}, gry na model: {args.games}, ziarno: {args.seed}")
+    rows = run_tournament(entries, args.games, args.seed, args.workers, args.models_dir, args.grid,
+                          greedy=not args.explore, rank_by=args.rank_by)
+    if not rows:
+        return
+    print_table(rows)
+    total_steps = sum(row['mean_steps'] * row['games'] for row in rows)
+    elapsed = time.perf_counter() - start
+    print(f"Czas: {elapsed:.1f} s, {total_steps / elapsed:,.0f} kroków/s łącznie")
+    if args.output:
+        write_results(rows, args.output)
+        print(f"Wyniki zapisane: {args.output}")
+
+if __name__ == "__main__":
+    main()
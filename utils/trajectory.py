@@ -0,0 +1,238 @@
+"""Eksport nagranych gier do skompresowanych plików kolumnowych i strumieniowy odczyt
+
+Plik .straj to nagłówek i ciąg bloków po CHUNK_ROWS wierszy. W bloku każda
+kolumna (jak w ReplayBuffer plus numer gry 'episode') jest zapisana osobno:
+bajty liczb są rozdzielone na płaszczyzny (najpierw wszystkie pierwsze bajty,
+potem drugie...), co bardzo pomaga kompresji, i skompresowane zlib albo lzma.
+Czytnik dekompresuje tylko potrzebne kolumny jednego bloku naraz.
+
+Eksport z punktu kontrolnego:
+    python -m utils.trajectory export models/snake_model_100_....pkl dane/
+"""
+import argparse
+import glob
+import lzma
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from utils.replay_buffer import FIELDS
+
+FILE_MAGIC = b'STRJ'
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct('<4sH')
+CHUNK_HEADER = struct.Struct('<QIH')  # pierwszy wiersz, liczba wierszy, liczba kolumn
+COLUMN_HEADER = struct.Struct('<BBI')  # długość nazwy, kodek, długość danych
+
+CHUNK_ROWS = 65536
+ROWS_PER_FILE = 1 << 22
+EXPORT_FIELDS = FIELDS + (('episode', np.int64),)
+FIELD_TYPES = dict(EXPORT_FIELDS)
+
+CODECS = {
+    'zlib': (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+    'lzma': (2, lambda data: lzma.compress(data, preset=6), lzma.decompress),
+}
+CODEC_BY_ID = {codec_id: decompress for codec_id, _, decompress in CODECS.values()}
+
+def _shuffle(column):
+    """Układa bajty kolumny płaszczyznami (bajt 0 wszystkich wartości, potem bajt 1...)"""
+    raw = np.ascontiguousarray(column).view(np.uint8)
+    return raw.reshape(len(column), -1).T.tobytes()
+
+def _unshuffle(data, dtype, rows):
+    itemsize = np.dtype(dtype).itemsize
+    planes = np.frombuffer(data, dtype=np.uint8).reshape(itemsize, rows)
+    return np.ascontiguousarray(planes.T).view(dtype).reshape(rows)
+
+class TrajectoryWriter:
+    """Zapisuje wiersze ruchów do plików part-NNNNN.straj w katalogu
+
+    write() przyjmuje słownik kolumn (np. ReplayBuffer.get_range) z kolumną
+    'episode'; pełne bloki są kompresowane od razu, a co rows_per_file
+    wierszy zaczynany jest nowy plik. Po zakończeniu trzeba wywołać close().
+    """
+
+    def __init__(self, directory, codec='zlib', chunk_rows=CHUNK_ROWS, rows_per_file=ROWS_PER_FILE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.codec_id, self.compress, _ = CODECS[codec]
+        self.chunk_rows = chunk_rows
+        self.rows_per_file = rows_per_file
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.paths = []
+        self._pending = []  # Kawałki kolumn czekające na pełny blok
+        self._pending_rows = 0
+        self._file = None
+        self._file_rows = 0
+
+    def write(self, columns):
+        """Dopisuje wiersze (słownik kolumn o równej długości)"""
+        rows = len(columns['episode'])
+        offset = 0
+        while offset < rows:
+            take = min(rows - offset, self.chunk_rows - self._pending_rows)
+            self._pending.append({name: np.asarray(columns[name][offset:offset + take], dtype=dtype)
+                                  for name, dtype in EXPORT_FIELDS})
+            self._pending_rows += take
+            offset += take
+            if self._pending_rows == self.chunk_rows:
+                self._write_chunk()
+
+    def _write_chunk(self):
+        if not self._pending_rows:
+            return
+        if self._file is None or self._file_rows >= self.rows_per_file:
+            self._open_next_file()
+        chunk = {name: np.concatenate([piece[name] for piece in self._pending]) for name, _ in EXPORT_FIELDS}
+        parts = [CHUNK_HEADER.pack(self.rows_written, self._pending_rows, len(EXPORT_FIELDS))]
+        for name, _ in EXPORT_FIELDS:
+            data = self.compress(_shuffle(chunk[name]))
+            encoded_name = name.encode('ascii')
+            parts.append(COLUMN_HEADER.pack(len(encoded_name), self.codec_id, len(data)))
+            parts.append(encoded_name)
+            parts.append(data)
+        block = b''.join(parts)
+        self._file.write(block)
+        self.bytes_written += len(block)
+        self.rows_written += self._pending_rows
+        self._file_rows += self._pending_rows
+        self._pending = []
+        self._pending_rows = 0
+
+    def _open_next_file(self):
+        self._close_file()
+        path = os.path.join(self.directory, f"part-{len(self.paths):05d}.straj")
+        self._file = open(path + '.tmp', 'wb')
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+        self.bytes_written += FILE_HEADER.size
+        self._file_rows = 0
+        self.paths.append(path)
+
+    def _close_file(self):
+        # Plik pojawia się pod docelową nazwą dopiero po zamknięciu (jak zapisy w save_load)
+        if self._file is not None:
+            self._file.close()
+            os.replace(self._file.name, self.paths[-1])
+            self._file = None
+
+    def close(self):
+        """Zapisuje niepełny ostatni blok i zamyka plik"""
+        self._write_chunk()
+        self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+def export_history(buffer, directory, codec='zlib', chunk_rows=CHUNK_ROWS, rows_per_file=ROWS_PER_FILE):
+    """Eksportuje pełne gry z ReplayBuffer do katalogu, zwraca TrajectoryWriter (statystyki)
+
+    Gdy początek bufora został już nadpisany, pierwsza (niepełna) gra jest
+    pomijana, a ostatnia niezakończona gra nie jest eksportowana. Bufor jest
+    czytany blokami, więc działa także na historii mapowanej z logu.
+    """
+    start, stop = buffer.first_row, buffer.total
+    game_over = buffer.get_range(start, stop)['game_over']
+    ends = np.flatnonzero(game_over) + start
+    if not len(ends):
+        stop = start
+    else:
+        stop = int(ends[-1]) + 1
+        if start > 0:
+            start = int(ends[0]) + 1
+    episode = 0
+    with TrajectoryWriter(directory, codec, chunk_rows, rows_per_file) as writer:
+        for lo in range(start, stop, chunk_rows):
+            columns = dict(buffer.get_range(lo, min(lo + chunk_rows, stop)))
+            # Numer gry: gry zakończone przed danym wierszem w tym eksporcie
+            ends_before = np.concatenate(([0], np.cumsum(columns['game_over'][:-1])))
+            columns['episode'] = episode + ends_before
+            episode += int(columns['game_over'].sum())
+            writer.write(columns)
+    return writer
+
+def _iter_chunks(path, columns):
+    """Zwraca kolejne bloki pliku jako słowniki wybranych kolumn"""
+    with open(path, 'rb') as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"Nieprawidłowy plik trajektorii: {path}")
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                return
+            _, rows, count = CHUNK_HEADER.unpack(header)
+            chunk = {}
+            for _ in range(count):
+                name_length, codec_id, length = COLUMN_HEADER.unpack(f.read(COLUMN_HEADER.size))
+                name = f.read(name_length).decode('ascii')
+                if name in columns:
+                    data = CODEC_BY_ID[codec_id](f.read(length))
+                    chunk[name] = _unshuffle(data, FIELD_TYPES[name], rows)
+                else:
+                    f.seek(length, os.SEEK_CUR)  # Niepotrzebna kolumna - bez dekompresji
+            yield chunk
+
+def trajectory_files(source):
+    """Zwraca posortowaną listę plików .straj z katalogu (lub listę podanych ścieżek)"""
+    if isinstance(source, str):
+        if os.path.isdir(source):
+            return sorted(glob.glob(os.path.join(source, '*.straj')))
+        return [source]
+    return list(source)
+
+def iter_batches(source, batch_size, columns=None):
+    """Strumieniowo zwraca partie po batch_size wierszy ze wszystkich plików po kolei
+
+    W pamięci jest naraz tylko jeden blok i bieżąca partia. Ostatnia
+    partia może być mniejsza. columns - lista kolumn (domyślnie wszystkie).
+    """
+    columns = tuple(columns or FIELD_TYPES)
+    pending, pending_rows = [], 0
+    for path in trajectory_files(source):
+        for chunk in _iter_chunks(path, columns):
+            rows = len(chunk[columns[0]])
+            offset = 0
+            while offset < rows:
+                take = min(rows - offset, batch_size - pending_rows)
+                pending.append({name: chunk[name][offset:offset + take] for name in columns})
+                pending_rows += take
+                offset += take
+                if pending_rows == batch_size:
+                    yield _join(pending, columns)
+                    pending, pending_rows = [], 0
+    if pending_rows:
+        yield _join(pending, columns)
+
+def _join(pieces, columns):
+    if len(pieces) == 1:
+        return pieces[0]
+    return {name: np.concatenate([piece[name] for piece in pieces]) for name in columns}
+
+def main():
+    parser = argparse.ArgumentParser(description="Eksport historii ruchów z punktu kontrolnego")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help="eksportuj historię agenta z pliku .pkl")
+    export.add_argument('checkpoint', help="ścieżka do pliku .pkl")
+    export.add_argument('directory', help="katalog docelowy")
+    export.add_argument('--codec', choices=sorted(CODECS), default='zlib')
+    args = parser.parse_args()
+
+    from utils.save_load import ModelManager
+    manager = ModelManager(os.path.dirname(args.checkpoint) or '.')
+    model_data = manager.load_model(os.path.basename(args.checkpoint))
+    if model_data is None:
+        return
+    writer = export_history(model_data['agent'].movement_history, args.directory, args.codec)
+    per_row = writer.bytes_written / writer.rows_written if writer.rows_written else 0
+    print(f"Wyeksportowano {writer.rows_written} ruchów do {len(writer.paths)} plików "
+          f"({writer.bytes_written / 1024:.1f} KB, {per_row:.2f} B/ruch)")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+import time
+from collections import deque
+
 import pygame
 
 # Kolory
@@ -8,60 +11,153 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
+GRID_COLOR = (50, 50, 50)
+INSTRUCTION_COLOR = (100, 100, 100)
+
+INSTRUCTIONS = [
+    "H - Human mode",
+    "A - Agent mode", 
+    "1 - Auto agent ON",
+    "2 - Auto agent OFF",
+    "3 - Auto restart ON",
+    "4 - Auto restart OFF",
+    "P - Pause/Resume",
+    "S - Save model",
+    "L - Load model",
+    "T - Show TXT report",
+    "V - List reports",
+    "C - Clean old files",
+    "F - Turbo ON/OFF",
+    "G - Turbo: FPS/games",
+    "M - Metrics ON/OFF",
+    "R - Restart",
+    "ESC - Exit"
+]
+
+TEXT_CACHE_LIMIT = 512  # Maksymalna liczba zapamiętanych napisów
+FPS_WINDOW = 60  # Liczba klatek do liczenia FPS
 
 class GameRenderer:
-    """Zarządza wizualizacją gry"""
+    """Zarządza wizualizacją gry
+    
+    W trybie dirty_rects siatka i panel instrukcji są rysowane raz do
+    gotowych powierzchni, czcionki i napisy są zapamiętywane, a w każdej
+    klatce przerysowywane są tylko zmienione pola (nowa głowa, poprzednia
+    głowa, zdjęty ogon, jedzenie) i teksty HUD. Ekran jest odświeżany
+    przez pygame.display.update(dirty_rects) zamiast flip().
     
-    def __init__(self, screen, window_size, grid_size, game=None):
+    grid_count - rozmiar planszy w polach (domyślnie tyle, ile mieści okno).
+    Gdy plansza jest większa niż okno, rysowany jest widok view_count x
+    view_count pól, który przesuwa się skokowo za głową węża.
+    """
+    
+    def __init__(self, screen, window_size, grid_size, game=None, dirty_rects=False, grid_count=None):
         self.screen = screen
         self.window_size = window_size
         self.grid_size = grid_size
-        self.grid_count = window_size // grid_size
+        self.view_count = window_size // grid_size  # Pola widoczne w oknie (w poziomie i w pionie)
+        self.grid_count = grid_count or self.view_count
+        self.view_origin = (0, 0)  # Lewy górny róg widoku na planszy
         self.game = game  # Referencja do gry
+        self.dirty_rects = dirty_rects
+        
+        # Pamięć podręczna czcionek i napisów
+        self._fonts = {}
+        self._texts = {}
+        
+        # Licznik FPS
+        self._frame_times = deque(maxlen=FPS_WINDOW)
+        self.fps = 0.0
+        
+        # Stan trybu dirty_rects
+        self._background = None
+        self._instructions_surface = None
+        self._sprites = {}
+        self._drawn = {}  # Pole -> kolor narysowany na ekranie
+        self._overlays = []  # (powierzchnia, prostokąt) rysowane nad planszą
+        self._overlay_key = None
+        self._dirty = []
+        self._last_frame = None  # (step_id, głowa, ogon, długość, jedzenie, tryb)
+    
+    def get_font(self, size=24):
+        """Zwraca czcionkę z pamięci podręcznej"""
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, size)
+        return font
+    
+    def render_text(self, text, color, size=24):
+        """Zwraca wyrenderowany napis z pamięci podręcznej"""
+        key = (text, color, size)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) >= TEXT_CACHE_LIMIT:
+                self._texts.clear()
+            surface = self._texts[key] = self.get_font(size).render(text, True, color)
+        return surface
+    
+    # --- Widok na dużą planszę ---
+    
+    def follow(self, head):
+        """Przesuwa widok tak, by głowa była z dala od jego brzegu; zwraca True, gdy widok się zmienił"""
+        view, board = self.view_count, self.grid_count
+        if board <= view:
+            return False
+        margin = view // 4
+        origin = list(self.view_origin)
+        for axis in (0, 1):
+            if not origin[axis] + margin <= head[axis] < origin[axis] + view - margin:
+                origin[axis] = min(max(head[axis] - view // 2, 0), board - view)
+        origin = tuple(origin)
+        if origin == self.view_origin:
+            return False
+        self.view_origin = origin
+        return True
+    
+    def is_visible(self, cell):
+        """Czy pole planszy jest w widoku"""
+        ox, oy = self.view_origin
+        return ox <= cell[0] < ox + self.view_count and oy <= cell[1] < oy + self.view_count
+    
+    def cell_position(self, cell):
+        """Zwraca współrzędne ekranu (piksele) lewego górnego rogu pola planszy"""
+        return ((cell[0] - self.view_origin[0]) * self.grid_size,
+                (cell[1] - self.view_origin[1]) * self.grid_size)
     
     def draw_snake(self, snake, is_agent=False):
-        """Rysuje węża"""
+        """Rysuje węża (widoczne segmenty)"""
         for i, segment in enumerate(snake):
+            if not self.is_visible(segment):
+                continue
             if is_agent:
                 color = YELLOW if i == 0 else PURPLE  # Agent: żółta głowa, fioletowe ciało
             else:
                 color = GREEN if i == 0 else BLUE  # Człowiek: zielona głowa, niebieskie ciało
             pygame.draw.rect(self.screen, color, 
-                           (segment[0] * self.grid_size, segment[1] * self.grid_size, 
-                            self.grid_size - 1, self.grid_size - 1))
+                           self.cell_position(segment) + (self.grid_size - 1, self.grid_size - 1))
     
     def draw_food(self, food):
         """Rysuje jedzenie"""
-        pygame.draw.rect(self.screen, RED,
-                        (food[0] * self.grid_size, food[1] * self.grid_size,
-                         self.grid_size - 1, self.grid_size - 1))
+        if self.is_visible(food):
+            pygame.draw.rect(self.screen, RED,
+                            self.cell_position(food) + (self.grid_size - 1, self.grid_size - 1))
     
     def draw_grid(self):
         """Rysuje siatkę"""
         for x in range(0, self.window_size, self.grid_size):
-            pygame.draw.line(self.screen, (50, 50, 50), (x, 0), (x, self.window_size))
+            pygame.draw.line(self.screen, GRID_COLOR, (x, 0), (x, self.window_size))
         for y in range(0, self.window_size, self.grid_size):
-            pygame.draw.line(self.screen, (50, 50, 50), (0, y), (self.window_size, y))
+            pygame.draw.line(self.screen, GRID_COLOR, (0, y), (self.window_size, y))
     
-    def draw_info(self, score, mode, games_played=None, current_steps=None):
-        """Rysuje informacje o grze"""
-        font = pygame.font.Font(None, 24)
-        
-        # Punktacja
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
-        
-        # Tryb gry
-        mode_text = font.render(f"Mode: {mode}", True, WHITE)
-        self.screen.blit(mode_text, (10, 35))
+    def get_info_lines(self, score, mode, games_played=None, current_steps=None):
+        """Zwraca linie HUD jako listę (tekst, kolor)"""
+        # Punktacja i tryb gry
+        lines = [(f"Score: {score}", WHITE), (f"Mode: {mode}", WHITE)]
         
         # Informacje o agencie
         if self.game and self.game.agent_mode:
-            games_text = font.render(f"Games: {games_played}", True, WHITE)
-            self.screen.blit(games_text, (10, 60))
-            
-            steps_text = font.render(f"Steps: {current_steps}", True, WHITE)
-            self.screen.blit(steps_text, (10, 85))
+            lines.append((f"Games: {games_played}", WHITE))
+            lines.append((f"Steps: {current_steps}", WHITE))
             
             # Status automatycznych trybów
             auto_status = []
@@ -71,59 +167,91 @@ class GameRenderer:
                 auto_status.append("Auto Restart: ON")
             
             if auto_status:
-                auto_text = font.render(" | ".join(auto_status), True, (255, 255, 0))
-                self.screen.blit(auto_text, (10, 110))
+                lines.append((" | ".join(auto_status), YELLOW))
+            
+            # Statystyki gier agenta (gotowe agregaty, bez przeglądania historii)
+            stats = getattr(getattr(self.game, 'agent', None), 'game_stats', None)
+            if stats is not None and stats.games:
+                lines.append((f"Avg({len(stats.recent_games)}): {stats.window_average('score'):.2f} "
+                              f"p90: {stats.window_score_histogram.percentile(90)} "
+                              f"Best: {stats.max_score}", WHITE))
+            
+            # Tryb turbo
+            if getattr(self.game, 'turbo', False):
+                lines.append((f"Turbo ({self.game.turbo_render}): {self.game.turbo_steps_per_sec:,.0f} steps/s", YELLOW))
+        
+        if self.grid_count > self.view_count:
+            lines.append((f"Board: {self.grid_count}x{self.grid_count} "
+                          f"view: {self.view_origin[0]},{self.view_origin[1]}", INSTRUCTION_COLOR))
+        lines.append((f"FPS: {self.fps:.0f}", INSTRUCTION_COLOR))
+        return lines
+    
+    def draw_info(self, score, mode, games_played=None, current_steps=None):
+        """Rysuje informacje o grze"""
+        for i, (text, color) in enumerate(self.get_info_lines(score, mode, games_played, current_steps)):
+            self.screen.blit(self.render_text(text, color), (10, 10 + i * 25))
     
     def draw_pause(self):
         """Rysuje informację o pauzie"""
-        font = pygame.font.Font(None, 24)
-        pause_text = font.render("PAUSED", True, YELLOW)
+        pause_text = self.render_text("PAUSED", YELLOW)
         text_rect = pause_text.get_rect(center=(self.window_size // 2, 50))
         self.screen.blit(pause_text, text_rect)
     
     def draw_game_over(self):
         """Rysuje komunikat o końcu gry"""
-        font = pygame.font.Font(None, 24)
-        game_over_text = font.render("GAME OVER! Press R to restart", True, WHITE)
+        game_over_text = self.render_text("GAME OVER! Press R to restart", WHITE)
         text_rect = game_over_text.get_rect(center=(self.window_size // 2, self.window_size // 2))
         self.screen.blit(game_over_text, text_rect)
     
     def draw_instructions(self):
         """Rysuje instrukcje"""
-        font = pygame.font.Font(None, 24)
-        instructions = [
-            "H - Human mode",
-            "A - Agent mode", 
-            "1 - Auto agent ON",
-            "2 - Auto agent OFF",
-            "3 - Auto restart ON",
-            "4 - Auto restart OFF",
-            "P - Pause/Resume",
-            "S - Save model",
-            "L - Load model",
-            "T - Show TXT report",
-            "V - List reports",
-            "C - Clean old files",
-            "R - Restart",
-            "ESC - Exit"
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            inst_text = font.render(instruction, True, (100, 100, 100))
+        for i, instruction in enumerate(INSTRUCTIONS):
+            inst_text = self.render_text(instruction, INSTRUCTION_COLOR)
             self.screen.blit(inst_text, (self.window_size - 200, 10 + i * 20))
     
+    def _tick_fps(self):
+        """Aktualizuje licznik FPS"""
+        now = time.perf_counter()
+        self._frame_times.append(now)
+        if len(self._frame_times) > 1:
+            elapsed = now - self._frame_times[0]
+            self.fps = (len(self._frame_times) - 1) / elapsed if elapsed > 0 else 0.0
+    
     def render_frame(self, snake, food, score, mode, games_played=None, 
-                    current_steps=None, paused=False, game_over=False):
-        """Renderuje całą klatkę gry"""
+                    current_steps=None, paused=False, game_over=False, step_id=None):
+        """Renderuje całą klatkę gry
+        
+        step_id - identyfikator stanu węża, np. (numer gry, liczba ruchów).
+        W trybie dirty_rects pozwala rysować tylko różnicę względem poprzedniej
+        klatki; bez niego każda klatka jest rysowana w całości.
+        """
+        self._tick_fps()
+        if self.dirty_rects:
+            self._render_dirty(snake, food, score, mode, games_played, 
+                               current_steps, paused, game_over, step_id)
+            return
+        
+        self.compose_frame(snake, food, score, mode, games_played, current_steps, paused, game_over)
+        pygame.display.flip() 
+    
+    def compose_frame(self, snake, food, score, mode, games_played=None, 
+                      current_steps=None, paused=False, game_over=False, hud=True):
+        """Rysuje całą klatkę na self.screen bez odświeżania okna (także poza ekranem)
+        
+        hud=False pomija napisy (wynik, tryb, FPS, instrukcje) - sama plansza.
+        """
+        self.follow(snake[0])
         self.screen.fill(BLACK)
         
         # Rysowanie elementów gry
         self.draw_snake(snake, mode == "Agent")
-        self.draw_food(food)
+        if food is not None:  # Brak jedzenia po zapełnieniu planszy
+            self.draw_food(food)
         self.draw_grid()
         
         # Rysowanie informacji
-        self.draw_info(score, mode, games_played, current_steps)
+        if hud:
+            self.draw_info(score, mode, games_played, current_steps)
         
         # Rysowanie stanów specjalnych
         if paused:
@@ -132,6 +260,152 @@ class GameRenderer:
             self.draw_game_over()
         
         # Rysowanie instrukcji
-        self.draw_instructions()
+        if hud:
+            self.draw_instructions()
+    
+    # --- Tryb dirty_rects ---
+    
+    def _build_static_surfaces(self):
+        """Rysuje raz tło z siatką i panel instrukcji"""
+        screen = self.screen
+        self._background = pygame.Surface(screen.get_size()).convert(screen)
+        self.screen = self._background
+        self.screen.fill(BLACK)
+        self.draw_grid()
+        self.screen = screen
+        
+        height = 10 + len(INSTRUCTIONS) * 20
+        self._instructions_surface = pygame.Surface((200, height), pygame.SRCALPHA)
+        for i, instruction in enumerate(INSTRUCTIONS):
+            self._instructions_surface.blit(self.render_text(instruction, INSTRUCTION_COLOR), (0, i * 20))
+    
+    def _cell_sprite(self, color):
+        """Zwraca gotowy obraz pola w danym kolorze (razem z liniami siatki)"""
+        sprite = self._sprites.get(color)
+        if sprite is None:
+            g = self.grid_size
+            sprite = self._background.subsurface((0, 0, g, g)).copy()
+            sprite.fill(color, (0, 0, g - 1, g - 1))
+            pygame.draw.line(sprite, GRID_COLOR, (0, 0), (0, g))
+            pygame.draw.line(sprite, GRID_COLOR, (0, 0), (g, 0))
+            self._sprites[color] = sprite
+        return sprite
+    
+    def _cell_rect(self, cell):
+        return pygame.Rect(self.cell_position(cell), (self.grid_size, self.grid_size))
+    
+    def _redraw_region(self, rect):
+        """Przerysowuje prostokąt: tło, pola w nim i nakładki tekstowe"""
+        screen = self.screen
+        screen.set_clip(rect)
+        screen.blit(self._background, rect, rect)
+        g = self.grid_size
+        ox, oy = self.view_origin
+        for cx in range(rect.left // g, (rect.right - 1) // g + 1):
+            for cy in range(rect.top // g, (rect.bottom - 1) // g + 1):
+                color = self._drawn.get((cx + ox, cy + oy))
+                if color is not None:
+                    screen.blit(self._cell_sprite(color), (cx * g, cy * g))
+        for surface, overlay_rect in self._overlays:
+            screen.blit(surface, overlay_rect)
+        screen.set_clip(None)
+        self._dirty.append(rect)
+    
+    def _set_cell(self, cell, color):
+        """Zmienia kolor pola (None - puste) i przerysowuje je"""
+        if not self.is_visible(cell):
+            return
+        if color is None:
+            if self._drawn.pop(cell, None) is None:
+                return
+        elif self._drawn.get(cell) == color:
+            return
+        else:
+            self._drawn[cell] = color
+        self._redraw_region(self._cell_rect(cell))
+    
+    def _build_overlays(self, info_lines, paused, game_over):
+        """Składa nakładki tekstowe (powierzchnia, prostokąt) w kolejności z render_frame"""
+        overlays = []
+        for i, (text, color) in enumerate(info_lines):
+            surface = self.render_text(text, color)
+            overlays.append((surface, surface.get_rect(topleft=(10, 10 + i * 25))))
+        if paused:
+            surface = self.render_text("PAUSED", YELLOW)
+            overlays.append((surface, surface.get_rect(center=(self.window_size // 2, 50))))
+        if game_over:
+            surface = self.render_text("GAME OVER! Press R to restart", WHITE)
+            overlays.append((surface, surface.get_rect(center=(self.window_size // 2, self.window_size // 2))))
+        surface = self._instructions_surface
+        overlays.append((surface, surface.get_rect(topleft=(self.window_size - 200, 10))))
+        return overlays
+    
+    def _render_dirty(self, snake, food, score, mode, games_played, 
+                      current_steps, paused, game_over, step_id):
+        if self._background is None:
+            self._build_static_surfaces()
+        
+        is_agent = mode == "Agent"
+        head_color, body_color = (YELLOW, PURPLE) if is_agent else (GREEN, BLUE)
+        head, tail, length = snake[0], snake[-1], len(snake)
+        moved_view = self.follow(head)
+        
+        # Nakładki tekstowe - przy zmianie przerysuj stary i nowy obszar napisu
+        info_lines = self.get_info_lines(score, mode, games_played, current_steps)
+        overlay_key = (tuple(info_lines), paused, game_over)
+        changed_overlays = []
+        if overlay_key != self._overlay_key:
+            old_overlays = self._overlays
+            self._overlays = self._build_overlays(info_lines, paused, game_over)
+            self._overlay_key = overlay_key
+            changed_overlays = [rect for surface, rect in old_overlays if (surface, rect) not in self._overlays]
+            changed_overlays += [rect for surface, rect in self._overlays if (surface, rect) not in old_overlays]
+        
+        last = self._last_frame
+        self._last_frame = (step_id, head, tail, length, food, is_agent)
+        single_step = (last is not None and step_id is not None and last[0] is not None
+                       and last[5] == is_agent and last[0][0] == step_id[0] and not moved_view)
+        
+        if not single_step or step_id[1] - last[0][1] not in (0, 1):
+            self._render_full(snake, food, head_color, body_color)
+            return
+        
+        _, last_head, last_tail, last_length, last_food, _ = last
+        if step_id[1] == last[0][1] + 1:
+            # Jeden ruch: nowa głowa, poprzednia głowa staje się ciałem, ogon znika
+            if length == last_length:
+                self._set_cell(last_tail, None)
+            self._set_cell(last_head, body_color if length > 1 else None)
+            self._set_cell(head, head_color)
+        
+        if food != last_food:
+            if last_food is not None and self._drawn.get(last_food) == RED:
+                self._set_cell(last_food, None)
+            if food is not None:
+                self._set_cell(food, RED)
+        
+        for rect in changed_overlays:
+            self._redraw_region(rect)
+        
+        pygame.display.update(self._dirty)
+        self._dirty = []
+    
+    def _render_full(self, snake, food, head_color, body_color):
+        """Rysuje całą klatkę od nowa (pierwsza klatka, nowa gra, przeskok stanu)"""
+        self._drawn = {}
+        for segment in snake:
+            self._drawn[segment] = body_color
+        self._drawn[snake[0]] = head_color
+        if food is not None:
+            self._drawn[food] = RED
+        if self.grid_count > self.view_count:
+            self._drawn = {cell: color for cell, color in self._drawn.items() if self.is_visible(cell)}
+        
+        self.screen.blit(self._background, (0, 0))
+        for cell, color in self._drawn.items():
+            self.screen.blit(self._cell_sprite(color), self.cell_position(cell))
+        for surface, overlay_rect in self._overlays:
+            self.screen.blit(surface, overlay_rect)
         
-        pygame.display.flip() 
\ No newline at end of file
+        self._dirty = []
+        pygame.display.update()
\ No newline at end of file